@@ -1,7 +1,11 @@
-from flask import Flask
+from flask import Flask, g, request
 from modules.routes import routes
+from modules.sensor_interface import sensor_interface
+from modules.control import register_websocket
+from modules.telemetry import Histogram, tracer
 import logging
 import socket
+import time
 
 # Configure logging
 logging.basicConfig(
@@ -10,12 +14,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Streaming responses (SSE, MJPEG) are measured until their first byte is ready
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Time to produce an HTTP response',
+                            ['endpoint', 'method', 'status'])
+
 def create_app():
     """Create and configure the Flask application"""
     app = Flask(__name__)
     
     # Register blueprints
     app.register_blueprint(routes)
+    register_websocket(app)
     
     # Configure app
     app.config.update(
@@ -32,6 +41,21 @@ def create_app():
         except Exception as e:
             logger.error(f"Failed to start sensor data collection: {e}")
     
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter_ns()
+
+    @app.after_request
+    def record_latency(response):
+        """Observe request latency per endpoint (the route name keeps label cardinality bounded)"""
+        start = g.pop('request_start', None)
+        if start is not None:
+            end = time.perf_counter_ns()
+            endpoint = request.endpoint or 'unmatched'
+            REQUEST_SECONDS.labels(endpoint, request.method, response.status_code).observe((end - start) / 1e9)
+            tracer.record(endpoint, start, end, 'http', {'method': request.method, 'status': response.status_code})
+        return response
+
     @app.after_request
     def add_header(response):
         """Add headers to prevent caching for SSE"""
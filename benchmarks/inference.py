@@ -0,0 +1,58 @@
+"""
+Inference engine benchmark, without the server.
+
+Times every available engine from modules/object_detection/engines.py on the
+same frames and prints latency, throughput and agreement with the reference
+engine, then shows which engine the server would pick at startup:
+
+    python benchmarks/inference.py --frames benchmarks/frames --iterations 30
+    python benchmarks/inference.py --save   # also replace the server's saved results
+
+The server runs it the same way on first start (see EngineSelector), so the
+benchmark never shares the server's process.
+
+Run it on the Pi itself: the numbers only mean something on the target CPU.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.object_detection.benchmark import (EngineSelector, RESULTS_PATH, FRAMES_DIR, MAX_LATENCY_MS,  # noqa: E402
+                                                MIN_AGREEMENT, load_frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', default=FRAMES_DIR, help='directory of sample images (jpg/png)')
+    parser.add_argument('--source', default='directory', choices=['directory', 'camera'],
+                        help='where the sample images came from, recorded with the results')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--max-latency-ms', type=float, default=MAX_LATENCY_MS)
+    parser.add_argument('--min-agreement', type=float, default=MIN_AGREEMENT)
+    parser.add_argument('--results', default=RESULTS_PATH, help='results file for --save')
+    parser.add_argument('--save', action='store_true', help='write the results file')
+    args = parser.parse_args()
+
+    selector = EngineSelector(args.results, args.max_latency_ms, args.min_agreement, args.frames)
+    results = selector.run_benchmark(load_frames(args.frames), args.source, args.warmup, args.iterations, args.save)
+
+    print(f"\n{results['frames']['count']} {results['frames']['source']} frame(s) at "
+          f"{results['frames']['resolution']}, reference: {results['reference']}")
+    print(f"{'engine':<28} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'fps':>7} {'agree':>6} {'load ms':>8}")
+    for name, entry in results['engines'].items():
+        if 'error' in entry:
+            print(f"{name:<28} failed: {entry['error']}")
+            continue
+        agree = '-' if entry['agreement'] is None else f"{entry['agreement']:.2f}"
+        print(f"{name:<28} {entry['p50_ms']:>8.1f} {entry['p95_ms']:>8.1f} {entry['mean_ms']:>8.1f} "
+              f"{entry['fps']:>7.1f} {agree:>6} {entry['load_ms']:>8.0f}")
+    print(f"\nSelected: {selector.choose(results)} ({selector.reason}; "
+          f"target p95 <= {args.max_latency_ms} ms, agreement >= {args.min_agreement})")
+
+
+if __name__ == '__main__':
+    main()
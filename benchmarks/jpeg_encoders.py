@@ -0,0 +1,111 @@
+"""
+JPEG encoder benchmark.
+
+Encodes the same frames with every available backend in modules/encoding
+(OpenCV, and TurboJPEG when PyTurboJPEG is installed) across chroma
+subsampling, fast DCT, BGR vs YUV420 input and encode pool sizes. It
+reports the frame rate the encoder alone sustains, the CPU it burns and the
+output size:
+
+    python benchmarks/jpeg_encoders.py
+    python benchmarks/jpeg_encoders.py --resolutions 1920x1080 --workers 0 2 3 --frames benchmarks/frames
+
+YUV input starts from the I420 planes Picamera2 returns for the YUV420
+format (ROBOT_CAMERA_YUV=1). For encoders without native YUV support, the
+time includes the conversion to BGR that the stream would otherwise need.
+Run it on the Pi: the ranking depends on the CPU and the libjpeg build.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.encoding import EncodePool, ENCODERS, available_encoders  # noqa: E402
+
+
+def make_frames(width, height, count, directory=None):
+    """BGR test frames: resized sample images, or a gradient scene with shapes and sensor noise."""
+    frames = []
+    if directory:
+        for path in sorted(glob.glob(os.path.join(directory, '*.jpg')) + glob.glob(os.path.join(directory, '*.png'))):
+            image = cv2.imread(path)
+            if image is not None:
+                frames.append(cv2.resize(image, (width, height)))
+    rng = np.random.default_rng(0)
+    while len(frames) < count:
+        xs = np.linspace(0, 255, width, dtype=np.float32)
+        ys = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        frame = np.dstack([np.broadcast_to(xs, (height, width)), np.broadcast_to(ys, (height, width)),
+                           (xs + ys) / 2]).astype(np.uint8)
+        for _ in range(12):
+            x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+            color = tuple(int(c) for c in rng.integers(0, 256, 3))
+            cv2.rectangle(frame, (x, y), (x + width // 8, y + height // 8), color, -1)
+            cv2.circle(frame, (width - x, height - y), height // 10, color, 3)
+        noise = rng.normal(0, 4, frame.shape)
+        frames.append(np.clip(frame + noise, 0, 255).astype(np.uint8))
+    return frames[:count]
+
+
+def measure(encoder, frames, quality, workers, yuv, duration):
+    """(fps, CPU cores, CPU ms per frame, mean KB) for encoding frames for `duration` seconds."""
+    sizes = []
+    count = 0
+    cpu_start, start = time.process_time(), time.perf_counter()
+    if workers == 0:
+        while time.perf_counter() - start < duration:
+            frame = frames[count % len(frames)]
+            jpeg = encoder.encode_yuv(frame, quality) if yuv else encoder.encode(frame, quality)
+            sizes.append(len(jpeg))
+            count += 1
+    else:
+        pool = EncodePool(encoder, workers, on_encoded=lambda jpeg, seconds, context: sizes.append(len(jpeg)))
+        while time.perf_counter() - start < duration:
+            pool.submit(frames[count % len(frames)], quality, yuv=yuv)
+            count += 1
+        pool.close()
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+    return len(sizes) / elapsed, cpu / elapsed, cpu / max(1, len(sizes)) * 1000, np.mean(sizes) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolutions', nargs='+', default=['640x480', '1280x720'])
+    parser.add_argument('--quality', type=int, default=80)
+    parser.add_argument('--workers', nargs='+', type=int, default=[0, 2])
+    parser.add_argument('--subsampling', nargs='+', default=['420', '444'], choices=['420', '422', '444'])
+    parser.add_argument('--duration', type=float, default=1.5, help='seconds per configuration')
+    parser.add_argument('--frames', help='directory of sample images (default: generated scenes)')
+    args = parser.parse_args()
+
+    print(f"Encoders available: {', '.join(available_encoders())}; OpenCV {cv2.__version__}, "
+          f"{os.cpu_count()} CPUs, quality {args.quality}\n")
+    print(f"{'resolution':<10} {'encoder':<10} {'samp':>4} {'fastdct':>7} {'input':>5} {'workers':>7} "
+          f"{'fps':>7} {'cpu':>5} {'cpu ms/f':>8} {'KB':>6}")
+    for resolution in args.resolutions:
+        width, height = map(int, resolution.split('x'))
+        bgr = make_frames(width, height, 8, args.frames)
+        yuv = [cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420) for frame in bgr]
+        for name in available_encoders():
+            for subsampling in args.subsampling:
+                for fast_dct in ((False, True) if name == 'turbojpeg' else (False,)):
+                    encoder = ENCODERS[name](subsampling, fast_dct)
+                    # I420 input is 4:2:0 already, so only pair it with that subsampling
+                    inputs = ('bgr', 'yuv') if subsampling == '420' else ('bgr',)
+                    for kind in inputs:
+                        for workers in args.workers:
+                            fps, cores, cpu_ms, kb = measure(encoder, yuv if kind == 'yuv' else bgr, args.quality,
+                                                             workers, kind == 'yuv', args.duration)
+                            print(f"{resolution:<10} {name:<10} {subsampling:>4} {'yes' if fast_dct else 'no':>7} "
+                                  f"{kind:>5} {workers:>7} {fps:>7.1f} {cores:>5.2f} {cpu_ms:>8.2f} {kb:>6.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Load test for a running Robot Control Dashboard.
+
+Opens concurrent SSE and MJPEG clients while hammering the control endpoints,
+then reports message rates and request latency percentiles. Only uses the
+standard library so it runs anywhere, including against a simulated server:
+
+    ROBOT_SIMULATION=1 python app.py
+    python benchmarks/load_test.py --clients 4 --duration 30
+"""
+
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+SSE_ENDPOINTS = ['/system-events', '/sensor-data', '/api/encoder/path']
+CONTROL_ENDPOINTS = ['/api/gpio/motor/forward', '/api/gpio/motor/stop', '/api/gpio/motor/left', '/api/gpio/motor/stop']
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LoadTest:
+    def __init__(self, host, port, duration):
+        self.host = host
+        self.port = port
+        self.deadline = time.monotonic() + duration
+        self.lock = threading.Lock()
+        self.sse_gaps = defaultdict(list)      # endpoint -> seconds between messages
+        self.request_latency = defaultdict(list)  # endpoint -> seconds per request
+        self.video_frames = 0
+        self.errors = defaultdict(int)
+
+    def _connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=10)
+
+    def sse_client(self, endpoint):
+        try:
+            conn = self._connect()
+            conn.request('GET', endpoint)
+            response = conn.getresponse()
+            last = None
+            while time.monotonic() < self.deadline:
+                line = response.fp.readline()
+                if not line:
+                    break
+                if line.startswith(b'data:'):
+                    now = time.monotonic()
+                    if last is not None:
+                        with self.lock:
+                            self.sse_gaps[endpoint].append(now - last)
+                    last = now
+            conn.close()
+        except Exception:
+            with self.lock:
+                self.errors[endpoint] += 1
+
+    def video_client(self):
+        try:
+            conn = self._connect()
+            conn.request('GET', '/video_feed')
+            response = conn.getresponse()
+            while time.monotonic() < self.deadline:
+                line = response.fp.readline()
+                if not line:
+                    break
+                if line.startswith(b'--frame'):
+                    with self.lock:
+                        self.video_frames += 1
+            conn.close()
+        except Exception:
+            with self.lock:
+                self.errors['/video_feed'] += 1
+
+    def control_client(self, interval):
+        conn = self._connect()
+        index = 0
+        while time.monotonic() < self.deadline:
+            endpoint = CONTROL_ENDPOINTS[index % len(CONTROL_ENDPOINTS)]
+            index += 1
+            start = time.monotonic()
+            try:
+                conn.request('POST', endpoint)
+                conn.getresponse().read()
+                with self.lock:
+                    self.request_latency[endpoint].append(time.monotonic() - start)
+            except Exception:
+                with self.lock:
+                    self.errors[endpoint] += 1
+                conn.close()
+                conn = self._connect()
+            time.sleep(interval)
+        conn.close()
+
+    def run(self, clients, video_clients, control_interval):
+        threads = []
+        for endpoint in SSE_ENDPOINTS:
+            for _ in range(clients):
+                threads.append(threading.Thread(target=self.sse_client, args=(endpoint,), daemon=True))
+        for _ in range(video_clients):
+            threads.append(threading.Thread(target=self.video_client, daemon=True))
+        threads.append(threading.Thread(target=self.control_client, args=(control_interval,), daemon=True))
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=max(0.0, self.deadline - time.monotonic()) + 15)
+        return time.monotonic() - started
+
+    def report(self, elapsed):
+        print(f"Ran for {elapsed:.1f}s")
+        for endpoint, gaps in sorted(self.sse_gaps.items()):
+            print(f"  SSE {endpoint:<22} msgs={len(gaps) + 1:<6} "
+                  f"gap mean={statistics.mean(gaps) * 1000:7.1f}ms p95={percentile(gaps, 95) * 1000:7.1f}ms")
+        print(f"  MJPEG frames received: {self.video_frames} ({self.video_frames / elapsed:.1f}/s total)")
+        for endpoint, latencies in sorted(self.request_latency.items()):
+            print(f"  POST {endpoint:<26} n={len(latencies):<5} "
+                  f"p50={percentile(latencies, 50) * 1000:6.1f}ms p99={percentile(latencies, 99) * 1000:6.1f}ms")
+        for endpoint, count in sorted(self.errors.items()):
+            print(f"  errors {endpoint}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--duration', type=float, default=20, help='seconds')
+    parser.add_argument('--clients', type=int, default=2, help='clients per SSE endpoint')
+    parser.add_argument('--video-clients', type=int, default=1)
+    parser.add_argument('--control-interval', type=float, default=0.05, help='seconds between control POSTs')
+    args = parser.parse_args()
+
+    test = LoadTest(args.host, args.port, args.duration)
+    elapsed = test.run(args.clients, args.video_clients, args.control_interval)
+    test.report(elapsed)
+
+
+if __name__ == '__main__':
+    main()
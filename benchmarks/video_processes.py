@@ -0,0 +1,181 @@
+"""
+Single-process vs multi-process video pipeline benchmark.
+
+Runs VideoStream (everything on threads in one process) and
+ProcessVideoStream (ROBOT_VIDEO_PROCESSES=1: capture/encode and inference in
+their own processes, frames shared through ShmRing) one after the other, each
+in a fresh interpreter, with AI mode on. For each layout it reports:
+
+    fps        encoded frames delivered to the web process per second
+    det/s      frames carrying new detections per second
+    latency    capture -> frame listener, p50/p95 ms
+    probe      lateness of a 10 ms periodic pure-Python task in the web
+               process, p50/p99 ms (a stand-in for Flask/SSE responsiveness
+               under GIL contention)
+    cpu        cores used by the process and its children
+
+Inference uses a synthetic engine by default (--inference-ms of work, part of
+it GIL-holding Python like YOLO post-processing) so the comparison also runs
+in simulation; pass --engine NAME to use a real one on the Pi:
+
+    python benchmarks/video_processes.py --duration 20
+    python benchmarks/video_processes.py --hardware --engine onnxruntime-320
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYOUTS = {'single': {}, 'multi': {'ROBOT_VIDEO_PROCESSES': '1'}}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def register_synthetic_engine(inference_ms, python_share):
+    import cv2
+    from modules.object_detection.engines import InferenceEngine, register_engine
+
+    class SyntheticEngine(InferenceEngine):
+        """Burns inference_ms per frame: OpenCV work (releases the GIL), then a Python loop (holds it)."""
+
+        backend = 'synthetic'
+
+        def available(self):
+            return True
+
+        def load(self):
+            self.loaded = True
+
+        def infer(self, frame):
+            start = time.perf_counter()
+            native_until = start + inference_ms / 1000 * (1 - python_share)
+            while time.perf_counter() < native_until:
+                cv2.GaussianBlur(cv2.resize(frame, (320, 320)), (9, 9), 0)
+            python_until = start + inference_ms / 1000
+            boxes = 0
+            while time.perf_counter() < python_until:
+                boxes += sum(i * i for i in range(200)) & 1
+            height, width = frame.shape[:2]
+            return [(0, 0.9, width * 0.25, height * 0.25, width * 0.75, height * 0.75)]
+
+    register_engine('synthetic', lambda name: SyntheticEngine(name, 320))
+
+
+def run_layout(args):
+    """Body of one measurement, in its own interpreter (the layout is chosen at import)."""
+    import psutil
+    sys.path.insert(0, ROOT)
+    if not args.engine:
+        register_synthetic_engine(args.inference_ms, args.python_share)
+    from modules.video_stream import video_stream
+
+    deadline = time.monotonic() + 30
+    while video_stream.engine is None and time.monotonic() < deadline:
+        time.sleep(0.1)
+    if video_stream.engine is None:
+        raise SystemExit("no inference engine loaded")
+    video_stream.toggle_ai()
+    time.sleep(args.warmup)
+
+    frames, latencies = [], []
+
+    def listener(capture_time, seq, frame_bytes, detections):
+        latencies.append(time.monotonic() - capture_time)
+        frames.append(detections is not None)
+
+    probe_lateness = []
+    stop = threading.Event()
+
+    def probe():
+        payload = {'sensor': list(range(50)), 'pose': {'x': 1.0, 'y': 2.0, 'theta': 0.5}}
+        next_run = time.monotonic()
+        while not stop.is_set():
+            next_run += 0.01
+            time.sleep(max(0.0, next_run - time.monotonic()))
+            json.dumps(payload)
+            probe_lateness.append(time.monotonic() - next_run)
+
+    process = psutil.Process()
+
+    def cpu_seconds():
+        total = sum(process.cpu_times()[:2])
+        for child in process.children(recursive=True):
+            try:
+                total += sum(child.cpu_times()[:2])
+            except psutil.NoSuchProcess:
+                pass
+        return total
+
+    video_stream.add_frame_listener(listener)
+    threading.Thread(target=probe, daemon=True).start()
+    cpu_start, start = cpu_seconds(), time.monotonic()
+    time.sleep(args.duration)
+    elapsed, cpu = time.monotonic() - start, cpu_seconds() - cpu_start
+    video_stream.remove_frame_listener(listener)
+    stop.set()
+
+    print(json.dumps({
+        'fps': round(len(frames) / elapsed, 1),
+        'detections_per_s': round(sum(frames) / elapsed, 1),
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'latency_p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'probe_p50_ms': round(percentile(probe_lateness, 50) * 1000, 2),
+        'probe_p99_ms': round(percentile(probe_lateness, 99) * 1000, 2),
+        'cpu_cores': round(cpu / elapsed, 2),
+    }))
+    if hasattr(video_stream, 'close'):
+        video_stream.close()
+    os._exit(0)  # Skip interpreter teardown of the camera/sensor threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--inference-ms', type=float, default=60.0, help='synthetic engine time per frame')
+    parser.add_argument('--python-share', type=float, default=0.3, help='part of it spent holding the GIL')
+    parser.add_argument('--engine', help='use this registered engine instead of the synthetic one')
+    parser.add_argument('--hardware', action='store_true', help='use the real camera instead of simulation')
+    parser.add_argument('--layouts', nargs='+', choices=list(LAYOUTS), default=list(LAYOUTS))
+    parser.add_argument('--run', choices=list(LAYOUTS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_layout(args)
+        return
+
+    results = {}
+    for layout in args.layouts:
+        env = {**os.environ, **LAYOUTS[layout], 'ROBOT_INFERENCE_ENGINE': args.engine or 'synthetic',
+               'ROBOT_INFERENCE_RESULTS': os.devnull, 'PYTHONPATH': ROOT}
+        if not args.hardware:
+            env['ROBOT_SIMULATION'] = '1'
+        command = [sys.executable, os.path.abspath(__file__), '--run', layout] + sys.argv[1:]
+        print(f"Running {layout}-process layout for {args.duration:.0f} s...", file=sys.stderr)
+        output = subprocess.run(command, env=env, capture_output=True, text=True, cwd=ROOT)
+        lines = [line for line in output.stdout.splitlines() if line.startswith('{')]
+        if output.returncode or not lines:
+            print(output.stderr[-2000:], file=sys.stderr)
+            raise SystemExit(f"{layout} layout failed")
+        results[layout] = json.loads(lines[-1])
+
+    print(f"\n{'layout':<8} {'fps':>6} {'det/s':>6} {'lat p50':>8} {'lat p95':>8} "
+          f"{'probe p50':>10} {'probe p99':>10} {'cpu':>6}")
+    for layout, r in results.items():
+        print(f"{layout:<8} {r['fps']:>6} {r['detections_per_s']:>6} {r['latency_p50_ms']:>8} "
+              f"{r['latency_p95_ms']:>8} {r['probe_p50_ms']:>10} {r['probe_p99_ms']:>10} {r['cpu_cores']:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Low-latency control channel for the motors and servos.
+
+Commands arrive over a WebSocket (/ws/control, needs the optional flask-sock
+package) or, as a fallback, POST /api/control. Either way they land in one
+slot per actuator that only holds the latest command, so a burst of drive
+updates is coalesced and the actuation thread always applies the newest one.
+While the motors are driving, a deadman timer stops them if no drive
+command or heartbeat arrives within deadman_timeout seconds, and closing
+the socket stops them immediately.
+
+Messages are JSON objects:
+    {"type": "drive", "speed": 0.6, "turn": -0.2}      speed/turn in [-1, 1]
+    {"type": "velocity", "v": 0.08, "omega": 0.5}      closed loop, m/s and rad/s
+    {"type": "servo", "servo": "arm", "target": 1650000, "duration": 0.3}
+    {"type": "stop"}                                    motors and servos
+    {"type": "ping", "seq": 12}                         heartbeat, answered with a pong
+"""
+
+import json
+import time
+import logging
+import threading
+from .gpio import motor_controller, servo_arm, servo_gripper, wheel_controller
+from .telemetry import Counter, Histogram, tracer
+
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+
+logger = logging.getLogger(__name__)
+
+CONTROL_COMMANDS = Counter('control_commands_total', 'Control commands by type and fate',
+                           ['type', 'outcome'])
+CONTROL_LATENCY = Histogram('control_actuation_latency_seconds',
+                            'Time from receiving a command to applying it', ['actuator'],
+                            buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+DEADMAN_STOPS = Counter('control_deadman_stops_total', 'Motor stops triggered by the deadman timer')
+
+
+class ControlChannel:
+    """Latest-command-wins actuation with a deadman stop for the drive motors."""
+
+    def __init__(self, motors, servos, wheels=None, deadman_timeout=0.5):
+        self.motors = motors
+        self.wheels = wheels
+        self.servos = servos
+        self.deadman_timeout = deadman_timeout
+        self._pending = {}  # actuator -> (command, received at)
+        self._condition = threading.Condition()
+        self._last_drive = 0.0
+        self._driving = False
+        self.clients = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.deadman_stops = 0
+        self.last_latency = None
+
+        self._thread = threading.Thread(target=self._run, name='control-channel', daemon=True)
+        self._thread.start()
+
+    def submit(self, command: dict) -> dict:
+        """Validate a command and put it in its actuator's slot; returns an optional reply."""
+        received = time.perf_counter()
+        kind = command.get('type')
+        if kind == 'ping':
+            with self._condition:
+                self._last_drive = time.monotonic()
+            CONTROL_COMMANDS.labels('ping', 'applied').inc()
+            return {'type': 'pong', 'seq': command.get('seq'), 'driving': self._driving}
+
+        if kind == 'drive':
+            actuator = 'drive'
+            command = {'type': 'drive', 'speed': float(command.get('speed', 0.0)),
+                       'turn': float(command.get('turn', 0.0))}
+        elif kind == 'velocity':
+            if self.wheels is None:
+                raise ValueError("Closed-loop wheel control is not available")
+            # Shares the drive slot: open- and closed-loop commands replace each other
+            actuator = 'drive'
+            command = {'type': 'velocity', 'v': float(command.get('v', 0.0)),
+                       'omega': float(command.get('omega', 0.0))}
+        elif kind == 'servo':
+            actuator = command.get('servo')
+            if actuator not in self.servos:
+                raise ValueError(f"Unknown servo '{actuator}'")
+            command = {'type': 'servo', 'target': int(command['target']), 'duration': command.get('duration'),
+                       'easing': command.get('easing', 'ease_in_out')}
+        elif kind == 'stop':
+            actuator = 'stop'
+        else:
+            raise ValueError(f"Unknown command type '{kind}'")
+
+        with self._condition:
+            if actuator in self._pending:
+                # The previous command never reached the hardware; only the newest matters
+                self.coalesced += 1
+                CONTROL_COMMANDS.labels(self._pending[actuator][0]['type'], 'coalesced').inc()
+            self._pending[actuator] = (command, received)
+            if actuator in ('drive', 'stop'):
+                self._last_drive = time.monotonic()
+            self._condition.notify()
+        return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    if self._driving:
+                        remaining = self._last_drive + self.deadman_timeout - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                pending, self._pending = self._pending, {}
+                deadman = not pending and self._driving
+
+            try:
+                if deadman:
+                    self._deadman_stop()
+                    continue
+                # A stop sent in the same burst as drive updates wins
+                if 'stop' in pending:
+                    pending.pop('drive', None)
+                for actuator, (command, received) in pending.items():
+                    with tracer.span('control_apply', 'control', actuator=actuator):
+                        self._apply(actuator, command)
+                    latency = time.perf_counter() - received
+                    self.last_latency = latency
+                    self.applied += 1
+                    CONTROL_LATENCY.labels(actuator).observe(latency)
+                    CONTROL_COMMANDS.labels(command['type'], 'applied').inc()
+            except Exception as e:
+                logger.error(f"Failed to apply control command: {e}")
+
+    def _apply(self, actuator, command):
+        if actuator == 'stop':
+            self._release_wheels()
+            self.motors.stop()
+            for servo in self.servos.values():
+                servo.stop()
+            self._driving = False
+        elif command['type'] == 'velocity':
+            self.wheels.set_velocity(command['v'], command['omega'])
+            self._driving = command['v'] != 0 or command['omega'] != 0
+        elif actuator == 'drive':
+            self._release_wheels()
+            self.motors.drive(command['speed'], command['turn'])
+            self._driving = command['speed'] != 0 or command['turn'] != 0
+        else:
+            self.servos[actuator].move_to(command['target'], duration=command['duration'],
+                                          easing=command['easing'])
+
+    def _release_wheels(self):
+        if self.wheels is not None:
+            self.wheels.release()
+
+    def _deadman_stop(self):
+        logger.warning(f"No drive command for {self.deadman_timeout}s; stopping motors")
+        self._release_wheels()
+        self.motors.stop()
+        self._driving = False
+        self.deadman_stops += 1
+        DEADMAN_STOPS.inc()
+
+    def release_drive(self):
+        """Another path (REST motor routes, a sequence) took over the motors: drop the
+        channel's pending drive and stop guarding it, so the deadman does not stop them."""
+        with self._condition:
+            if 'drive' in self._pending:
+                CONTROL_COMMANDS.labels(self._pending.pop('drive')[0]['type'], 'coalesced').inc()
+            self._driving = False
+            self._condition.notify()
+
+    def connect(self):
+        with self._condition:
+            self.clients += 1
+
+    def disconnect(self):
+        """A client went away: stop the motors rather than wait for the deadman."""
+        with self._condition:
+            self.clients -= 1
+        self.submit({'type': 'stop'})
+
+    def get_status(self) -> dict:
+        return {
+            'websocket': Sock is not None,
+            'clients': self.clients,
+            'driving': self._driving,
+            'deadman_timeout': self.deadman_timeout,
+            'applied': self.applied,
+            'coalesced': self.coalesced,
+            'deadman_stops': self.deadman_stops,
+            'last_latency_ms': round(self.last_latency * 1000, 3) if self.last_latency is not None else None,
+        }
+
+
+def register_websocket(app, channel=None):
+    """Serve /ws/control on app if flask-sock is installed; returns whether it is."""
+    channel = channel or control_channel
+    if Sock is None:
+        logger.warning("flask-sock not installed; control WebSocket unavailable, use POST /api/control")
+        return False
+
+    sock = Sock(app)
+
+    @sock.route('/ws/control')
+    def control_socket(ws):
+        channel.connect()
+        try:
+            while True:
+                message = ws.receive()
+                if message is None:
+                    break
+                try:
+                    reply = channel.submit(json.loads(message))
+                except (ValueError, TypeError, KeyError) as e:
+                    CONTROL_COMMANDS.labels('invalid', 'rejected').inc()
+                    reply = {'type': 'error', 'message': str(e)}
+                if reply is not None:
+                    ws.send(json.dumps(reply))
+        except Exception as e:
+            logger.info(f"Control socket closed: {e}")
+        finally:
+            channel.disconnect()
+
+    return True
+
+
+control_channel = ControlChannel(motor_controller, {'arm': servo_arm, 'gripper': servo_gripper}, wheel_controller)
@@ -0,0 +1,28 @@
+"""
+Encoding Package
+
+JPEG encoders for the video stream, chosen with environment variables:
+    ROBOT_JPEG_ENCODER      opencv (default) or turbojpeg (needs PyTurboJPEG)
+    ROBOT_JPEG_SUBSAMPLING  chroma subsampling: 420 (default), 422 or 444
+    ROBOT_JPEG_FAST_DCT     1 for libjpeg-turbo's faster, slightly less exact DCT
+    ROBOT_JPEG_WORKERS      threads encoding consecutive frames in parallel (0 = on the capture thread)
+    ROBOT_CAMERA_YUV        1 to capture YUV420 from the Pi Camera and encode it without a BGR conversion
+
+Example usage:
+    from modules.encoding import create_encoder, EncodePool
+
+    encoder = create_encoder('turbojpeg', subsampling='420', fast_dct=True)
+    jpeg = encoder.encode(frame, quality=80)
+
+    pool = EncodePool(encoder, workers=2, on_encoded=lambda jpeg, seconds, context: send(jpeg))
+    pool.submit(frame, 80, context=capture_time)
+
+See benchmarks/jpeg_encoders.py to compare the settings on the Pi.
+"""
+
+from .encoders import (JpegEncoder, OpenCvEncoder, TurboJpegEncoder, ENCODERS, SUBSAMPLINGS, create_encoder,
+                       available_encoders)
+from .pool import EncodePool
+
+__all__ = ['JpegEncoder', 'OpenCvEncoder', 'TurboJpegEncoder', 'ENCODERS', 'SUBSAMPLINGS', 'create_encoder',
+           'available_encoders', 'EncodePool']
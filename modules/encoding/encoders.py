@@ -0,0 +1,104 @@
+import logging
+from typing import Dict, Optional, Type
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from turbojpeg import TurboJPEG, TJFLAG_FASTDCT, TJPF_BGR, TJSAMP_420, TJSAMP_422, TJSAMP_444
+except ImportError:
+    TurboJPEG = None
+
+SUBSAMPLINGS = ('420', '422', '444')
+
+
+class JpegEncoder:
+    """Encodes frames to JPEG bytes.
+
+    encode() takes a 3-channel frame in the channel order cv2.imencode
+    expects (what VideoStream has always handed it). Encoders with
+    supports_yuv can also take a planar I420 frame (height * 3 / 2 rows, as
+    Picamera2 returns for the YUV420 format) without converting it to BGR
+    first; the others convert. Instances are safe to call from several
+    threads at once.
+    """
+
+    name = 'base'
+    supports_yuv = False
+
+    def __init__(self, subsampling: str = '420', fast_dct: bool = False):
+        if subsampling not in SUBSAMPLINGS:
+            raise ValueError(f"subsampling must be one of {SUBSAMPLINGS}")
+        self.subsampling = subsampling
+        self.fast_dct = fast_dct
+
+    def encode(self, frame: np.ndarray, quality: int) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def encode_yuv(self, yuv: np.ndarray, quality: int) -> Optional[bytes]:
+        return self.encode(cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_I420), quality)
+
+    def describe(self) -> dict:
+        return {'name': self.name, 'subsampling': self.subsampling, 'fast_dct': self.fast_dct,
+                'yuv': self.supports_yuv}
+
+
+class OpenCvEncoder(JpegEncoder):
+    """cv2.imencode (libjpeg or libjpeg-turbo, depending on the OpenCV build). No fast-DCT switch."""
+
+    name = 'opencv'
+    _SAMPLING = {'420': cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420, '422': cv2.IMWRITE_JPEG_SAMPLING_FACTOR_422,
+                 '444': cv2.IMWRITE_JPEG_SAMPLING_FACTOR_444}
+
+    def encode(self, frame, quality):
+        success, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), int(quality),
+                                                       int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR),
+                                                       int(self._SAMPLING[self.subsampling])])
+        return buffer.tobytes() if success else None
+
+
+class TurboJpegEncoder(JpegEncoder):
+    """libjpeg-turbo through PyTurboJPEG: fast DCT and encoding straight from I420."""
+
+    name = 'turbojpeg'
+    supports_yuv = True
+
+    def __init__(self, subsampling='420', fast_dct=False):
+        super().__init__(subsampling, fast_dct)
+        if TurboJPEG is None:
+            raise RuntimeError("PyTurboJPEG is not installed")
+        self.jpeg = TurboJPEG()
+        self.flags = TJFLAG_FASTDCT if fast_dct else 0
+        self.sampling = {'420': TJSAMP_420, '422': TJSAMP_422, '444': TJSAMP_444}[subsampling]
+
+    def encode(self, frame, quality):
+        return self.jpeg.encode(frame, quality=int(quality), pixel_format=TJPF_BGR, jpeg_subsample=self.sampling,
+                                flags=self.flags)
+
+    def encode_yuv(self, yuv, quality):
+        # I420 is 4:2:0 by construction, so the subsampling setting does not apply
+        height = yuv.shape[0] * 2 // 3
+        return self.jpeg.encode_from_yuv(yuv, height, yuv.shape[1], quality=int(quality),
+                                         jpeg_subsample=TJSAMP_420, flags=self.flags)
+
+
+ENCODERS: Dict[str, Type[JpegEncoder]] = {
+    'opencv': OpenCvEncoder,
+    'turbojpeg': TurboJpegEncoder,
+}
+
+
+def available_encoders() -> list:
+    return [name for name in ENCODERS if name != 'turbojpeg' or TurboJPEG is not None]
+
+
+def create_encoder(name: str = 'opencv', subsampling: str = '420', fast_dct: bool = False) -> JpegEncoder:
+    """Build an encoder, falling back to OpenCV if the requested backend is unavailable."""
+    if name not in ENCODERS:
+        raise KeyError(f"Unknown JPEG encoder '{name}', expected one of {list(ENCODERS)}")
+    try:
+        return ENCODERS[name](subsampling, fast_dct)
+    except RuntimeError as e:
+        logger.warning(f"JPEG encoder {name} unavailable ({e}); using OpenCV")
+        return OpenCvEncoder(subsampling, fast_dct)
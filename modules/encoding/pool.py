@@ -0,0 +1,83 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import numpy as np
+from .encoders import JpegEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class EncodePool:
+    """Encodes consecutive frames on a few threads and hands the results on in submission order.
+
+    JPEG encoders release the GIL, so N workers can encode N frames at
+    once. submit() blocks while `workers + 1` frames are already in flight,
+    which paces the capture loop to what the pool sustains instead of
+    queueing frames. A single delivery thread waits on the oldest frame
+    first, so callbacks always run in capture order even when a later
+    frame finishes earlier. Frames must not be modified after submit().
+    """
+
+    def __init__(self, encoder: JpegEncoder, workers: int = 2,
+                 on_encoded: Optional[Callable[[Optional[bytes], float, Any], None]] = None):
+        self.encoder = encoder
+        self.workers = workers
+        self.on_encoded = on_encoded  # on_encoded(jpeg bytes or None, encode seconds, context)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jpeg-encode')
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._max_pending = workers + 1
+        self._closed = False
+        self._delivery = threading.Thread(target=self._deliver, name='jpeg-deliver', daemon=True)
+        self._delivery.start()
+
+    def _encode(self, frame: np.ndarray, quality: int, yuv: bool):
+        start = time.perf_counter()
+        try:
+            jpeg = self.encoder.encode_yuv(frame, quality) if yuv else self.encoder.encode(frame, quality)
+        except Exception as e:
+            logger.error("JPEG encode failed: %s", e)
+            jpeg = None
+        return jpeg, time.perf_counter() - start
+
+    def submit(self, frame: np.ndarray, quality: int, context: Any = None, yuv: bool = False) -> None:
+        with self._condition:
+            while len(self._pending) >= self._max_pending and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return
+            self._pending.append((self._executor.submit(self._encode, frame, quality, yuv), context))
+            self._condition.notify_all()
+
+    def _deliver(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    if self._closed:
+                        return
+                    self._condition.wait()
+                future, context = self._pending[0]
+            jpeg, seconds = future.result()
+            with self._condition:
+                self._pending.popleft()
+                self._condition.notify_all()
+            if self.on_encoded is not None:
+                try:
+                    self.on_encoded(jpeg, seconds, context)
+                except Exception as e:
+                    logger.error("Encoded frame callback failed: %s", e)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def close(self) -> None:
+        """Deliver what is pending, then stop the threads."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._delivery.join(timeout=5)
+        self._executor.shutdown(wait=False)
@@ -2,6 +2,7 @@ from .motor import motor_controller
 from .servo import servo_arm, servo_gripper
 from .player import mp3_player
 from .encoder import encoder_tracker
+from .wheel_control import wheel_controller
 
 
-__all__ = ['motor_controller', 'servo_arm', 'servo_gripper', 'mp3_player', 'encoder_tracker']
+__all__ = ['motor_controller', 'servo_arm', 'servo_gripper', 'mp3_player', 'encoder_tracker', 'wheel_controller']
@@ -1,19 +1,58 @@
+import logging
+import threading
+import time
+from collections import deque
 import numpy as np
-from gpiozero import DigitalInputDevice
+from ..simulation import SIMULATION
+from ..utils.pubsub import Topic
+from ..telemetry import Counter, Histogram, tracer
+from ..utils.trajectory_buffer import TrajectoryBuffer
+
+if SIMULATION:
+    from ..simulation.gpio import DigitalInputDevice
+else:
+    from gpiozero import DigitalInputDevice
+
 from .motor import motor_controller  # Import the singleton instance
 
+logger = logging.getLogger(__name__)
+
+ODOMETRY_UPDATES = Counter('odometry_updates_total', 'Odometry integration steps; rate() gives the update rate')
+ODOMETRY_OVERRUNS = Counter('odometry_overruns_total', 'Integration steps that missed their deadline')
+ODOMETRY_STEP_SECONDS = Histogram('odometry_step_seconds', 'Time to integrate and publish one odometry step',
+                                  buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.02))
+
 class EncoderTracker:
-    def __init__(self, left_pin=5, right_pin=6):
+    def __init__(self, left_pin=5, right_pin=6, rate_hz=50, velocity_window=0.25, max_path_points=100_000):
         # Configuration
         self.left_encoder_pin = left_pin
         self.right_encoder_pin = right_pin
-
-        # Temporary counters
-        self.left_count = np.uint32(0)
-        self.right_count = np.uint32(0)
-
-        # Path tracking
-        self.path = np.array([[0, 0, (np.pi/2)]])  # x, y, theta
+        self.rate_hz = rate_hz  # Odometry integration rate
+        self.velocity_window = velocity_window  # Seconds of ticks used for velocity estimates
+
+        # Robot geometry
+        wheel_diameter = 0.065  # meters
+        self.wheel_radius = wheel_diameter / 2
+        self.wheel_distance = 0.15  # meters
+        self.encoder_slots = 20  # number of slots on the encoder
+        self.slot_length = 2 * np.pi * self.wheel_radius / self.encoder_slots
+
+        # Tick timestamps queued by the encoder callbacks. deque.append/popleft are
+        # atomic, so callbacks never block and no tick is lost to a reset race.
+        self._left_ticks = deque(maxlen=10000)
+        self._right_ticks = deque(maxlen=10000)
+        # Recent ticks kept by the integrator for velocity estimation
+        self._recent_left = deque()
+        self._recent_right = deque()
+
+        # Path tracking; older points beyond max_path_points are kept downsampled, in at most
+        # a tenth as many rows so a full resync stays small however long the run
+        self.path = TrajectoryBuffer(columns=4, max_rows=max_path_points,
+                                     max_archive_rows=max_path_points // 10)  # x, y, theta, t
+        self._lock = threading.Lock()
+        self._pose = None
+        self.generation = 0  # Counts resets, so clients can tell a new path from the one they hold
+        self._reset_state()
 
         # Setup encoders with hardware interrupts
         self.left_encoder = DigitalInputDevice(self.left_encoder_pin, pull_up=True, bounce_time=0.001)
@@ -21,55 +60,183 @@ class EncoderTracker:
         self.left_encoder.when_activated = self.left_encoder_callback
         self.right_encoder.when_activated = self.right_encoder_callback
 
+        # Integrate odometry at a fixed rate, independent of any HTTP client
+        self.topic = Topic('encoder-path')
+        self.step_count = 0
+        self.tick_counts = (0, 0)  # Cumulative (left, right) ticks; unaffected by reset()
+        self._integrator_thread = threading.Thread(target=self._integration_loop, daemon=True)
+        self._integrator_thread.start()
+
     def left_encoder_callback(self):
-        self.left_count += 1
+        self._left_ticks.append(time.monotonic())
 
     def right_encoder_callback(self):
-        self.right_count += 1
-
-    def vehicle_path(self):
-        x, y, theta = self.path[-1]  # Get the last state
-
-        if self.left_count > 0 or self.right_count > 0:  # Only update if we have new counts
-            wheel_diameter = 0.065  # meters
-            wheel_radius = wheel_diameter / 2
-            wheel_distance = 0.15  # meters
-            encoder_slots = 20  # number of slots on the encoder
-            dist_center = 0.1  # Distance from the center of the robot to the wheel contact point
-            dw = wheel_distance / 2
+        self._right_ticks.append(time.monotonic())
+
+    def _reset_state(self):
+        now = time.monotonic()
+        self.path.clear()
+        self.path.append([0, 0, (np.pi/2), now])
+        self._recent_left.clear()
+        self._recent_right.clear()
+        self._pose = {'x': 0.0, 'y': 0.0, 'theta': float(np.pi/2), 'v': 0.0, 'omega': 0.0,
+                      'left_rate': 0.0, 'right_rate': 0.0, 't': now, 'cursor': self.path.total,
+                      'generation': self.generation}
+
+    def reset(self):
+        """Reset the pose to the origin and discard pending ticks."""
+        with self._lock:
+            self._left_ticks.clear()
+            self._right_ticks.clear()
+            self.generation += 1
+            self._reset_state()
+            pose = dict(self._pose)
+        self.topic.publish(self._message(pose))
+
+    @staticmethod
+    def _drain(ticks, recent):
+        """Move all queued tick timestamps into recent and return how many there were."""
+        count = 0
+        while True:
+            try:
+                recent.append(ticks.popleft())
+            except IndexError:
+                return count
+            count += 1
+
+    def _tick_rate(self, recent, now):
+        """Ticks per second from the tick timestamps inside the velocity window."""
+        horizon = now - self.velocity_window
+        while recent and recent[0] < horizon:
+            recent.popleft()
+        if len(recent) < 2:
+            return len(recent) / self.velocity_window
+        rate = (len(recent) - 1) / max(recent[-1] - recent[0], 1e-6)
+        # A wheel that is slowing down has gone quiet for longer than its tick interval
+        return min(rate, 1 / max(now - recent[-1], 1e-6))
+
+    def _integration_loop(self):
+        """Integrate encoder ticks at rate_hz and publish pose plus velocity."""
+        period = 1 / self.rate_hz
+        next_step = time.monotonic()
+        while True:
+            next_step += period
+            try:
+                with tracer.span('odometry_step', 'odometry'), ODOMETRY_STEP_SECONDS.time():
+                    self._step()
+                ODOMETRY_UPDATES.inc()
+            except Exception as e:
+                logger.error(f"Error integrating odometry: {e}")
+            delay = next_step - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Overran; skip missed steps instead of bursting to catch up
+                ODOMETRY_OVERRUNS.inc()
+                next_step = time.monotonic()
+
+    def _step(self):
+        with self._lock:
+            now = time.monotonic()
+            left_count = self._drain(self._left_ticks, self._recent_left)
+            right_count = self._drain(self._right_ticks, self._recent_right)
+            self.tick_counts = (self.tick_counts[0] + left_count, self.tick_counts[1] + right_count)
+            pose = self._pose
 
             # Get current motor directions from motor_controller
             left_dir, right_dir = motor_controller.get_current_directions()
+            left_rate = self._tick_rate(self._recent_left, now) * left_dir
+            right_rate = self._tick_rate(self._recent_right, now) * right_dir
+            x, y, theta = pose['x'], pose['y'], pose['theta']
+
+            if left_count or right_count:  # Only extend the path if we have new counts
+                # Calculate distances with direction
+                dL = left_count * self.slot_length * left_dir
+                dR = right_count * self.slot_length * right_dir
+                distance = (dL + dR) / 2
+                delta_theta = (dR - dL) / self.wheel_distance
+
+                # Update position
+                x += distance * np.cos(theta + (delta_theta / 2))
+                y += distance * np.sin(theta + (delta_theta / 2))
+                theta += delta_theta
+
+                # Append the new state to the path
+                self.path.append([x, y, theta, now])
+
+            v_left = left_rate * self.slot_length
+            v_right = right_rate * self.slot_length
+            self._pose = {
+                'x': float(x),
+                'y': float(y),
+                'theta': float(theta),
+                'v': (v_left + v_right) / 2,
+                'omega': (v_right - v_left) / self.wheel_distance,
+                'left_rate': left_rate,
+                'right_rate': right_rate,
+                't': now,
+                'cursor': self.path.total,
+                'generation': self.generation
+            }
+            self.step_count += 1
+            pose = self._pose
+        self.topic.publish(self._message(pose))
+
+    @staticmethod
+    def _message(pose):
+        return {
+            'x': round(pose['x'], 4),
+            'y': round(pose['y'], 4),
+            'theta': round(pose['theta'], 4),
+            'v': round(pose['v'], 4),
+            'omega': round(pose['omega'], 4),
+            'cursor': pose['cursor'],  # Path index after this point, see get_path()
+            'generation': pose['generation']  # Changes on reset(); cursors from before are void
+        }
+
+    def get_pose(self):
+        """Latest integrated pose, velocities (m/s, rad/s) and signed wheel tick rates (ticks/s)."""
+        return dict(self._pose)
+
+    def get_wheel_rates(self):
+        """Signed (left, right) wheel tick rates in ticks per second."""
+        pose = self._pose
+        return pose['left_rate'], pose['right_rate']
+
+    def get_tick_counts(self):
+        """Cumulative (left, right) encoder ticks since start, as of the last integration step."""
+        return self.tick_counts
 
-            # Calculate distances with direction
-            dL = (self.left_count / encoder_slots) * (2 * np.pi * wheel_radius) * left_dir
-            dR = (self.right_count / encoder_slots) * (2 * np.pi * wheel_radius) * right_dir
-            distance = (dL + dR) / 2
-            delta_theta = (dR - dL) / (2 * dw)
-
-            # Update position
-            x += distance * np.cos(theta + (delta_theta / 2))
-            y += distance * np.sin(theta + (delta_theta / 2))
-            theta += delta_theta
-
-            # Append the new state to the path
-            self.path = np.vstack((self.path, [x, y, theta]))
-            
-            # Reset encoder counts
-            self.left_count = self.right_count = np.uint32(0)
-
-        return x, y, theta  # Always return current position
+    def vehicle_path(self):
+        """Current x, y, theta; integration happens on the background thread."""
+        pose = self._pose
+        return pose['x'], pose['y'], pose['theta']
+
+    def get_path(self, since=0):
+        """Path x, y points from global index `since` onward.
+
+        Returns (points, first, cursor); pass cursor back as `since` to get only
+        newer points. first is the global index of points[0], or larger than
+        `since` if those points were compacted away. A full resync (since=0)
+        instead prepends the downsampled archive of compacted points and
+        reports first=0: the points then start at the beginning of the path,
+        but no longer map one-to-one onto global indexes.
+        """
+        with tracer.span('get_path', 'odometry'):
+            rows, first, cursor = self.path.since(since)
+            points = rows[:, :2]
+            if since == 0 and first > 0:
+                points = np.concatenate((self.path.archive()[:, :2], points))
+                first = 0
+        return points, first, cursor
 
     def get_position(self):
         """Get the latest x, y position."""
-        return self.path[-1][:2]  # Return only x and y
-
-    def update_path(self):
-        self.vehicle_path()
+        return self.path.latest()[:2]  # Return only x and y (read-only view)
 
     def __del__(self):
         self.left_encoder.close()
         self.right_encoder.close()
 
 # Initialize the encoder tracker
-encoder_tracker = EncoderTracker()
\ No newline at end of file
+encoder_tracker = EncoderTracker()
@@ -1,4 +1,9 @@
-from gpiozero import PWMOutputDevice
+from ..simulation import SIMULATION
+
+if SIMULATION:
+    from ..simulation.gpio import PWMOutputDevice
+else:
+    from gpiozero import PWMOutputDevice
 
 # Define motor control class
 class motorControl:
@@ -17,6 +22,8 @@ class motorControl:
         # Calculate actual speed for each motor
         self.actual_speed_right = self.speed * self.correction_right #30rpm
         self.actual_speed_left = self.speed * self.correction_left #30rpm
+        # Set by ObstacleReflex; while True any net-forward command stops the motors instead
+        self.forward_blocked = False
 
         self.stop()
 
@@ -29,6 +36,9 @@ class motorControl:
         self.right_motor_direction = 0
 
     def forward(self):
+        if self.forward_blocked:
+            self.stop()
+            return
         self.right_motor_forward.value = self.actual_speed_right
         self.left_motor_forward.value = self.actual_speed_left
         self.right_motor_backward.value = 0
@@ -60,6 +70,34 @@ class motorControl:
         self.left_motor_direction = -1
         self.right_motor_direction = 1
 
+    def set_wheels(self, left, right):
+        """Drive each side at a signed duty cycle in [-1, 1] (before correction)."""
+        if self.forward_blocked and left + right > 0:
+            self.stop()
+            return
+        left = max(-1.0, min(1.0, left)) * self.correction_left
+        right = max(-1.0, min(1.0, right)) * self.correction_right
+        self.left_motor_forward.value = max(0.0, left)
+        self.left_motor_backward.value = max(0.0, -left)
+        self.right_motor_forward.value = max(0.0, right)
+        self.right_motor_backward.value = max(0.0, -right)
+        self.left_motor_direction = (left > 0) - (left < 0)
+        self.right_motor_direction = (right > 0) - (right < 0)
+
+    def drive(self, speed, turn=0.0):
+        """Proportional drive: speed and turn in [-1, 1], positive turn is to the right.
+
+        The sides get speed + turn and speed - turn, scaled down together when
+        either exceeds full duty so the turn ratio is kept.
+        """
+        left = speed + turn
+        right = speed - turn
+        scale = max(1.0, abs(left), abs(right))
+        self.set_wheels(self.speed * left / scale, self.speed * right / scale)
+
+    def is_moving_forward(self):
+        return self.left_motor_direction + self.right_motor_direction > 0
+
     def get_current_directions(self):
         """Get current motor directions"""
         return self.left_motor_direction, self.right_motor_direction
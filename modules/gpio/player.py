@@ -1,34 +1,170 @@
-import pygame
+import os
 import time
+import heapq
+import itertools
+import logging
+import threading
+from ..simulation import SIMULATION
+from ..telemetry import Counter, Histogram
+
+if SIMULATION:
+    from ..simulation import audio as pygame
+else:
+    import pygame
+
+logger = logging.getLogger(__name__)
+
+MP3_FOLDER = os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'mp3'))
+
+# Clip name -> file in MP3_FOLDER, decoded once when the player starts
+CLIPS = {
+    'running_server': 'application_running_v3.mp3',
+    'hello': 'hello_v3.mp3',
+}
+
+# What play() does when something is already playing or queued:
+#   queue        - wait in line (higher priority first, then arrival order)
+#   interrupt    - stop the current clip and play next, ahead of the queue
+#   drop_if_busy - play only if nothing is playing or queued, otherwise drop
+POLICIES = ('queue', 'interrupt', 'drop_if_busy')
+
+AUDIO_REQUESTS = Counter('audio_requests_total', 'Audio play requests by outcome', ['clip', 'outcome'])
+AUDIO_START_DELAY = Histogram('audio_start_delay_seconds', 'Time from play request to playback start')
+
 
 class MP3Player:
-    def __init__(self):
-        """Initialize and play the given MP3 file until it ends."""
-        self.running_server = '/home/ArthurPI5/Projects/GitHub/proj_pi_server/mp3/application_running_v3.mp3'
-        self.hello = '/home/ArthurPI5/Projects/GitHub/proj_pi_server/mp3/hello_v3.mp3'
+    """Plays preloaded clips from a background queue so callers never wait on audio.
+
+    Clips are decoded into mixer Sounds at startup, so starting one is a
+    buffer hand-off rather than a file load. A single worker thread plays one
+    clip at a time and sleeps until it ends or is interrupted.
+    """
+
+    def __init__(self, clips=None, max_queue=8):
+        self.clips = {}
+        self.max_queue = max_queue
+        self.current = None
+        self._channel = None
+        self._queue = []  # heap of (-priority, seq, request)
+        self._seq = itertools.count()
+        self._interrupted = False
+        self._condition = threading.Condition()
 
         # Initialize pygame mixer with the DragonFly audio device
         try:
             pygame.mixer.init()  # Explicitly set the DragonFly device
-            print("Audio initialized with DragonFly device.")
-            self.play_until_end(self.running_server)
+            logger.info("Audio initialized with DragonFly device.")
         except pygame.error as e:
-            print(f"Error initializing audio system: {e}")
+            logger.error(f"Error initializing audio system: {e}")
+            return
+
+        for name, file_name in (clips or CLIPS).items():
+            self.load(name, os.path.join(MP3_FOLDER, file_name))
 
-    def play_until_end(self, file_path):
-        """Plays an MP3 file until it finishes."""
+        self._thread = threading.Thread(target=self._run, name='audio-player', daemon=True)
+        self._thread.start()
+        self.play('running_server')
+
+    @property
+    def enabled(self):
+        return hasattr(self, '_thread')
+
+    def load(self, name, file_path):
+        """Decode a clip once and keep it for play(name)."""
         try:
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
-            print(f'Playing: {file_path}')
-            while pygame.mixer.music.get_busy():
-                time.sleep(1)
+            self.clips[name] = pygame.mixer.Sound(file_path)
+            logger.info(f"Loaded clip '{name}' from {file_path} ({self.clips[name].get_length():.1f}s)")
         except pygame.error as e:
-            print(f"Error playing audio file {file_path}: {e}")
+            logger.error(f"Error loading audio file {file_path}: {e}")
+
+    def play(self, name, priority=0, policy='queue'):
+        """Schedule a clip and return immediately with what happened to the request."""
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {POLICIES}")
+        if name not in self.clips or not self.enabled:
+            AUDIO_REQUESTS.labels(name, 'unavailable').inc()
+            return {'clip': name, 'outcome': 'unavailable'}
+
+        with self._condition:
+            busy = self.current is not None or bool(self._queue)
+            if policy == 'drop_if_busy' and busy:
+                outcome = 'dropped'
+            elif policy == 'queue' and len(self._queue) >= self.max_queue:
+                outcome = 'dropped'
+            else:
+                request = {'clip': name, 'priority': priority, 'requested': time.monotonic()}
+                if policy == 'interrupt':
+                    # Ahead of everything already queued, whatever its priority;
+                    # a newer interrupt replaces one that has not started yet
+                    self._queue = [entry for entry in self._queue if entry[0] != -float('inf')]
+                    heapq.heapify(self._queue)
+                    heapq.heappush(self._queue, (-float('inf'), next(self._seq), request))
+                    self._interrupted = self.current is not None
+                    outcome = 'interrupting' if self._interrupted else 'playing'
+                else:
+                    heapq.heappush(self._queue, (-priority, next(self._seq), request))
+                    outcome = 'queued' if busy else 'playing'
+                self._condition.notify()
+        AUDIO_REQUESTS.labels(name, outcome).inc()
+        return {'clip': name, 'outcome': outcome}
+
+    def stop(self, clear_queue=True):
+        """Stop the current clip and, by default, everything queued behind it."""
+        with self._condition:
+            if clear_queue:
+                self._queue.clear()
+            self._interrupted = self.current is not None
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                _, _, request = heapq.heappop(self._queue)
+                self._interrupted = False
+                try:
+                    self._play(request)
+                except Exception as e:
+                    logger.error(f"Error playing clip {request['clip']}: {e}")
+                finally:
+                    self.current = None
+                    self._channel = None
+
+    def _play(self, request):
+        """Play one clip to its end or an interruption; called with the condition held."""
+        sound = self.clips[request['clip']]
+        self._channel = sound.play()
+        if self._channel is None:
+            # Every mixer channel is busy
+            logger.warning(f"No free audio channel for clip {request['clip']}; skipped")
+            return
+        self.current = request['clip']
+        AUDIO_START_DELAY.observe(time.monotonic() - request['requested'])
+        logger.info(f"Playing: {request['clip']}")
+
+        # Sleep for the clip length; play()/stop() wake us to interrupt
+        ends_at = time.monotonic() + sound.get_length()
+        while not self._interrupted and time.monotonic() < ends_at:
+            self._condition.wait(ends_at - time.monotonic())
+        # The device may lag the nominal length slightly
+        while not self._interrupted and self._channel.get_busy():
+            self._condition.wait(0.05)
+        if self._interrupted:
+            self._channel.stop()
+
+    def get_status(self):
+        with self._condition:
+            return {
+                'enabled': self.enabled,
+                'playing': self.current,
+                'queued': [request['clip'] for _, _, request in sorted(self._queue)],
+                'clips': {name: round(sound.get_length(), 2) for name, sound in self.clips.items()},
+            }
 
     def play_song_one(self):
         """Say Hello!"""
-        self.play_until_end(self.hello)
+        return self.play('hello')
 
 
-mp3_player = MP3Player()
\ No newline at end of file
+mp3_player = MP3Player()
@@ -1,14 +1,44 @@
 import time
 import os
 import logging
+import threading
 from builtins import open
+from ..simulation import SIMULATION
+from ..telemetry import Counter, Histogram, tracer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+if SIMULATION:
+    from ..simulation.sysfs import create_pwm_tree
+    PWM_SYSFS_ROOT = create_pwm_tree()
+else:
+    PWM_SYSFS_ROOT = "/sys/class/pwm"
+
+EASINGS = {
+    'linear': lambda x: x,
+    'ease_in': lambda x: x * x,
+    'ease_out': lambda x: x * (2 - x),
+    'ease_in_out': lambda x: x * x * (3 - 2 * x),  # smoothstep: zero velocity at both ends
+}
+
+SERVO_MOVES = Counter('servo_moves_total', 'Servo moves by how they ended', ['servo', 'outcome'])
+SERVO_STEP_SECONDS = Histogram('servo_step_seconds', 'Time to write one servo duty cycle update', ['servo'],
+                               buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01))
+
 class servoControl:
-    def __init__(self, pwm_chip, pwm_channel, gpio_name, initial_position):
+    """One PWM servo driven by a motion thread that owns its duty_cycle handle.
+
+    move_to() only records the target and returns; the thread samples the
+    trajectory at update_hz and writes each point through a file descriptor
+    kept open for the lifetime of the servo. A new target pre-empts the move
+    in progress, starting from wherever the servo is at that moment.
+    """
+
+    def __init__(self, pwm_chip, pwm_channel, gpio_name, initial_position, name=None,
+                 update_hz=50.0, speed=750000.0, min_duration=0.1):
+        self.name = name or gpio_name
         # Check if required parameters are valid
         if not pwm_chip or not pwm_channel or not gpio_name:
             logger.warning(f"Invalid parameters for servo: pwm_chip={pwm_chip}, pwm_channel={pwm_channel}, gpio_name={gpio_name}. Servo functionality disabled.")
@@ -23,8 +53,6 @@ class servoControl:
         self.down_position = 1500000
         self.closed_position = 2400000
         self.opened_position = 1500000
-        self.current_position_arm = initial_position
-        self.current_position_gripper = initial_position
 
         self.pwm_chip = pwm_chip
         self.pwm_channel = pwm_channel
@@ -32,11 +60,26 @@ class servoControl:
         self.pwm_path = f"{pwm_chip}/{pwm_channel}"
         self.PWM_PERIOD = 20000000  # 20ms period (50Hz frequency)
 
+        # Motion parameters: trajectory sample rate, default speed (duty ns per
+        # second) used when a move gives no duration, and the shortest move
+        self.update_hz = update_hz
+        self.speed = speed
+        self.min_duration = min_duration
+
+        self.position = initial_position
+        self._duty_fd = None
+        self._move = None
+        self._move_id = 0
+        self._last_move = None
+        self._condition = threading.Condition()
+        self._running = True
+
         try:
             # Initialize the PWM channel
             self.export_pwm()
             self.set_period(self.PWM_PERIOD)
             self.enable_pwm()
+            self._duty_fd = os.open(f"{self.pwm_path}/duty_cycle", os.O_WRONLY)
 
             # Move to initial position
             self.set_duty_cycle(initial_position)
@@ -45,6 +88,10 @@ class servoControl:
         except Exception as e:
             logger.error(f"Failed to initialize servo {gpio_name}: {e}")
             self.enabled = False
+            return
+
+        self._thread = threading.Thread(target=self._run, name=f"servo-{self.name}", daemon=True)
+        self._thread.start()
 
     def export_pwm(self):
         if not self.enabled:
@@ -76,8 +123,11 @@ class servoControl:
     def set_duty_cycle(self, duty_ns):
         if not self.enabled:
             return
-        with open(f"{self.pwm_path}/duty_cycle", "w") as f:
-            f.write(str(duty_ns))
+        duty_ns = int(duty_ns)
+        # One pwrite per update on the open handle; sysfs parses each write from
+        # offset 0 and the trailing newline also terminates the value in a plain file
+        os.pwrite(self._duty_fd, f"{duty_ns}\n".encode(), 0)
+        self.position = duty_ns
 
     def enable_pwm(self):
         if not self.enabled:
@@ -91,50 +141,136 @@ class servoControl:
             logger.error(f"Failed to enable PWM channel {self.pwm_channel}: {e}")
             raise
 
-    def smooth_move(self, start, end, steps=10, delay=0.02):
+    def move_to(self, target, duration=None, easing='ease_in_out'):
+        """Start moving toward target (duty ns) and return the move status immediately.
+
+        duration defaults to the distance at self.speed; a move already in
+        progress is pre-empted and the new one starts from the current position.
+        """
         if not self.enabled:
-            logger.warning("Servo functionality is disabled. Cannot perform smooth_move.")
-            return
-        step_size = (end - start) // steps
-        for i in range(steps + 1):
-            try:
-                self.set_duty_cycle(start + i * step_size)
-                time.sleep(delay)
-            except IOError as e:
-                print(f"Error during smooth_move on {self.pwm_path}: {e}")
-                raise
+            logger.warning("Servo functionality is disabled. Cannot move.")
+            return None
+        if easing not in EASINGS:
+            raise ValueError(f"Unknown easing '{easing}', expected one of {sorted(EASINGS)}")
 
-    def arm_up(self):
+        with self._condition:
+            start = self.position
+            if duration is None:
+                duration = abs(int(target) - start) / self.speed
+            if self._move is not None:
+                self._finish(self._move, 'preempted')
+            self._move_id += 1
+            self._move = {
+                'id': self._move_id,
+                'start': start,
+                'target': int(target),
+                'duration': max(float(duration), self.min_duration),
+                'easing': easing,
+                'started': time.monotonic(),
+                'progress': 0.0,
+                'state': 'moving',
+            }
+            self._condition.notify()
+            return self.get_status()
+
+    def stop(self):
+        """Hold the servo where it is, abandoning the current move."""
         if not self.enabled:
-            logger.warning("Servo functionality is disabled. Cannot move arm up.")
             return
-        self.smooth_move(self.current_position_arm, self.up_position)
-        self.current_position_arm = self.up_position
+        with self._condition:
+            if self._move is not None:
+                self._finish(self._move, 'stopped')
+                self._move = None
+                self._condition.notify_all()  # Wake the move loop and wait()
 
-    def arm_down(self):
+    def wait(self, timeout=None):
+        """Block until the current move finishes; returns False on timeout."""
         if not self.enabled:
-            logger.warning("Servo functionality is disabled. Cannot move arm down.")
-            return
-        self.smooth_move(self.current_position_arm, self.down_position)
-        self.current_position_arm = self.down_position
+            return True
+        with self._condition:
+            return self._condition.wait_for(lambda: self._move is None, timeout)
 
-    def close_gripper(self):
+    def _finish(self, move, state):
+        move['state'] = state
+        self._last_move = move
+        SERVO_MOVES.labels(self.name, state).inc()
+
+    def _run(self):
+        period = 1.0 / self.update_hz
+        while self._running:
+            with self._condition:
+                while self._move is None and self._running:
+                    self._condition.wait()
+                move = self._move
+                if move is None:
+                    continue
+                elapsed = time.monotonic() - move['started']
+                progress = min(elapsed / move['duration'], 1.0)
+                position = move['start'] + (move['target'] - move['start']) * EASINGS[move['easing']](progress)
+                move['progress'] = progress
+                try:
+                    with tracer.span('servo_step', 'servo', servo=self.name), \
+                            SERVO_STEP_SECONDS.labels(self.name).time():
+                        self.set_duty_cycle(round(position))
+                except OSError as e:
+                    logger.error(f"Error moving servo {self.name} on {self.pwm_path}: {e}")
+                    self._finish(move, 'failed')
+                    self._move = None
+                    self._condition.notify_all()
+                    continue
+                if progress >= 1.0:
+                    self._finish(move, 'done')
+                    self._move = None
+                    self._condition.notify_all()
+                    continue
+                # Sleep until the next sample, waking early if a new target arrives
+                self._condition.wait(period)
+
+    def get_status(self):
         if not self.enabled:
-            logger.warning("Servo functionality is disabled. Cannot close gripper.")
-            return
-        self.smooth_move(self.current_position_gripper, self.closed_position)
-        self.current_position_gripper = self.closed_position
+            return {'name': self.name, 'enabled': False}
+        with self._condition:
+            move = self._move or self._last_move
+            status = {
+                'name': self.name,
+                'enabled': True,
+                'position': self.position,
+                'moving': self._move is not None,
+            }
+            if move is not None:
+                status.update({
+                    'move_id': move['id'],
+                    'target': move['target'],
+                    'progress': round(move['progress'], 3),
+                    'duration': move['duration'],
+                    'easing': move['easing'],
+                    'state': move['state'],
+                })
+            return status
+
+    def arm_up(self):
+        return self.move_to(self.up_position)
+
+    def arm_down(self):
+        return self.move_to(self.down_position)
+
+    def close_gripper(self):
+        return self.move_to(self.closed_position)
 
     def open_gripper(self):
-        if not self.enabled:
-            logger.warning("Servo functionality is disabled. Cannot open gripper.")
-            return
-        self.smooth_move(self.current_position_gripper, self.opened_position)
-        self.current_position_gripper = self.opened_position
+        return self.move_to(self.opened_position)
 
-    def __del__(self):
+    def cleanup(self):
         if not self.enabled:
             return
+        with self._condition:
+            self._running = False
+            self._move = None
+            self._condition.notify_all()
+        self._thread.join(timeout=1.0)
+        self.enabled = False
+
+        os.close(self._duty_fd)
         with open(f"{self.pwm_path}/enable", "w") as f:
             f.write("0")
 
@@ -143,17 +279,19 @@ class servoControl:
             f.write(channel_number)
 
 servo_arm = servoControl(
-    pwm_chip="/sys/class/pwm/pwmchip0",
+    pwm_chip=f"{PWM_SYSFS_ROOT}/pwmchip0",
     pwm_channel="pwm2",
     gpio_name="GPIO18",
-    initial_position=1500000
+    initial_position=1500000,
+    name="arm"
 )
 
 servo_gripper = servoControl(
-    pwm_chip="/sys/class/pwm/pwmchip0",
+    pwm_chip=f"{PWM_SYSFS_ROOT}/pwmchip0",
     pwm_channel="pwm3",
     gpio_name="GPIO19",
-    initial_position=1500000
+    initial_position=1500000,
+    name="gripper"
 )
 
 if not servo_arm.enabled:
@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from ..telemetry import Gauge, Histogram, tracer
+from .motor import motor_controller
+from .encoder import encoder_tracker
+
+logger = logging.getLogger(__name__)
+
+WHEEL_LOOP_JITTER = Histogram('wheel_control_jitter_seconds', 'Lateness of each wheel control step past its deadline',
+                              buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05))
+WHEEL_TRACKING_ERROR = Gauge('wheel_control_tracking_error_mps', 'RMS wheel speed tracking error', ['wheel'])
+
+
+class PID:
+    """Textbook PID with integral clamping and derivative on the measurement."""
+
+    def __init__(self, kp, ki, kd=0.0, integral_limit=0.5):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.integral_limit = integral_limit
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self._last_measurement = None
+
+    def update(self, setpoint, measurement, dt):
+        error = setpoint - measurement
+        self.integral = max(-self.integral_limit, min(self.integral_limit, self.integral + self.ki * error * dt))
+        derivative = 0.0
+        if self._last_measurement is not None and dt > 0:
+            # Derivative of the measurement, not the error, so setpoint steps don't kick
+            derivative = -(measurement - self._last_measurement) / dt
+        self._last_measurement = measurement
+        return self.kp * error + self.integral + self.kd * derivative
+
+
+class WheelSpeedController:
+    """Closed-loop per-wheel speed control on top of motorControl and EncoderTracker.
+
+    set_velocity(v, omega) takes a body velocity (m/s) and turn rate (rad/s).
+    The loop ramps its reference toward that setpoint within max_accel and
+    max_angular_accel, splits it into left/right wheel tick rates, and drives
+    each wheel with feedforward (tick rate over full_duty_rate) plus PID on
+    the measured rate. Steps run on absolute deadlines at rate_hz; a late
+    step is recorded as jitter and the schedule restarts rather than
+    bursting. The loop only writes to the motors while engaged, so the
+    open-loop controls keep working when nobody uses it.
+    """
+
+    def __init__(self, motors, encoders, rate_hz=20, kp=0.04, ki=0.15, kd=0.0,
+                 full_duty_rate=10.0, max_accel=0.2, max_angular_accel=2.0):
+        self.motors = motors
+        self.encoders = encoders
+        self.rate_hz = rate_hz
+        self.full_duty_rate = full_duty_rate  # Tick rate at duty 1.0, for feedforward
+        self.max_accel = max_accel  # m/s^2
+        self.max_angular_accel = max_angular_accel  # rad/s^2
+        self.pids = {'left': PID(kp, ki, kd), 'right': PID(kp, ki, kd)}
+
+        self.engaged = False
+        self._setpoint = (0.0, 0.0)  # v, omega as commanded
+        self._reference = (0.0, 0.0)  # v, omega after ramping
+        self._lock = threading.Lock()
+        self._state = {'left': {}, 'right': {}}
+        self._squared_error = {'left': 0.0, 'right': 0.0}
+        self.jitter = {'last': 0.0, 'max': 0.0, 'mean': 0.0}
+        self.overruns = 0
+        self.steps = 0
+        WHEEL_TRACKING_ERROR.set_function(lambda: {
+            (wheel,): value ** 0.5 * self.encoders.slot_length for wheel, value in self._squared_error.items()})
+
+        self._thread = threading.Thread(target=self._run, name='wheel-control', daemon=True)
+        self._thread.start()
+
+    def set_velocity(self, v, omega=0.0):
+        """Engage the loop and ramp toward v (m/s) and omega (rad/s)."""
+        with self._lock:
+            if not self.engaged:
+                for pid in self.pids.values():
+                    pid.reset()
+                self._reference = (0.0, 0.0)
+                self.engaged = True
+            self._setpoint = (float(v), float(omega))
+
+    def release(self):
+        """Hand the motors back to open-loop control, stopping them if the loop had them."""
+        with self._lock:
+            if not self.engaged:
+                return
+            self.engaged = False
+            self._setpoint = self._reference = (0.0, 0.0)
+        self.motors.stop()
+
+    @staticmethod
+    def _ramp(current, target, max_step):
+        return current + max(-max_step, min(max_step, target - current))
+
+    def _run(self):
+        period = 1 / self.rate_hz
+        next_step = time.monotonic()
+        last = next_step
+        while True:
+            next_step += period
+            delay = next_step - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.monotonic()
+            lateness = max(0.0, now - next_step)
+            if lateness > period:
+                # Missed whole steps; run this one and restart the schedule from now
+                self.overruns += 1
+                next_step = now
+            self._record_jitter(lateness)
+            try:
+                with tracer.span('wheel_control_step', 'control'):
+                    self._step(now - last)
+            except Exception as e:
+                logger.error(f"Wheel control step failed: {e}")
+            last = now
+
+    def _record_jitter(self, lateness):
+        WHEEL_LOOP_JITTER.observe(lateness)
+        self.steps += 1
+        self.jitter['last'] = lateness
+        self.jitter['max'] = max(self.jitter['max'], lateness)
+        self.jitter['mean'] += (lateness - self.jitter['mean']) / min(self.steps, 100)
+
+    def _step(self, dt):
+        with self._lock:
+            if not self.engaged:
+                return
+            (v_cmd, omega_cmd), (v_ref, omega_ref) = self._setpoint, self._reference
+            v_ref = self._ramp(v_ref, v_cmd, self.max_accel * dt)
+            omega_ref = self._ramp(omega_ref, omega_cmd, self.max_angular_accel * dt)
+            self._reference = (v_ref, omega_ref)
+
+        half_track = self.encoders.wheel_distance / 2
+        targets = {
+            'left': (v_ref - omega_ref * half_track) / self.encoders.slot_length,
+            'right': (v_ref + omega_ref * half_track) / self.encoders.slot_length,
+        }
+        measured = dict(zip(('left', 'right'), self.encoders.get_wheel_rates()))
+        duty = {}
+        for wheel, target in targets.items():
+            if target == 0:
+                # Hold still without integrating the decay of the last motion
+                self.pids[wheel].reset()
+                duty[wheel] = 0.0
+            else:
+                duty[wheel] = target / self.full_duty_rate + self.pids[wheel].update(target, measured[wheel], dt)
+                if duty[wheel] * target < 0:
+                    # Never reverse a wheel to brake; the encoders can't see direction changes
+                    duty[wheel] = 0.0
+            error = target - measured[wheel]
+            self._squared_error[wheel] += (error * error - self._squared_error[wheel]) * 0.05
+            self._state[wheel] = {'target': target, 'measured': measured[wheel], 'duty': max(-1.0, min(1.0, duty[wheel]))}
+
+        with self._lock:
+            if self.engaged:
+                self.motors.set_wheels(duty['left'], duty['right'])
+
+    def get_status(self):
+        slot = self.encoders.slot_length
+        return {
+            'engaged': self.engaged,
+            'setpoint': {'v': self._setpoint[0], 'omega': self._setpoint[1]},
+            'reference': {'v': round(self._reference[0], 4), 'omega': round(self._reference[1], 4)},
+            'wheels': {wheel: {'target_mps': round(state.get('target', 0.0) * slot, 4),
+                               'measured_mps': round(state.get('measured', 0.0) * slot, 4),
+                               'duty': round(state.get('duty', 0.0), 3),
+                               'rms_error_mps': round(self._squared_error[wheel] ** 0.5 * slot, 4)}
+                       for wheel, state in self._state.items()},
+            'rate_hz': self.rate_hz,
+            'jitter_ms': {key: round(value * 1000, 3) for key, value in self.jitter.items()},
+            'overruns': self.overruns,
+        }
+
+
+wheel_controller = WheelSpeedController(motor_controller, encoder_tracker)
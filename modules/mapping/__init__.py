@@ -0,0 +1,14 @@
+"""
+Mapping Package
+
+Occupancy-grid mapping from odometry and the forward range sensors. grid.py
+holds a sparse tiled log-odds grid with vectorised ray updates and encodes
+changed tiles as PNG images or compact binary deltas; builder.py feeds it
+each sensor reading at the current EncoderTracker pose.
+"""
+
+from .grid import OccupancyGrid, DELTA_MAGIC, DELTA_HEADER, TILE_HEADER, LOGODDS_SCALE
+from .builder import MapBuilder, SENSOR_BEAMS, map_builder
+
+__all__ = ['OccupancyGrid', 'DELTA_MAGIC', 'DELTA_HEADER', 'TILE_HEADER', 'LOGODDS_SCALE',
+           'MapBuilder', 'SENSOR_BEAMS', 'map_builder']
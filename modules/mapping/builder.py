@@ -0,0 +1,66 @@
+import logging
+import math
+from typing import Dict, Optional
+from ..telemetry import Histogram, tracer
+from ..utils.pubsub import Topic
+from ..gpio import encoder_tracker
+from ..sensor_interface import sensor_interface
+from .grid import OccupancyGrid
+
+logger = logging.getLogger(__name__)
+
+MAP_UPDATE_SECONDS = Histogram('map_update_seconds', 'Time to integrate one sensor reading into the map',
+                               buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025))
+
+# Per sensor: usable range in meters and beam cone in degrees (HC-SR04 ~15°, VL53L0X ~25°)
+SENSOR_BEAMS: Dict[str, Dict] = {
+    'ultrasonic': {'max_range': 4.0, 'beam_width': 15.0, 'rays': 7},
+    'lidar': {'max_range': 1.0, 'beam_width': 25.0, 'rays': 9},
+}
+
+
+class MapBuilder:
+    """Feeds each SensorInterface reading, at the current odometry pose, into an OccupancyGrid.
+
+    Runs as a listener on the sensor topic, so every new reading is mapped
+    once, on the sensor thread, right after it is taken. A reading past the
+    sensor's range ("Out of range") clears the whole beam without marking a hit.
+    """
+
+    def __init__(self, sensors, encoders, grid: Optional[OccupancyGrid] = None, beams: Optional[Dict] = None):
+        self.sensors = sensors
+        self.encoders = encoders
+        self.grid = grid or OccupancyGrid()
+        self.beams = beams or SENSOR_BEAMS
+        self.enabled = True
+        self.topic = Topic('map')  # Grid version after each update, for dashboards to poll tiles
+        sensors.topic.add_listener(self._on_reading)
+
+    def _on_reading(self, reading: dict) -> None:
+        if not self.enabled:
+            return
+        pose = self.encoders.get_pose()
+        with tracer.span('map_update', 'mapping'), MAP_UPDATE_SECONDS.time():
+            for sensor, beam in self.beams.items():
+                distance = reading.get(sensor, {}).get('distance')
+                if isinstance(distance, (int, float)):
+                    if distance < 0:
+                        continue  # Read error
+                    meters, hit = distance / 100, distance / 100 < beam['max_range']
+                elif distance == "Out of range":
+                    meters, hit = beam['max_range'], False
+                else:
+                    continue
+                self.grid.integrate(pose['x'], pose['y'], pose['theta'], min(meters, beam['max_range']), hit,
+                                    beam_width=math.radians(beam['beam_width']), rays=beam['rays'])
+        self.topic.publish({'version': self.grid.version, 'cleared_at': self.grid.cleared_at})
+
+    def reset(self) -> None:
+        self.grid.clear()
+        self.topic.publish({'version': self.grid.version, 'cleared_at': self.grid.cleared_at})
+
+    def get_status(self) -> dict:
+        return {'enabled': self.enabled, **self.grid.get_stats()}
+
+
+map_builder = MapBuilder(sensor_interface, encoder_tracker)
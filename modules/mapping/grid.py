@@ -0,0 +1,179 @@
+import struct
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+
+# Binary delta layout (little-endian): header, then per tile a record header and
+# the zlib-compressed tile as int8 log-odds scaled by LOGODDS_SCALE, row-major
+# with row 0 at the tile's lowest y.
+DELTA_MAGIC = b'OGD1'
+DELTA_HEADER = struct.Struct('<4sIIfHH')  # magic, version, cleared_at, resolution, tile_size, tile count
+TILE_HEADER = struct.Struct('<iiII')  # tx, ty, tile version, compressed length
+LOGODDS_SCALE = 16  # int8 steps per unit of log-odds
+
+# PNG colours (BGR): occupied cells in the dashboard accent colour, free cells faint white
+OCCUPIED_BGR = (21, 219, 255)
+FREE_BGR = (255, 255, 255)
+FREE_ALPHA = 70
+
+
+class OccupancyGrid:
+    """Sparse log-odds occupancy grid stored as fixed-size square tiles.
+
+    Tiles are created the first time a ray touches them, so memory follows the
+    explored area rather than a preset map size. Every update bumps a global
+    version and stamps it on the tiles it changed; clients pass the last
+    version they saw to fetch only newer tiles.
+    """
+
+    def __init__(self, resolution: float = 0.02, tile_size: int = 64, hit: float = 0.85, miss: float = -0.4,
+                 clamp: Tuple[float, float] = (-4.0, 4.0)):
+        self.resolution = resolution  # meters per cell
+        self.tile_size = tile_size  # cells per tile side
+        self.hit = hit
+        self.miss = miss
+        self.clamp = clamp
+        self.tiles: Dict[Tuple[int, int], np.ndarray] = {}
+        self.tile_versions: Dict[Tuple[int, int], int] = {}
+        self.version = 0
+        self.cleared_at = 0  # Version of the last clear(); clients older than it start over
+        self.updates = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _pack(cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+        # One int64 per cell so de-duplication is a 1-D unique instead of a row-wise one
+        return (cx.astype(np.int64) << 32) + (cy.astype(np.int64) + (1 << 31))
+
+    @staticmethod
+    def _unpack(keys: np.ndarray) -> np.ndarray:
+        return np.stack((keys >> 32, (keys & 0xFFFFFFFF) - (1 << 31)), axis=1)
+
+    def _trace(self, origin, angles, ranges, hits):
+        """Cells crossed by each ray (free) and the end cells of rays that hit (occupied)."""
+        step = self.resolution / 2
+        steps = np.arange(0.0, ranges.max() + step, step)
+        # One row per ray, samples past that ray's range are masked out
+        inside = steps[None, :] < ranges[:, None]
+        xs = origin[0] + np.cos(angles)[:, None] * steps[None, :]
+        ys = origin[1] + np.sin(angles)[:, None] * steps[None, :]
+        free = np.unique(self._pack(np.floor(xs[inside] / self.resolution), np.floor(ys[inside] / self.resolution)))
+        end_x = origin[0] + np.cos(angles[hits]) * ranges[hits]
+        end_y = origin[1] + np.sin(angles[hits]) * ranges[hits]
+        occupied = np.unique(self._pack(np.floor(end_x / self.resolution), np.floor(end_y / self.resolution)))
+        if len(occupied):
+            # A cell holding an end point is not cleared by the ray that ends in it
+            free = free[~np.isin(free, occupied, assume_unique=True)]
+        return self._unpack(free), self._unpack(occupied)
+
+    def integrate(self, x: float, y: float, theta: float, distance: float, hit: bool = True,
+                  beam_width: float = 0.0, rays: int = 1) -> int:
+        """Update the grid with one range reading taken at pose (x, y, theta).
+
+        distance is in meters. With hit=False (nothing within range) the beam
+        only clears cells. A beam_width in radians spreads `rays` rays across
+        the sensor cone. Returns the new grid version.
+        """
+        if distance <= 0:
+            return self.version
+        angles = theta + (np.linspace(-beam_width / 2, beam_width / 2, rays) if rays > 1 else np.zeros(1))
+        ranges = np.full(len(angles), float(distance))
+        hits = np.full(len(angles), bool(hit))
+        free, occupied = self._trace((x, y), angles, ranges, hits)
+
+        with self._lock:
+            self.version += 1
+            self.updates += 1
+            self._apply(free, self.miss)
+            self._apply(occupied, self.hit)
+            return self.version
+
+    def _apply(self, cells: np.ndarray, delta: float) -> None:
+        if not len(cells):
+            return
+        tile_keys = np.floor_divide(cells, self.tile_size)
+        local = cells - tile_keys * self.tile_size
+        # Group cells by tile so each tile gets one vectorised update
+        keys, inverse = np.unique(self._pack(tile_keys[:, 0], tile_keys[:, 1]), return_inverse=True)
+        for index, (tx, ty) in enumerate(self._unpack(keys)):
+            key = (int(tx), int(ty))
+            tile = self.tiles.get(key)
+            if tile is None:
+                tile = self.tiles[key] = np.zeros((self.tile_size, self.tile_size), dtype=np.float32)
+            mine = local[inverse == index]
+            rows, cols = mine[:, 1], mine[:, 0]
+            tile[rows, cols] = np.clip(tile[rows, cols] + delta, *self.clamp)
+            self.tile_versions[key] = self.version
+
+    def changed_since(self, version: int = 0) -> List[Tuple[int, int, int]]:
+        """(tx, ty, tile version) of tiles changed after `version`."""
+        with self._lock:
+            return sorted((tx, ty, v) for (tx, ty), v in self.tile_versions.items() if v > version)
+
+    def tile(self, tx: int, ty: int) -> Optional[np.ndarray]:
+        with self._lock:
+            tile = self.tiles.get((tx, ty))
+            return None if tile is None else tile.copy()
+
+    def probability(self, tx: int, ty: int) -> Optional[np.ndarray]:
+        """Occupancy probability of a tile's cells (0.5 = unknown)."""
+        tile = self.tile(tx, ty)
+        return None if tile is None else 1.0 / (1.0 + np.exp(-tile))
+
+    def tile_png(self, tx: int, ty: int) -> Optional[bytes]:
+        """Tile as a BGRA PNG with north up: occupied cells opaque, free cells faint, unknown transparent."""
+        p = self.probability(tx, ty)
+        if p is None:
+            return None
+        p = np.flipud(p)  # Image rows run top-down, tile rows bottom-up
+        image = np.zeros(p.shape + (4,), dtype=np.uint8)
+        occupied = p > 0.5
+        image[occupied, :3] = OCCUPIED_BGR
+        image[~occupied, :3] = FREE_BGR
+        image[..., 3] = np.where(occupied, (p - 0.5) * 2 * 255, (0.5 - p) * 2 * FREE_ALPHA).astype(np.uint8)
+        success, buffer = cv2.imencode('.png', image)
+        return buffer.tobytes() if success else None
+
+    def delta(self, since: int = 0) -> bytes:
+        """All tiles changed after `since`, packed in the binary delta format above."""
+        # One snapshot under the lock, so the header version covers exactly these tiles
+        # even if a clear() or integrate() lands while they are compressed
+        with self._lock:
+            changed = sorted(((tx, ty, v, self.tiles[tx, ty].copy())
+                              for (tx, ty), v in self.tile_versions.items() if v > since),
+                             key=lambda record: record[:3])
+            version, cleared_at = self.version, self.cleared_at
+        records = []
+        for tx, ty, tile_version, tile in changed:
+            quantized = np.clip(np.round(tile * LOGODDS_SCALE), -127, 127).astype(np.int8)
+            payload = zlib.compress(quantized.tobytes(), 6)
+            records.append(TILE_HEADER.pack(tx, ty, tile_version, len(payload)) + payload)
+        header = DELTA_HEADER.pack(DELTA_MAGIC, version, cleared_at, self.resolution, self.tile_size, len(records))
+        return header + b''.join(records)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.tiles.clear()
+            self.tile_versions.clear()
+            self.version += 1
+            self.cleared_at = self.version
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            tile_size_m = self.tile_size * self.resolution
+            keys = list(self.tiles)
+            return {
+                'version': self.version,
+                'cleared_at': self.cleared_at,
+                'updates': self.updates,
+                'resolution': self.resolution,
+                'tile_size': self.tile_size,
+                'tiles': len(keys),
+                'memory_bytes': len(keys) * self.tile_size * self.tile_size * 4,
+                'bounds': None if not keys else {
+                    'x_min': min(k[0] for k in keys) * tile_size_m, 'x_max': (max(k[0] for k in keys) + 1) * tile_size_m,
+                    'y_min': min(k[1] for k in keys) * tile_size_m, 'y_max': (max(k[1] for k in keys) + 1) * tile_size_m,
+                },
+            }
@@ -2,62 +2,131 @@ from .cpu import CPUMonitor
 from .memory import MemoryMonitor
 from .temperature import TemperatureMonitor
 from .system_info import get_cpu_info, get_memory_info, format_memory_size
+from .governor import ThermalGovernor
+from ..utils.pubsub import Topic
+from ..telemetry import Gauge
+import json
+import logging
+import threading
 import time
+from dataclasses import dataclass
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_CPU_PERCENT = Gauge('system_cpu_usage_percent', 'CPU usage from the latest SystemMonitor snapshot')
+SYSTEM_MEMORY_PERCENT = Gauge('system_memory_usage_percent', 'RAM usage from the latest SystemMonitor snapshot')
+SYSTEM_TEMPERATURE = Gauge('system_temperature_celsius', 'CPU temperature from the latest SystemMonitor snapshot')
+SYSTEM_CPU_FREQUENCY = Gauge('system_cpu_frequency_mhz', 'CPU frequency from the latest SystemMonitor snapshot')
+
+@dataclass(frozen=True)
+class SystemSnapshot:
+    """One sample of every system statistic, shared read-only by all readers"""
+    timestamp: float
+    stats: dict       # Full statistics with history, as returned by get_stats()
+    minimal: dict     # Current values only, as published to /system-events
+    stats_json: str   # stats serialized once for /api/system-stats
 
 class SystemMonitor:
-    def __init__(self):
+    def __init__(self, sample_interval=1.0):
         self.cpu = CPUMonitor()
         self.memory = MemoryMonitor()
         self.temperature = TemperatureMonitor()
-        self.last_update = 0
-        self.update_interval = 0.5  # 500ms minimum between updates
-    
-    def get_stats(self):
-        """Get current system statistics"""
+
+        # One sampler thread reads psutil/sysfs per interval; readers only fetch the snapshot
+        self.topic = Topic('system-events')
+        self.sample_interval = sample_interval
+        self._snapshot = self._sample()
+        SYSTEM_CPU_PERCENT.set_function(lambda: self._snapshot.minimal['cpu']['usage'])
+        SYSTEM_MEMORY_PERCENT.set_function(lambda: self._snapshot.minimal['memory']['percent'])
+        SYSTEM_TEMPERATURE.set_function(lambda: self._snapshot.minimal['temperature'])
+        SYSTEM_CPU_FREQUENCY.set_function(lambda: self._snapshot.minimal['cpu']['frequency'])
+        self._sample_thread = threading.Thread(target=self._sample_loop, daemon=True)
+        self._sample_thread.start()
+
+    def _sample_loop(self):
+        """Take a snapshot on a fixed schedule and publish its minimal stats."""
+        next_run = time.monotonic() + self.sample_interval
+        while True:
+            time.sleep(max(0.0, next_run - time.monotonic()))
+            next_run += self.sample_interval
+            try:
+                self._snapshot = self._sample()
+                self.topic.publish(self._snapshot.minimal)
+            except Exception as e:
+                logger.error(f"Error sampling system stats: {e}")
+
+    def _sample(self):
+        """Read every statistic exactly once and build an immutable snapshot"""
         current_time = time.time()
-        
-        # Throttle updates
-        if current_time - self.last_update < self.update_interval:
-            return None
-            
-        self.last_update = current_time
-        
-        return {
+        memory = self.memory.sample()
+        cpu_usage = self.cpu.get_usage()
+        temperature = self.temperature.get_temperature()
+
+        stats = {
             'cpu': {
-                'usage': self.cpu.get_usage(),
+                'usage': cpu_usage,
                 'history': self.cpu.get_history()
             },
             'memory': {
-                'usage': self.memory.get_usage(),
+                'usage': self.memory.last_usage,
                 'history': self.memory.get_history(),
-                'details': self.memory.get_detailed_info()
+                'details': self.memory.get_detailed_info(memory)
             },
             'temperature': {
-                'value': self.temperature.get_temperature(),
+                'value': temperature,
                 'history': self.temperature.get_history(),
-                'is_critical': self.temperature.is_critical()
+                'is_critical': self.temperature.is_critical(temperature)
             },
             'timestamp': current_time
         }
-    
-    def get_minimal_stats(self):
-        """Get current values with detailed system information"""
-        # Get CPU information
+
+        # Get CPU information (core counts are cached)
         cpu_info = get_cpu_info()
-        cpu_info['usage'] = self.cpu.get_usage()
-        
-        # Get memory information with percentage
-        memory_info = get_memory_info()
-        memory_usage = self.memory.get_usage()  # Get current usage percentage
-        
+        cpu_info['usage'] = cpu_usage
+
         # Convert to human readable format
+        memory_info = get_memory_info(memory)
         memory_info['total_formatted'] = format_memory_size(memory_info['total'])
         memory_info['used_formatted'] = format_memory_size(memory_info['used'])
         memory_info['free_formatted'] = format_memory_size(memory_info['free'])
-        memory_info['percent'] = memory_usage  # Ensure percentage is included
-        
-        return {
+        memory_info['percent'] = self.memory.last_usage  # Ensure percentage is included
+
+        minimal = {
             'cpu': cpu_info,
             'memory': memory_info,
-            'temperature': self.temperature.get_temperature()
+            'temperature': temperature
         }
+        return SystemSnapshot(current_time, stats, minimal, json.dumps(stats))
+
+    @property
+    def snapshot(self):
+        """Latest snapshot; replaced atomically, never mutated"""
+        return self._snapshot
+
+    def get_stats(self):
+        """Get current system statistics"""
+        return self._snapshot.stats
+
+    def get_history(self, metric, start=None, end=None, resolution=None):
+        """Timestamped min/mean/max history of 'cpu', 'memory' or 'temperature'"""
+        buffers = {
+            'cpu': self.cpu.usage_buffer,
+            'memory': self.memory.usage_buffer,
+            'temperature': self.temperature.temp_buffer
+        }
+        if metric not in buffers:
+            raise ValueError(f"metric must be one of {', '.join(buffers)}")
+        history = buffers[metric].query(start, end, resolution)
+        return {
+            'metric': metric,
+            'resolution': history['resolution'],
+            't': history['t'].tolist(),
+            'min': np.round(history['min'], 2).tolist(),
+            'mean': np.round(history['mean'], 2).tolist(),
+            'max': np.round(history['max'], 2).tolist()
+        }
+
+    def get_minimal_stats(self):
+        """Get current values with detailed system information"""
+        return self._snapshot.minimal
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+import logging
+from typing import Dict, List, Optional
+from ..utils.pubsub import Topic
+from ..telemetry import Gauge
+
+logger = logging.getLogger(__name__)
+
+THERMAL_LEVEL = Gauge('thermal_governor_level', 'Current thermal degradation level (0 = normal)')
+
+# Raspberry Pi firmware throttling flags (get_throttled / vcgencmd get_throttled)
+THROTTLE_FLAGS = {
+    0x1: 'under-voltage',
+    0x2: 'arm frequency capped',
+    0x4: 'throttled',
+    0x8: 'soft temperature limit',
+}
+
+# Levels are entered at enter_temp (or while the firmware throttles, up to
+# throttle_level) and left once the temperature is back under exit_temp.
+# Limits apply to VideoStream (fps, jpeg_quality, inference_interval, ai) and
+# SensorInterface (sensor_interval); missing keys mean "no limit".
+DEFAULT_LEVELS: List[Dict] = [
+    {'name': 'normal'},
+    {'name': 'reduced_inference', 'enter_temp': 70.0, 'exit_temp': 65.0, 'inference_interval': 3},
+    {'name': 'reduced_video', 'enter_temp': 75.0, 'exit_temp': 70.0, 'inference_interval': 5,
+     'fps': 15, 'jpeg_quality': 60},
+    {'name': 'ai_off', 'enter_temp': 80.0, 'exit_temp': 75.0, 'ai': False, 'fps': 10, 'jpeg_quality': 50,
+     'sensor_interval': 1.0},
+]
+
+
+class ThermalGovernor:
+    """Step video, AI and sensor workloads down as the Pi heats up, and back up as it cools.
+
+    Temperature, CPU frequency and the firmware throttling flags are read from
+    sysfs every check_interval seconds. The level moves at most one step per
+    check and stays put for at least min_dwell seconds, so a temperature
+    hovering around a threshold does not make the stream oscillate.
+    """
+
+    def __init__(self, video_stream=None, sensor_interface=None, levels: Optional[List[Dict]] = None,
+                 check_interval: float = 2.0, min_dwell: float = 10.0, throttle_level: int = 2,
+                 sysfs_root: str = '/sys'):
+        self.video_stream = video_stream
+        self.sensor_interface = sensor_interface
+        self.levels = levels or DEFAULT_LEVELS
+        self.check_interval = check_interval
+        self.min_dwell = min_dwell
+        self.throttle_level = min(throttle_level, len(self.levels) - 1)
+
+        self.temp_path = os.path.join(sysfs_root, 'class/thermal/thermal_zone0/temp')
+        self.freq_path = os.path.join(sysfs_root, 'devices/system/cpu/cpu0/cpufreq/scaling_cur_freq')
+        self.max_freq_path = os.path.join(sysfs_root, 'devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq')
+        self.throttled_path = os.path.join(sysfs_root, 'devices/platform/soc/soc:firmware/get_throttled')
+
+        self.level = 0
+        self.reason = 'normal operation'
+        self.readings = {}
+        self._changed_at = None
+        self._lock = threading.Lock()
+        self.topic = Topic('thermal-governor')
+        THERMAL_LEVEL.set_function(lambda: self.level)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _read_number(path: str, base: int = 10) -> Optional[int]:
+        try:
+            with open(path) as f:
+                return int(f.read().strip(), base)
+        except (OSError, ValueError):
+            return None
+
+    def read_sensors(self) -> dict:
+        """Current temperature (°C), CPU frequency (MHz) and active throttling flags."""
+        temp = self._read_number(self.temp_path)
+        freq = self._read_number(self.freq_path)
+        max_freq = self._read_number(self.max_freq_path)
+        throttled = self._read_number(self.throttled_path, 16)
+        return {
+            'temperature': round(temp / 1000.0, 1) if temp is not None else None,
+            'frequency': round(freq / 1000.0) if freq is not None else None,
+            'max_frequency': round(max_freq / 1000.0) if max_freq is not None else None,
+            'throttled': [name for bit, name in THROTTLE_FLAGS.items() if throttled and throttled & bit],
+        }
+
+    def _run(self):
+        next_check = time.monotonic()
+        while True:
+            try:
+                self.evaluate(self.read_sensors())
+            except Exception as e:
+                logger.error(f"Thermal governor check failed: {e}")
+            next_check += self.check_interval
+            time.sleep(max(0.0, next_check - time.monotonic()))
+
+    def evaluate(self, readings: dict) -> int:
+        """Move at most one level toward what the readings call for; returns the level."""
+        with self._lock:
+            level = self._evaluate(readings)
+        self.topic.publish(self.get_status())
+        return level
+
+    def _evaluate(self, readings: dict) -> int:
+        self.readings = readings
+        temp = readings.get('temperature')
+        throttling = [flag for flag in readings.get('throttled', []) if flag != 'under-voltage']
+        now = time.monotonic()
+        level, reason = self.level, self.reason
+
+        if self._changed_at is None or now - self._changed_at >= self.min_dwell:
+            upper = self.levels[level + 1] if level + 1 < len(self.levels) else None
+            if upper and temp is not None and temp >= upper['enter_temp']:
+                level, reason = level + 1, f"temperature {temp}°C reached {upper['enter_temp']}°C"
+            elif upper and throttling and level < self.throttle_level:
+                level, reason = level + 1, f"firmware reports {', '.join(throttling)}"
+                if readings.get('frequency'):
+                    reason += f" at {readings['frequency']} MHz"
+            elif level > 0 and not throttling and (temp is None or temp <= self.levels[level]['exit_temp']):
+                level = level - 1
+                reason = f"cooled to {temp}°C" if temp is not None else 'no temperature reading'
+
+        if level != self.level:
+            logger.warning(f"Thermal level {self.levels[self.level]['name']} -> "
+                           f"{self.levels[level]['name']}: {reason}")
+            self.level, self.reason = level, reason
+            self._changed_at = now
+            self._apply(self.levels[level])
+        return self.level
+
+    def _apply(self, limits: dict) -> None:
+        if self.video_stream is not None:
+            self.video_stream.apply_limits(
+                max_fps=limits.get('fps'),
+                max_quality=limits.get('jpeg_quality'),
+                inference_interval=limits.get('inference_interval', 1),
+                allow_ai=limits.get('ai', True)
+            )
+        if self.sensor_interface is not None:
+            self.sensor_interface.set_interval(limits.get('sensor_interval'))
+
+    def get_status(self) -> dict:
+        return {
+            'level': self.level,
+            'name': self.levels[self.level]['name'],
+            'reason': self.reason,
+            'levels': [level['name'] for level in self.levels],
+            **self.readings
+        }
@@ -6,25 +6,35 @@ class MemoryMonitor:
         self.usage_buffer = CircularBuffer()
         self._last_memory = 0
     
-    def get_usage(self):
-        """Get current RAM usage percentage"""
+    def sample(self):
+        """Read virtual memory once, record its usage and return the reading"""
         try:
             memory = psutil.virtual_memory()
             self._last_memory = memory.percent
             self.usage_buffer.add(self._last_memory)
-            return self._last_memory
+            return memory
         except Exception as e:
             print(f"Error reading memory usage: {e}")
-            return self._last_memory
+            return None
+
+    @property
+    def last_usage(self):
+        """Most recent RAM usage percentage, without reading it again"""
+        return self._last_memory
+
+    def get_usage(self):
+        """Get current RAM usage percentage"""
+        self.sample()
+        return self._last_memory
     
     def get_history(self):
         """Get historical memory usage data"""
         return self.usage_buffer.get_all()
     
-    def get_detailed_info(self):
+    def get_detailed_info(self, memory=None):
         """Get detailed memory information"""
         try:
-            memory = psutil.virtual_memory()
+            memory = memory or psutil.virtual_memory()
             return {
                 'total': memory.total,
                 'available': memory.available,
@@ -1,15 +1,23 @@
 import psutil
 import logging
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1)
+def get_core_counts():
+    """Physical and logical core counts; these never change, so read them once"""
+    return psutil.cpu_count(logical=False) or 0, psutil.cpu_count(logical=True) or 0
+
 def get_cpu_info():
     """Get CPU information with error handling"""
     try:
+        cores, threads = get_core_counts()
+        frequency = psutil.cpu_freq()
         return {
-            'cores': psutil.cpu_count(logical=False) or 0,
-            'threads': psutil.cpu_count(logical=True) or 0,
-            'frequency': round(psutil.cpu_freq().current, 2) if psutil.cpu_freq() else 0
+            'cores': cores,
+            'threads': threads,
+            'frequency': round(frequency.current, 2) if frequency else 0
         }
     except Exception as e:
         logger.error(f"Error getting CPU info: {e}")
@@ -19,10 +27,10 @@ def get_cpu_info():
             'frequency': 0
         }
 
-def get_memory_info():
-    """Get memory information with error handling"""
+def get_memory_info(memory=None):
+    """Get memory information with error handling; reuses a virtual_memory() reading if given"""
     try:
-        memory = psutil.virtual_memory()
+        memory = memory or psutil.virtual_memory()
         return {
             'total': round(memory.total / (1024 * 1024), 2),  # MB
             'used': round(memory.used / (1024 * 1024), 2),    # MB
@@ -32,7 +32,7 @@ class TemperatureMonitor:
         """Get historical temperature data"""
         return self.temp_buffer.get_all()
     
-    def is_critical(self):
+    def is_critical(self, temp=None):
         """Check if temperature is at critical level (> 80°C)"""
-        current_temp = self.get_temperature()
+        current_temp = self.get_temperature() if temp is None else temp
         return current_temp > 80
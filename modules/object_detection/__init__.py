@@ -3,7 +3,21 @@ Object Detection Package
 
 This package provides YOLO-based object detection functionality for the Raspberry Pi server.
 
-To use this package:
+Inference engines (engines.py) wrap one backend, precision and input size each
+(ultralytics ncnn, ONNX Runtime, OpenCV DNN, int8 variants) behind
+load()/infer(frame). At startup the EngineSelector (benchmark.py) picks the
+fastest engine that meets the latency and accuracy targets, benchmarking the
+available ones when no saved results match this machine:
+
+    from modules.object_detection import engine_selector, create_engine
+
+    engine = create_engine('onnxruntime-320')
+    engine.load()
+    detections = engine.infer(bgr_frame)  # [(class_id, confidence, x1, y1, x2, y2), ...]
+
+    results = engine_selector.run_benchmark()  # Re-measure and save
+
+To use the legacy OpenCV DNN detector with Darknet weights:
 1. Download YOLO weights file (e.g., yolov3.weights)
 2. Download YOLO configuration file (e.g., yolov3.cfg)
 3. Create a classes file (e.g., coco.names) containing class names, one per line
@@ -25,5 +39,10 @@ Example usage:
 """
 
 from .detector import ObjectDetector, object_detector
+from .engines import (InferenceEngine, UltralyticsEngine, OnnxRuntimeEngine, OpenCvDnnEngine, ENGINES,
+                      register_engine, create_engine, available_engines, draw_detections)
+from .benchmark import EngineSelector, engine_selector, benchmark_engine
 
-__all__ = ['ObjectDetector', 'object_detector']
+__all__ = ['ObjectDetector', 'object_detector', 'InferenceEngine', 'UltralyticsEngine', 'OnnxRuntimeEngine',
+           'OpenCvDnnEngine', 'ENGINES', 'register_engine', 'create_engine', 'available_engines',
+           'draw_detections', 'EngineSelector', 'engine_selector', 'benchmark_engine']
@@ -0,0 +1,361 @@
+"""
+Inference engine micro-benchmark and startup selection.
+
+Every available engine (see engines.ENGINES) runs the same sample frames:
+a few warm-up passes, then timed passes for latency percentiles and
+throughput. Its detections are scored against the reference engine (the
+first available one, normally full-size fp32 ultralytics) as an F1
+"agreement": a box counts when a reference box of the same class overlaps
+it with IoU >= 0.5. Reduced precision or input size shows up there.
+
+Results are saved to a JSON file keyed by a hardware/software fingerprint.
+At startup the cached results are used when the fingerprint matches.
+Otherwise the preferred engine starts right away and the benchmark runs in
+a separate process (benchmarks/inference.py, so exporting and timing the
+engines does not share the server's GIL), switching engines once it
+finishes. The selected engine is
+the fastest (p50) whose p95 is within max_latency_ms and whose agreement
+is at least min_agreement.
+
+Sample frames come from ROBOT_BENCHMARK_FRAMES (a directory of images),
+then from the live camera, and only then are they synthetic. Synthetic
+frames time the engines but cannot rank their accuracy.
+"""
+
+import glob
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from importlib import metadata
+from typing import Callable, Dict, List, Optional
+import cv2
+import numpy as np
+from .engines import ENGINES, Detection, InferenceEngine, available_engines, create_engine
+
+logger = logging.getLogger(__name__)
+
+RESULTS_PATH = os.environ.get('ROBOT_INFERENCE_RESULTS', './inference_benchmark.json')
+FRAMES_DIR = os.environ.get('ROBOT_BENCHMARK_FRAMES', './benchmarks/frames')
+MAX_LATENCY_MS = float(os.environ.get('ROBOT_INFERENCE_MAX_LATENCY_MS', 250))
+MIN_AGREEMENT = float(os.environ.get('ROBOT_INFERENCE_MIN_AGREEMENT', 0.8))
+MATCH_IOU = 0.5
+BENCHMARK_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                'benchmarks', 'inference.py')
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def fingerprint() -> Dict:
+    """What the results depend on: CPU, core count and backend versions."""
+    cpu = platform.processor() or ''
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith(('Model', 'model name')):
+                    cpu = line.split(':', 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    versions = {}
+    for package in ('opencv-python', 'onnxruntime', 'ultralytics', 'ncnn'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            pass
+    versions.setdefault('opencv-python', cv2.__version__)
+    return {'machine': platform.machine(), 'cpu': cpu, 'cores': os.cpu_count(), 'versions': versions}
+
+
+def load_frames(directory: str = FRAMES_DIR, count: int = 8) -> List[np.ndarray]:
+    """Up to `count` BGR images from a directory (jpg/png)."""
+    paths = sorted(glob.glob(os.path.join(directory, '*.jpg')) + glob.glob(os.path.join(directory, '*.png')))
+    frames = []
+    for path in paths[:count]:
+        image = cv2.imread(path)
+        if image is not None:
+            frames.append(image)
+    return frames
+
+
+def synthetic_frames(count: int = 4, size=(480, 640)) -> List[np.ndarray]:
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, size + (3,), dtype=np.uint8) for _ in range(count)]
+
+
+def _iou(a, b) -> float:
+    x1, y1, x2, y2 = max(a[2], b[2]), max(a[3], b[3]), min(a[4], b[4]), min(a[5], b[5])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[4] - a[2]) * (a[5] - a[3]) + (b[4] - b[2]) * (b[5] - b[3]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def agreement(reference: List[List[Detection]], candidate: List[List[Detection]]) -> Optional[float]:
+    """F1 of candidate boxes against reference boxes over all frames; None if neither found anything."""
+    matched = total_ref = total_cand = 0
+    for ref_boxes, cand_boxes in zip(reference, candidate):
+        total_ref += len(ref_boxes)
+        total_cand += len(cand_boxes)
+        unused = list(ref_boxes)
+        for box in sorted(cand_boxes, key=lambda d: -d[1]):
+            best = max(unused, key=lambda r: _iou(r, box) if r[0] == box[0] else -1.0, default=None)
+            if best is not None and best[0] == box[0] and _iou(best, box) >= MATCH_IOU:
+                unused.remove(best)
+                matched += 1
+    if total_ref == 0 and total_cand == 0:
+        return None
+    return round(2 * matched / (total_ref + total_cand), 3)
+
+
+def benchmark_engine(engine: InferenceEngine, frames: List[np.ndarray], warmup: int = 3,
+                     iterations: int = 20) -> Dict:
+    """Load an engine and time it on the frames; also returns its detections per frame."""
+    start = time.perf_counter()
+    if not engine.loaded:
+        engine.load()
+    load_seconds = time.perf_counter() - start
+    for i in range(warmup):
+        engine.infer(frames[i % len(frames)])
+    detections = [engine.infer(frame) for frame in frames]
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t = time.perf_counter()
+        engine.infer(frames[i % len(frames)])
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    return {
+        **engine.describe(),
+        'load_ms': round(load_seconds * 1000, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+        'fps': round(iterations / elapsed, 2),
+        'detections': detections,
+    }
+
+
+class EngineSelector:
+    """Benchmarks the registered engines, persists the results and picks one."""
+
+    def __init__(self, results_path: str = RESULTS_PATH, max_latency_ms: float = MAX_LATENCY_MS,
+                 min_agreement: float = MIN_AGREEMENT, frames_dir: str = FRAMES_DIR):
+        self.results_path = results_path
+        self.max_latency_ms = max_latency_ms
+        self.min_agreement = min_agreement
+        self.frames_dir = frames_dir
+        self.state = 'idle'  # idle, benchmarking, done, failed
+        self.selected = None
+        self.reason = None
+        self.error = None
+        self.results = self._load_results()
+        self._available = None  # Engine names, looked up once (and again after a benchmark)
+        self._lock = threading.Lock()
+
+    # Persistence
+
+    def _load_results(self) -> Optional[Dict]:
+        try:
+            with open(self.results_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable inference benchmark results {self.results_path}: {e}")
+            return None
+
+    def _save_results(self, results: Dict) -> None:
+        tmp = self.results_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(results, f, indent=2)
+        os.replace(tmp, self.results_path)
+
+    def cached_results(self) -> Optional[Dict]:
+        """Saved results if they were measured on this hardware and software with the same engines."""
+        results = self.results
+        if not results or results.get('fingerprint') != fingerprint():
+            return None
+        if set(results.get('engines', {})) != set(self.available_names()):
+            return None
+        return results
+
+    # Benchmark and choice
+
+    def run_benchmark(self, frames: Optional[List[np.ndarray]] = None, frames_source: str = 'provided',
+                      warmup: int = 3, iterations: int = 20, save: bool = True) -> Dict:
+        """Benchmark every available engine on the frames and save the results."""
+        if not frames:
+            frames, frames_source = load_frames(self.frames_dir), 'directory'
+        if not frames:
+            frames, frames_source = synthetic_frames(), 'synthetic'
+        engines = available_engines()
+        if not engines:
+            raise RuntimeError("No inference engine available")
+
+        logger.info(f"Benchmarking {len(engines)} inference engine(s) on {len(frames)} {frames_source} frame(s)")
+        entries, reference = {}, None
+        for engine in engines:
+            try:
+                entry = benchmark_engine(engine, frames, warmup, iterations)
+            except Exception as e:
+                logger.warning(f"Inference engine {engine.name} failed its benchmark: {e}")
+                entries[engine.name] = {**engine.describe(), 'error': str(e)}
+                continue
+            detections = entry.pop('detections')
+            if reference is None:
+                reference = (engine.name, detections)
+            entry['agreement'] = agreement(reference[1], detections) if frames_source != 'synthetic' else None
+            entries[engine.name] = entry
+            logger.info(f"  {engine.name}: p50 {entry['p50_ms']} ms, p95 {entry['p95_ms']} ms, "
+                        f"{entry['fps']} fps, agreement {entry['agreement']}")
+
+        results = {
+            'fingerprint': fingerprint(),
+            'measured_at': time.time(),
+            'frames': {'count': len(frames), 'source': frames_source,
+                       'resolution': f"{frames[0].shape[1]}x{frames[0].shape[0]}"},
+            'reference': reference[0] if reference else None,
+            'engines': entries,
+        }
+        if save:
+            self._save_results(results)
+            self.results = results
+        return results
+
+    def choose(self, results: Dict) -> Optional[str]:
+        """Fastest engine within the latency and agreement targets; the reference if none is."""
+        entries = {name: entry for name, entry in results.get('engines', {}).items()
+                   if 'error' not in entry and name in ENGINES}
+        eligible = [name for name, entry in entries.items()
+                    if entry['p95_ms'] <= self.max_latency_ms and
+                    (entry.get('agreement') is None or entry['agreement'] >= self.min_agreement)]
+        if eligible:
+            self.reason = 'fastest within target'
+            return min(eligible, key=lambda name: entries[name]['p50_ms'])
+        if results.get('reference') in entries:
+            self.reason = 'no engine met the target, using the reference'
+            return results['reference']
+        self.reason = 'no engine met the target, using the fastest'
+        return min(entries, key=lambda name: entries[name]['p50_ms']) if entries else None
+
+    # Startup
+
+    def startup(self, on_select: Callable[[InferenceEngine], None],
+                frame_source: Optional[Callable[[], List[np.ndarray]]] = None) -> Optional[InferenceEngine]:
+        """Return the engine to start with; may benchmark in the background and call on_select later.
+
+        ROBOT_INFERENCE_ENGINE forces one engine and skips the benchmark.
+        """
+        forced = os.environ.get('ROBOT_INFERENCE_ENGINE')
+        if forced:
+            self.reason = 'ROBOT_INFERENCE_ENGINE'
+            return self._load(forced)
+
+        cached = self.cached_results()
+        if cached is not None:
+            name = self.choose(cached)
+            if name is not None:
+                self.state = 'done'
+                return self._load(name)
+
+        # Start on the preferred engine while the benchmark runs
+        engines = available_engines()
+        if not engines:
+            logger.warning("No inference engine available; AI mode unavailable")
+            return None
+        self.reason = 'default until benchmarked'
+        engine = self._load(engines[0].name)
+        self.start_benchmark(on_select, frame_source)
+        return engine
+
+    def start_benchmark(self, on_select: Optional[Callable[[InferenceEngine], None]] = None,
+                        frame_source: Optional[Callable[[], List[np.ndarray]]] = None) -> bool:
+        """Run the benchmark on a background thread; False if one is already running."""
+        with self._lock:
+            if self.state == 'benchmarking':
+                return False
+            self.state = 'benchmarking'
+        threading.Thread(target=self._benchmark_and_select, args=(on_select, frame_source),
+                         name='inference-benchmark', daemon=True).start()
+        return True
+
+    def _run_benchmark_process(self, frames_dir: str, source: str) -> Dict:
+        """Run benchmarks/inference.py on frames_dir, saving to results_path; returns the saved results."""
+        command = [sys.executable, BENCHMARK_SCRIPT, '--frames', frames_dir, '--source', source,
+                   '--results', self.results_path, '--save']
+        output = subprocess.run(command, capture_output=True, text=True)
+        if output.returncode:
+            raise RuntimeError(f"benchmark process exited with {output.returncode}: {output.stderr[-500:]}")
+        results = self._load_results()
+        if results is None:
+            raise RuntimeError(f"benchmark process saved no results to {self.results_path}")
+        self.results = results
+        self._available = None
+        return results
+
+    def _benchmark_and_select(self, on_select, frame_source) -> None:
+        frames_dir = None
+        try:
+            source = 'directory'
+            if not load_frames(self.frames_dir, count=1) and frame_source is not None:
+                # Hand the live camera frames to the benchmark process as images
+                frames_dir, source = tempfile.mkdtemp(prefix='inference-frames-'), 'camera'
+                for i, frame in enumerate(frame_source()):
+                    cv2.imwrite(os.path.join(frames_dir, f"{i:02d}.png"), frame)
+            results = self._run_benchmark_process(frames_dir or self.frames_dir, source)
+            name = self.choose(results)
+            if name is not None and name != self.selected and on_select is not None:
+                engine = self._load(name)
+                if engine is not None:
+                    on_select(engine)
+            self.state = 'done'
+        except Exception as e:
+            logger.error(f"Inference benchmark failed: {e}")
+            self.error = str(e)
+            self.state = 'failed'
+        finally:
+            if frames_dir is not None:
+                shutil.rmtree(frames_dir, ignore_errors=True)
+
+    def _load(self, name: str) -> Optional[InferenceEngine]:
+        engine = create_engine(name)
+        try:
+            engine.load()
+        except Exception as e:
+            logger.error(f"Failed to load inference engine {name}: {e}")
+            return None
+        self.selected = name
+        logger.info(f"Inference engine: {name} ({self.reason})")
+        return engine
+
+    def available_names(self) -> List[str]:
+        if self._available is None:
+            self._available = [engine.name for engine in available_engines()]
+        return self._available
+
+    def get_status(self) -> Dict:
+        return {
+            'state': self.state,
+            'selected': self.selected,
+            'reason': self.reason,
+            'error': self.error,
+            'target': {'max_latency_ms': self.max_latency_ms, 'min_agreement': self.min_agreement},
+            'registered': list(ENGINES),
+            'available': self.available_names(),
+            'results': self.results,
+        }
+
+
+engine_selector = EngineSelector()
@@ -0,0 +1,285 @@
+import importlib.util
+import logging
+import os
+import shutil
+from typing import Callable, Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Model files live next to the server by default, like the original ncnn export
+MODEL_DIR = os.environ.get('ROBOT_MODEL_DIR', '.')
+MODEL_NAME = 'yolo11n'
+
+# Class names of the COCO-trained yolo11n exports, by class id
+COCO_NAMES = (
+    'person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train', 'truck', 'boat', 'traffic light',
+    'fire hydrant', 'stop sign', 'parking meter', 'bench', 'bird', 'cat', 'dog', 'horse', 'sheep', 'cow',
+    'elephant', 'bear', 'zebra', 'giraffe', 'backpack', 'umbrella', 'handbag', 'tie', 'suitcase', 'frisbee',
+    'skis', 'snowboard', 'sports ball', 'kite', 'baseball bat', 'baseball glove', 'skateboard', 'surfboard',
+    'tennis racket', 'bottle', 'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple',
+    'sandwich', 'orange', 'broccoli', 'carrot', 'hot dog', 'pizza', 'donut', 'cake', 'chair', 'couch',
+    'potted plant', 'bed', 'dining table', 'toilet', 'tv', 'laptop', 'mouse', 'remote', 'keyboard',
+    'cell phone', 'microwave', 'oven', 'toaster', 'sink', 'refrigerator', 'book', 'clock', 'vase', 'scissors',
+    'teddy bear', 'hair drier', 'toothbrush',
+)
+
+# A detection is (class_id, confidence, x1, y1, x2, y2) in frame pixels
+Detection = Tuple[int, float, float, float, float, float]
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _export(stem: str, destination: str, **kwargs) -> str:
+    """Export the yolo11n weights through ultralytics to destination, unless it already exists.
+
+    ultralytics names an export after the .pt file it came from, so every
+    variant exports from its own copy of the weights (`stem`.pt); exporting
+    several sizes or precisions from yolo11n.pt would write them all to the
+    same path.
+    """
+    if os.path.exists(destination):
+        return destination
+    from ultralytics import YOLO
+    source = os.path.join(MODEL_DIR, f"{MODEL_NAME}.pt")
+    weights = os.path.join(MODEL_DIR, f"{stem}.pt")
+    if weights != source:
+        shutil.copyfile(source, weights)
+    try:
+        exported = str(YOLO(weights).export(**kwargs))
+    finally:
+        if weights != source:
+            os.remove(weights)
+    if os.path.abspath(exported) != os.path.abspath(destination):
+        os.replace(exported, destination)
+    return destination
+
+
+def letterbox(frame: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Resize keeping the aspect ratio and pad to size x size; returns image, scale and (pad_x, pad_y)."""
+    height, width = frame.shape[:2]
+    scale = min(size / width, size / height)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    return canvas, scale, (pad_x, pad_y)
+
+
+def decode_yolo(output: np.ndarray, scale: float, pad: Tuple[int, int], conf_threshold: float = 0.25,
+                iou_threshold: float = 0.45) -> List[Detection]:
+    """Detections from a YOLOv8/11 head output of shape (1, 4 + classes, anchors)."""
+    predictions = output[0].T  # (anchors, 4 + classes)
+    scores = predictions[:, 4:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+    keep = confidences >= conf_threshold
+    if not keep.any():
+        return []
+    boxes, class_ids, confidences = predictions[keep, :4], class_ids[keep], confidences[keep]
+    # cx, cy, w, h in letterboxed pixels -> x, y, w, h in frame pixels
+    xywh = np.empty_like(boxes)
+    xywh[:, 0] = (boxes[:, 0] - boxes[:, 2] / 2 - pad[0]) / scale
+    xywh[:, 1] = (boxes[:, 1] - boxes[:, 3] / 2 - pad[1]) / scale
+    xywh[:, 2] = boxes[:, 2] / scale
+    xywh[:, 3] = boxes[:, 3] / scale
+    indices = cv2.dnn.NMSBoxes(xywh.tolist(), confidences.tolist(), conf_threshold, iou_threshold)
+    return [(int(class_ids[i]), float(confidences[i]), float(xywh[i, 0]), float(xywh[i, 1]),
+             float(xywh[i, 0] + xywh[i, 2]), float(xywh[i, 1] + xywh[i, 3])) for i in np.array(indices).reshape(-1)]
+
+
+class InferenceEngine:
+    """One way of running the detector: a backend, precision and input size.
+
+    Subclasses implement available() (dependencies and model present, or
+    exportable), load() and infer(frame) returning Detection tuples. Frames are
+    BGR uint8, as VideoStream captures them and cv2.imread loads them.
+    """
+
+    backend = 'base'
+
+    def __init__(self, name: str, input_size: int = 640, precision: str = 'fp32'):
+        self.name = name
+        self.input_size = input_size
+        self.precision = precision
+        self.names = dict(enumerate(COCO_NAMES))
+        self.loaded = False
+
+    def available(self) -> bool:
+        raise NotImplementedError
+
+    def load(self) -> None:
+        raise NotImplementedError
+
+    def infer(self, frame: np.ndarray) -> List[Detection]:
+        raise NotImplementedError
+
+    def describe(self) -> dict:
+        return {'name': self.name, 'backend': self.backend, 'precision': self.precision,
+                'input_size': self.input_size}
+
+
+class UltralyticsEngine(InferenceEngine):
+    """ultralytics YOLO on an exported model (ncnn by default), exported on first load."""
+
+    backend = 'ultralytics'
+
+    def __init__(self, name, input_size=640, precision='fp32', export_format='ncnn'):
+        super().__init__(name, input_size, precision)
+        self.export_format = export_format
+        suffix = '_fp16' if precision == 'fp16' else ''
+        size = '' if input_size == 640 else f'_{input_size}'
+        self.stem = f"{MODEL_NAME}{size}{suffix}"
+        self.model_path = os.path.join(MODEL_DIR, f"{self.stem}_{export_format}_model")
+        self.model = None
+
+    def available(self) -> bool:
+        return _installed('ultralytics')
+
+    def load(self) -> None:
+        from ultralytics import YOLO
+        _export(self.stem, self.model_path, format=self.export_format, imgsz=self.input_size,
+                half=self.precision == 'fp16')
+        self.model = YOLO(self.model_path, task='detect')
+        self.names = dict(self.model.names)
+        self.loaded = True
+
+    def infer(self, frame):
+        boxes = self.model(frame, imgsz=self.input_size, verbose=False)[0].boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+        xyxy = boxes.xyxy.cpu().numpy()
+        classes = boxes.cls.cpu().numpy()
+        confidences = boxes.conf.cpu().numpy()
+        return [(int(c), float(p), *map(float, box)) for c, p, box in zip(classes, confidences, xyxy)]
+
+
+class _OnnxModelEngine(InferenceEngine):
+    """Shared ONNX model handling: export through ultralytics when missing, optional int8 weights."""
+
+    def __init__(self, name, input_size=640, precision='fp32'):
+        super().__init__(name, input_size, precision)
+        self.size = '' if input_size == 640 else f'_{input_size}'
+        self.fp32_path = os.path.join(MODEL_DIR, f"{MODEL_NAME}{self.size}.onnx")
+        self.model_path = os.path.join(MODEL_DIR, f"{MODEL_NAME}{self.size}_int8.onnx") if precision == 'int8' \
+            else self.fp32_path
+
+    def _model_obtainable(self) -> bool:
+        if os.path.exists(self.model_path):
+            return True
+        fp32 = os.path.exists(self.fp32_path) or _installed('ultralytics')
+        if self.precision == 'int8':
+            return fp32 and _installed('onnxruntime')  # onnxruntime.quantization makes the int8 copy
+        return fp32
+
+    def _ensure_model(self) -> str:
+        _export(f"{MODEL_NAME}{self.size}", self.fp32_path, format='onnx', imgsz=self.input_size, dynamic=False,
+                simplify=True)
+        if self.precision == 'int8' and not os.path.exists(self.model_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(self.fp32_path, self.model_path, weight_type=QuantType.QUInt8)
+        return self.model_path
+
+    def _blob(self, frame):
+        image, scale, pad = letterbox(frame, self.input_size)
+        # Frames are BGR (see VideoStream._read_frame); the exported models take RGB
+        blob = cv2.dnn.blobFromImage(image, 1 / 255.0, swapRB=True)
+        return blob, scale, pad
+
+
+class OnnxRuntimeEngine(_OnnxModelEngine):
+    """ONNX Runtime CPU execution provider."""
+
+    backend = 'onnxruntime'
+
+    def available(self) -> bool:
+        return _installed('onnxruntime') and self._model_obtainable()
+
+    def load(self) -> None:
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(self._ensure_model(), options,
+                                                    providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.loaded = True
+
+    def infer(self, frame):
+        blob, scale, pad = self._blob(frame)
+        output = self.session.run(None, {self.input_name: blob})[0]
+        return decode_yolo(output, scale, pad)
+
+
+class OpenCvDnnEngine(_OnnxModelEngine):
+    """OpenCV's DNN module on the same ONNX export (no extra dependency)."""
+
+    backend = 'opencv-dnn'
+
+    def available(self) -> bool:
+        return self.precision == 'fp32' and self._model_obtainable()
+
+    def load(self) -> None:
+        self.net = cv2.dnn.readNetFromONNX(self._ensure_model())
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.loaded = True
+
+    def infer(self, frame):
+        blob, scale, pad = self._blob(frame)
+        self.net.setInput(blob)
+        return decode_yolo(self.net.forward(), scale, pad)
+
+
+# Engine name -> factory. Order is the preference when nothing has been benchmarked
+# yet; the first entry is also the accuracy reference for the benchmark.
+ENGINES: Dict[str, Callable[[], InferenceEngine]] = {}
+
+
+def register_engine(name: str, factory: Callable[..., InferenceEngine]) -> None:
+    """Add an engine under `name`; factory(name) must return an unloaded InferenceEngine."""
+    ENGINES[name] = lambda: factory(name)
+
+
+register_engine('ultralytics-ncnn-640', lambda name: UltralyticsEngine(name, 640))
+register_engine('ultralytics-ncnn-320', lambda name: UltralyticsEngine(name, 320))
+register_engine('ultralytics-ncnn-640-fp16', lambda name: UltralyticsEngine(name, 640, 'fp16'))
+register_engine('onnxruntime-640', lambda name: OnnxRuntimeEngine(name, 640))
+register_engine('onnxruntime-320', lambda name: OnnxRuntimeEngine(name, 320))
+register_engine('onnxruntime-320-int8', lambda name: OnnxRuntimeEngine(name, 320, 'int8'))
+register_engine('opencv-dnn-640', lambda name: OpenCvDnnEngine(name, 640))
+register_engine('opencv-dnn-320', lambda name: OpenCvDnnEngine(name, 320))
+
+
+def create_engine(name: str) -> InferenceEngine:
+    if name not in ENGINES:
+        raise KeyError(f"Unknown inference engine '{name}', expected one of {list(ENGINES)}")
+    return ENGINES[name]()
+
+
+def available_engines() -> List[InferenceEngine]:
+    """Unloaded instances of every registered engine whose dependencies are present."""
+    engines = []
+    for name in ENGINES:
+        engine = create_engine(name)
+        try:
+            if engine.available():
+                engines.append(engine)
+        except Exception as e:
+            logger.debug(f"Engine {name} unavailable: {e}")
+    return engines
+
+
+def draw_detections(frame: np.ndarray, detections: Optional[List[Detection]],
+                    names: Optional[Dict[int, str]] = None) -> np.ndarray:
+    """Draw detection boxes, labelled with class name and confidence, on a copy of the frame."""
+    if not detections:
+        return frame
+    frame = frame.copy()
+    for class_id, confidence, x1, y1, x2, y2 in detections:
+        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
+        label = f"{names.get(class_id, class_id) if names else class_id} {confidence:.2f}"
+        cv2.putText(frame, label, (int(x1), max(12, int(y1) - 4)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+    return frame
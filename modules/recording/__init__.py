@@ -0,0 +1,23 @@
+"""
+Recording Package
+
+Storage pipeline behind DataCollector: producers queue rows to a
+BackgroundWriter, whose single thread writes batches to a sink that stays
+open for the whole session. Sessions are either legacy CSV or the columnar
+binary format in columnar.py, which readers memory-map without parsing. recorder.py records frames,
+detections, sensors and odometry side by side on one monotonic clock.
+catalog.py keeps per-recording metadata and a sparse time index for queries,
+and budget.py caps their total size and watches free disk space.
+"""
+
+from .writer import BackgroundWriter, CsvSink
+from .columnar import ColumnarSink, SENSOR_COLUMNS, read_schema, read_session, sensor_row, \
+    session_to_csv, csv_to_session
+from .recorder import SessionRecorder, RecordedSession, nearest_indices, interpolate_at
+from .catalog import SessionCatalog
+from .budget import DiskBudget, DISK_OK, DISK_LOW, DISK_CRITICAL
+
+__all__ = ['BackgroundWriter', 'CsvSink', 'ColumnarSink', 'SENSOR_COLUMNS', 'read_schema', 'read_session',
+           'sensor_row', 'session_to_csv', 'csv_to_session', 'SessionRecorder', 'RecordedSession',
+           'nearest_indices', 'interpolate_at', 'SessionCatalog',
+           'DiskBudget', 'DISK_OK', 'DISK_LOW', 'DISK_CRITICAL']
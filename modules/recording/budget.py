@@ -0,0 +1,107 @@
+import os
+import shutil
+import logging
+from typing import Iterable, List, Optional
+from .catalog import recording_size
+
+logger = logging.getLogger(__name__)
+
+# Free-space states, from healthy to full
+DISK_OK = 'ok'
+DISK_LOW = 'low'            # Keep recording at a reduced rate
+DISK_CRITICAL = 'critical'  # Stop recording
+
+
+class DiskBudget:
+    """Cap the space used by recordings and watch the free space left on their disk.
+
+    max_bytes bounds the total size of all recordings in the catalog's folder;
+    enforce() deletes the oldest finished recordings until they fit. Free space
+    on the filesystem is classified as DISK_OK, DISK_LOW (below low_free_bytes)
+    or DISK_CRITICAL (below critical_free_bytes) so writers can slow down
+    before they have to stop.
+    """
+
+    def __init__(self, catalog, max_bytes: Optional[int] = None,
+                 low_free_bytes: int = 1024 ** 3, critical_free_bytes: int = 256 * 1024 ** 2):
+        self.catalog = catalog
+        self.max_bytes = max_bytes
+        self.low_free_bytes = low_free_bytes
+        self.critical_free_bytes = critical_free_bytes
+        self.evicted = 0
+        self.bytes_evicted = 0
+
+    @property
+    def base_folder(self) -> str:
+        return self.catalog.base_folder
+
+    def free_bytes(self) -> int:
+        folder = self.base_folder
+        # The training folder may not exist before the first recording
+        while not os.path.isdir(folder) and os.path.dirname(folder) != folder:
+            folder = os.path.dirname(folder)
+        return shutil.disk_usage(folder).free
+
+    def used_bytes(self) -> int:
+        """Total size of the cataloged recordings, without rescanning the folder."""
+        return sum(self._size(entry) for entry in self.catalog.list(scan=False))
+
+    def _size(self, entry: dict) -> int:
+        # Sizes of recordings still being written are only known from disk (a few files each)
+        if entry['complete']:
+            return entry['size_bytes']
+        return recording_size(os.path.join(self.base_folder, entry['name']))
+
+    def state(self) -> str:
+        free = self.free_bytes()
+        if free < self.critical_free_bytes:
+            return DISK_CRITICAL
+        if free < self.low_free_bytes:
+            return DISK_LOW
+        return DISK_OK
+
+    def enforce(self, keep: Iterable[str] = ()) -> List[str]:
+        """Delete the oldest finished recordings until the total fits max_bytes.
+
+        Recordings still being written and those named in keep are never
+        deleted. Returns the names that were removed.
+        """
+        self.catalog.scan()  # The catalog is only rescanned here, after a rotation or a stop
+        if self.max_bytes is None:
+            return []
+        keep = {os.path.basename(name.rstrip(os.sep)) for name in keep}
+        entries = self.catalog.list(scan=False)  # Oldest first: names are timestamps
+        used = sum(self._size(entry) for entry in entries)
+        removed = []
+        for entry in entries:
+            if used <= self.max_bytes:
+                break
+            if not entry['complete'] or entry['name'] in keep:
+                continue
+            path = os.path.join(self.base_folder, entry['name'])
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError as e:
+                logger.error(f"Could not evict recording {entry['name']}: {e}")
+                continue
+            used -= entry['size_bytes']
+            self.evicted += 1
+            self.bytes_evicted += entry['size_bytes']
+            removed.append(entry['name'])
+            logger.info(f"Evicted recording {entry['name']} ({entry['size_bytes']} bytes) to stay within budget")
+        if removed:
+            self.catalog.scan()
+        return removed
+
+    def get_stats(self) -> dict:
+        return {
+            'state': self.state(),
+            'free_bytes': self.free_bytes(),
+            'used_bytes': self.used_bytes(),
+            'max_bytes': self.max_bytes,
+            'evicted': self.evicted,
+            'bytes_evicted': self.bytes_evicted
+        }
@@ -0,0 +1,500 @@
+"""
+Catalog of the recordings in the training folder.
+
+Every recording (legacy ``.csv``, columnar ``.rec`` and multimodal
+``.session``) gets one entry in ``catalog.json`` with its duration, row count,
+path bounding box, sensor ranges and, per stream, a sparse time index of
+``[t, row, byte_offset]`` points roughly every ``index_interval`` seconds.
+The index lets a time slice start reading at the right chunk (or CSV line)
+instead of loading the whole recording.
+
+Sessions written through a ColumnarSink report each chunk to the catalog as it
+is flushed, so their entries are current while recording. Anything else is
+summarized once by scan() and cached until its size on disk changes.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from .columnar import chunk_offsets, encode_distance, iter_chunks, read_chunks, read_schema, read_session
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = 'catalog.json'
+CATALOG_VERSION = 1
+EXTENSIONS = ('.rec', '.csv', '.session')
+SCAN_CHUNK_ROWS = 256  # Granularity used when indexing existing files
+CSV_COLUMNS = ['t', 'x', 'y', 'ultrasonic', 'lidar']
+
+
+def recording_size(path: str) -> int:
+    """Bytes on disk used by a recording file or directory tree."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def _extend_range(current, values) -> Optional[dict]:
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return current
+    low, high = float(values.min()), float(values.max())
+    if current is None:
+        return {'min': low, 'max': high}
+    return {'min': min(current['min'], low), 'max': max(current['max'], high)}
+
+
+def _parse_csv_line(line: bytes):
+    """Legacy CSV row -> (seconds of day, x, y, ultrasonic cm, lidar cm)."""
+    timestamp, x, y, ultrasonic, lidar = next(csv.reader([line.decode()]))
+    h, m, s = (int(part) for part in timestamp.split(':'))
+    return h * 3600 + m * 60 + s, float(x), float(y), encode_distance(ultrasonic)[0], encode_distance(lidar)[0]
+
+
+class _SinkObserver:
+    """Forwards ColumnarSink chunk notifications for one stream to the catalog."""
+
+    def __init__(self, catalog, name: str, stream: str):
+        self.catalog = catalog
+        self.name = name
+        self.stream = stream
+
+    def on_chunk(self, columns, first_row, byte_offset) -> None:
+        self.catalog._on_chunk(self.name, self.stream, columns, first_row, byte_offset)
+
+    def on_close(self) -> None:
+        self.catalog._on_close(self.name, self.stream)
+
+
+class SessionCatalog:
+    """Per-recording metadata and time-indexed reads for a recordings folder."""
+
+    def __init__(self, base_folder: str, index_interval: float = 10.0, save_interval: float = 5.0):
+        self.base_folder = base_folder
+        self.index_interval = index_interval
+        self.save_interval = save_interval
+        self.catalog_path = os.path.join(base_folder, CATALOG_FILE)
+
+        self._lock = threading.RLock()
+        self._entries: Dict[str, dict] = {}
+        self._active: Dict[str, set] = {}  # Recording name -> streams still being written
+        self._last_save = 0.0
+        self._dirty = False
+        self._load()
+
+    # Persistence
+
+    def _load(self) -> None:
+        try:
+            with open(self.catalog_path) as f:
+                catalog = json.load(f)
+            if catalog.get('version') == CATALOG_VERSION:
+                self._entries = catalog.get('sessions', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable catalog {self.catalog_path}: {e}")
+
+    def save(self, force: bool = True) -> None:
+        """Write catalog.json; with force=False at most once per save_interval."""
+        with self._lock:
+            if not force and time.monotonic() - self._last_save < self.save_interval:
+                self._dirty = True
+                return
+            if not os.path.isdir(self.base_folder):
+                return
+            temp_path = f"{self.catalog_path}.tmp"
+            try:
+                with open(temp_path, 'w') as f:
+                    json.dump({'version': CATALOG_VERSION, 'sessions': self._entries}, f)
+                os.replace(temp_path, self.catalog_path)
+            except OSError as e:
+                logger.error(f"Error saving recording catalog: {e}")
+            self._last_save = time.monotonic()
+            self._dirty = False
+
+    # Incremental updates from writers
+
+    def observer(self, session_path: str, stream: str = 'samples', stream_path: str = ''):
+        """Register a stream that is about to be written; pass the result to ColumnarSink."""
+        name = os.path.basename(session_path.rstrip(os.sep))
+        with self._lock:
+            if name not in self._active:
+                self._entries[name] = self._new_entry(name)
+                self._active[name] = set()
+            self._active[name].add(stream)
+            self._entries[name]['streams'][stream] = self._new_stream(stream_path)
+        return _SinkObserver(self, name, stream)
+
+    def _on_chunk(self, name, stream, columns, first_row, byte_offset) -> None:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            self._update(entry, stream, columns, first_row, byte_offset)
+            self.save(force=False)
+
+    def _on_close(self, name, stream) -> None:
+        with self._lock:
+            streams = self._active.get(name)
+            if streams is None:
+                return
+            streams.discard(stream)
+            if not streams:
+                del self._active[name]
+                self.sync(os.path.join(self.base_folder, name))
+
+    def sync(self, path: str) -> None:
+        """Mark a finished recording complete and record its final size on disk."""
+        name = os.path.basename(path.rstrip(os.sep))
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or name in self._active or not os.path.exists(path):
+                return
+            entry['complete'] = True
+            entry['size_bytes'] = recording_size(path)
+            self.save()
+
+    # Summaries
+
+    @staticmethod
+    def _new_entry(name: str) -> dict:
+        kind = os.path.splitext(name)[1].lstrip('.')
+        return {
+            'name': name,
+            'kind': kind,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'complete': False,
+            'size_bytes': 0,
+            'rows': 0,
+            't_start': None,
+            't_end': None,
+            'duration': 0.0,
+            'bbox': None,
+            'sensors': {},
+            'streams': {}
+        }
+
+    @staticmethod
+    def _new_stream(path: str) -> dict:
+        return {'path': path, 'columns': [], 'rows': 0, 't_start': None, 't_end': None, 'index': []}
+
+    def _update(self, entry, stream_name, columns, first_row, byte_offset) -> None:
+        """Fold one chunk of a stream into the entry's statistics and time index."""
+        stream = entry['streams'][stream_name]
+        names = list(columns)
+        t = np.asarray(columns[names[0]], dtype=np.float64)
+        t = t[np.isfinite(t)]
+        if not stream['columns']:
+            stream['columns'] = names
+        stream['rows'] = max(stream['rows'], first_row + len(columns[names[0]]))
+        if len(t):
+            t0, t1 = float(t.min()), float(t.max())
+            stream['t_start'] = t0 if stream['t_start'] is None else min(stream['t_start'], t0)
+            stream['t_end'] = t1 if stream['t_end'] is None else max(stream['t_end'], t1)
+            if not stream['index'] or t0 - stream['index'][-1][0] >= self.index_interval:
+                stream['index'].append([t0, first_row, byte_offset])
+
+        if 'x' in columns and 'y' in columns:
+            x = _extend_range(entry['bbox'] and {'min': entry['bbox']['x_min'], 'max': entry['bbox']['x_max']},
+                              columns['x'])
+            y = _extend_range(entry['bbox'] and {'min': entry['bbox']['y_min'], 'max': entry['bbox']['y_max']},
+                              columns['y'])
+            if x and y:
+                entry['bbox'] = {'x_min': x['min'], 'x_max': x['max'], 'y_min': y['min'], 'y_max': y['max']}
+        for sensor in ('ultrasonic', 'lidar'):
+            if sensor in columns:
+                sensor_range = _extend_range(entry['sensors'].get(sensor), columns[sensor])
+                if sensor_range:
+                    entry['sensors'][sensor] = sensor_range
+
+        streams = entry['streams'].values()
+        starts = [s['t_start'] for s in streams if s['t_start'] is not None]
+        ends = [s['t_end'] for s in streams if s['t_end'] is not None]
+        entry['rows'] = sum(s['rows'] for s in streams)
+        if starts:
+            entry['t_start'], entry['t_end'] = min(starts), max(ends)
+            entry['duration'] = entry['t_end'] - entry['t_start']
+
+    def scan(self) -> None:
+        """Catalog recordings that appeared or changed on disk and drop deleted ones."""
+        try:
+            names = sorted(os.listdir(self.base_folder))
+        except FileNotFoundError:
+            names = []
+        changed = False
+        with self._lock:
+            active = set(self._active)
+        for name in names:
+            if not name.endswith(EXTENSIONS) or name in active:
+                continue
+            path = os.path.join(self.base_folder, name)
+            with self._lock:
+                entry = self._entries.get(name)
+            if entry is not None and entry['complete'] and entry['size_bytes'] == recording_size(path):
+                continue
+            try:
+                entry = self._summarize(path)
+            except Exception as e:
+                logger.warning(f"Could not catalog recording {name}: {e}")
+                continue
+            with self._lock:
+                self._entries[name] = entry
+            changed = True
+
+        with self._lock:
+            for name in [n for n in self._entries if n not in names and n not in self._active]:
+                del self._entries[name]
+                changed = True
+            if changed or self._dirty:
+                self.save()
+
+    def _summarize(self, path: str) -> dict:
+        name = os.path.basename(path)
+        entry = self._new_entry(name)
+        entry['created'] = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec='seconds')
+        if entry['kind'] == 'csv':
+            self._scan_csv(entry, path)
+        elif entry['kind'] == 'session':
+            with open(os.path.join(path, 'index.json')) as f:
+                index = json.load(f)
+            for stream, info in index['streams'].items():
+                self._scan_columnar(entry, stream, path, info['path'])
+        else:
+            self._scan_columnar(entry, 'samples', path, '')
+        entry['complete'] = True
+        entry['size_bytes'] = recording_size(path)
+        return entry
+
+    def _scan_columnar(self, entry, stream, session_path, stream_path) -> None:
+        path = os.path.join(session_path, stream_path)
+        entry['streams'][stream] = self._new_stream(stream_path)
+        schema = read_schema(path)
+        if schema.get('compression'):
+            columns = [(c['name'], np.dtype(c['dtype'])) for c in schema['columns']]
+            row = 0
+            for byte_offset, chunk in iter_chunks(path, columns):
+                self._update(entry, stream, chunk, row, byte_offset)
+                row += len(chunk[columns[0][0]])
+        else:
+            data = read_session(path)
+            rows = min((len(column) for column in data.values()), default=0)
+            for start in range(0, rows, SCAN_CHUNK_ROWS):
+                chunk = {name: column[start:start + SCAN_CHUNK_ROWS] for name, column in data.items()}
+                self._update(entry, stream, chunk, start, 0)
+
+    def _scan_csv(self, entry, path) -> None:
+        """Index a legacy CSV; t is seconds since the first row, like csv_to_session."""
+        stream = entry['streams']['samples'] = self._new_stream('')
+        rows, row, chunk_offset = [], 0, None
+        start = previous = None
+        day_offset = 0
+        with open(path, 'rb') as f:
+            f.readline()  # Header
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line.strip():
+                    break
+                seconds, x, y, ultrasonic, lidar = _parse_csv_line(line)
+                seconds += day_offset
+                if previous is not None and seconds < previous:
+                    day_offset += 86400
+                    seconds += 86400
+                if start is None:
+                    start = seconds
+                    stream['clock_start'] = start
+                previous = seconds
+                if chunk_offset is None:
+                    chunk_offset = offset
+                rows.append((float(seconds - start), x, y, ultrasonic, lidar))
+                if len(rows) >= SCAN_CHUNK_ROWS // 4:
+                    self._update(entry, 'samples', dict(zip(CSV_COLUMNS, map(np.array, zip(*rows)))), row, chunk_offset)
+                    row += len(rows)
+                    rows, chunk_offset = [], None
+        if rows:
+            self._update(entry, 'samples', dict(zip(CSV_COLUMNS, map(np.array, zip(*rows)))), row, chunk_offset)
+        stream['columns'] = CSV_COLUMNS
+
+    # Queries
+
+    def list(self, scan: bool = True) -> List[dict]:
+        """Summaries of every recording, oldest first; scan=False returns the cached entries."""
+        if scan:
+            self.scan()
+        with self._lock:
+            return [self._summary(entry) for _, entry in sorted(self._entries.items())]
+
+    def get(self, name: str) -> Optional[dict]:
+        """Summary of one recording including its streams, or None."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            summary = self._summary(entry)
+            summary['streams'] = {
+                stream_name: {key: value for key, value in stream.items() if key != 'index'}
+                for stream_name, stream in entry['streams'].items()
+            }
+            for stream_name, stream in entry['streams'].items():
+                summary['streams'][stream_name]['index_points'] = len(stream['index'])
+            return summary
+
+    @staticmethod
+    def _summary(entry: dict) -> dict:
+        summary = {key: value for key, value in entry.items() if key != 'streams'}
+        summary['streams'] = list(entry['streams'])
+        return summary
+
+    def _resolve(self, name: str, stream: Optional[str]):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                raise KeyError(name)
+            if stream is None:
+                stream = 'odometry' if 'odometry' in entry['streams'] else next(iter(entry['streams']), None)
+            if stream not in entry['streams']:
+                raise KeyError(stream)
+            # Copy under the lock: writers keep appending to the live entry
+            return dict(entry), stream, dict(entry['streams'][stream], index=list(entry['streams'][stream]['index']))
+
+    def _stream_path(self, name: str, info: dict) -> str:
+        path = os.path.join(self.base_folder, name)
+        return os.path.join(path, info['path']) if info['path'] else path
+
+    def time_slice(self, name: str, start: Optional[float] = None, end: Optional[float] = None,
+                   stream: Optional[str] = None, max_rows: Optional[int] = None) -> dict:
+        """Rows of one stream between start and end seconds after the recording began.
+
+        Reading starts at the last index point before `start`, so only the
+        chunks (or CSV lines) covering the slice are read. Returns
+        {'stream', 't_start', 'columns': {name: array}}; with max_rows the rows
+        are evenly strided down to at most that many.
+        """
+        entry, stream, info = self._resolve(name, stream)
+        origin = entry['t_start'] or 0.0
+        low = -np.inf if start is None else origin + start
+        high = np.inf if end is None else origin + end
+
+        index = info['index']
+        times = [point[0] for point in index]
+        first = index[max(0, int(np.searchsorted(times, low, side='right')) - 1)] if index else [0.0, 0, 0]
+        after = int(np.searchsorted(times, high, side='right'))
+        stop_row = index[after][1] if after < len(index) else None
+
+        path = self._stream_path(name, info)
+        if entry['kind'] == 'csv':
+            columns = self._read_csv(path, info, first, high)
+        elif read_schema(path).get('compression'):
+            columns = read_chunks(path, first[2], stop_after=high)
+        else:
+            data = read_session(path)
+            columns = {column: values[first[1]:stop_row] for column, values in data.items()}
+
+        if columns and (start is not None or end is not None):
+            t = columns[next(iter(columns))]
+            inside = (t >= low) & (t <= high)
+            rows = np.flatnonzero(inside)
+            if len(rows):
+                # Rows without a time (NaN, e.g. no ultrasonic reading) stay if they lie inside the slice
+                inside[rows[0]:rows[-1] + 1] |= np.isnan(t[rows[0]:rows[-1] + 1])
+            columns = {column: values[inside] for column, values in columns.items()}
+        return {'stream': stream, 't_start': origin, 'columns': self._limit(columns, max_rows)}
+
+    def overview(self, name: str, points: int = 500, stream: Optional[str] = None) -> dict:
+        """About `points` rows evenly spread over a stream, for plotting a whole recording.
+
+        Raw columns are strided through their memory maps, compressed sessions
+        decompress only one chunk per point once they hold more chunks than
+        points, and CSVs are sampled by seeking to evenly spaced byte offsets.
+        """
+        entry, stream, info = self._resolve(name, stream)
+        path = self._stream_path(name, info)
+        points = max(1, points)
+        if entry['kind'] == 'csv':
+            columns = self._sample_csv(path, info, points)
+        elif read_schema(path).get('compression'):
+            chunks = chunk_offsets(path)
+            if len(chunks) <= points:
+                columns = read_chunks(path)
+            else:
+                schema = read_schema(path)
+                dtypes = [(c['name'], np.dtype(c['dtype'])) for c in schema['columns']]
+                picks = [next(iter_chunks(path, dtypes, chunks[i][0]))[1]
+                         for i in np.linspace(0, len(chunks) - 1, points).astype(int)]
+                columns = {column: np.array([chunk[column][0] for chunk in picks]) for column, _ in dtypes}
+        else:
+            columns = read_session(path)
+        return {'stream': stream, 't_start': entry['t_start'] or 0.0, 'columns': self._limit(columns, points)}
+
+    @staticmethod
+    def _limit(columns: Dict[str, np.ndarray], max_rows: Optional[int]) -> Dict[str, np.ndarray]:
+        rows = min((len(values) for values in columns.values()), default=0)
+        if max_rows is None or rows <= max_rows:
+            return {column: np.asarray(values[:rows]) for column, values in columns.items()}
+        picks = np.linspace(0, rows - 1, max_rows).astype(int)
+        return {column: np.asarray(values[picks]) for column, values in columns.items()}
+
+    def _read_csv(self, path, info, first, high) -> Dict[str, np.ndarray]:
+        rows = []
+        previous = first[0] + info.get('clock_start', 0)
+        day_offset = None
+        with open(path, 'rb') as f:
+            if first[2]:
+                f.seek(first[2])
+            else:
+                f.readline()  # Header
+            for line in f:
+                if not line.strip():
+                    break
+                seconds, x, y, ultrasonic, lidar = _parse_csv_line(line)
+                if day_offset is None:
+                    # Recover midnight rollovers that happened before the index point
+                    day_offset = round((previous - seconds) / 86400) * 86400
+                seconds += day_offset
+                if seconds < previous:
+                    day_offset += 86400
+                    seconds += 86400
+                previous = seconds
+                t = float(seconds - info.get('clock_start', 0))
+                if t > high:
+                    break
+                rows.append((t, x, y, ultrasonic, lidar))
+        return {column: np.array(values, dtype=np.float64) for column, values in
+                zip(CSV_COLUMNS, zip(*rows) if rows else [()] * len(CSV_COLUMNS))}
+
+    def _sample_csv(self, path, info, points) -> Dict[str, np.ndarray]:
+        rows = []
+        previous, day_offset = None, 0
+        with open(path, 'rb') as f:
+            f.readline()
+            data_start = f.tell()
+            size = os.path.getsize(path)
+            for position in np.linspace(data_start, size, points, endpoint=False).astype(int):
+                f.seek(position)
+                if position != data_start:
+                    f.readline()  # Skip to the start of the next full line
+                line = f.readline()
+                if not line.strip():
+                    continue
+                seconds, x, y, ultrasonic, lidar = _parse_csv_line(line)
+                seconds += day_offset
+                if previous is not None and seconds < previous:
+                    day_offset += 86400
+                    seconds += 86400
+                if seconds == previous and rows and rows[-1][1:] == (x, y, ultrasonic, lidar):
+                    continue  # Two offsets landed on the same line
+                previous = seconds
+                rows.append((float(seconds - info.get('clock_start', 0)), x, y, ultrasonic, lidar))
+        return {column: np.array(values, dtype=np.float64) for column, values in
+                zip(CSV_COLUMNS, zip(*rows) if rows else [()] * len(CSV_COLUMNS))}
@@ -0,0 +1,309 @@
+"""
+Columnar binary session format.
+
+A session is a directory (``<name>.rec``) holding a ``schema.json`` and the
+column data. Uncompressed sessions store every column in its own raw
+little-endian file (``<column>.bin``) that grows by one chunk per flushed
+batch, so a reader can memory-map each column straight into a NumPy array
+without parsing anything. Compressed sessions store the same chunks zlib
+compressed in a single ``chunks.z`` file, each chunk prefixed by a small
+header, and are decompressed on read.
+"""
+
+import csv
+import json
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+FORMAT_VERSION = 1
+SCHEMA_FILE = 'schema.json'
+CHUNKS_FILE = 'chunks.z'
+CHUNK_HEADER = struct.Struct('<4sII')  # magic, rows, compressed bytes
+CHUNK_MAGIC = b'CHNK'
+
+# Validity bits for the sensor columns
+ULTRASONIC_VALID = 1
+LIDAR_VALID = 2
+ULTRASONIC_OUT_OF_RANGE = 4
+LIDAR_OUT_OF_RANGE = 8
+
+# Layout used by DataCollector: monotonic time, pose, distances (cm) and validity bits
+SENSOR_COLUMNS: List[Tuple[str, str]] = [
+    ('t', '<f8'),
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('theta', '<f4'),
+    ('ultrasonic', '<f4'),
+    ('lidar', '<f4'),
+    ('valid', 'u1'),
+]
+
+
+class ColumnarSink:
+    """Sink for BackgroundWriter that appends each batch as one columnar chunk.
+
+    An optional observer gets on_chunk(columns, first_row, byte_offset) after
+    every chunk (byte_offset is the chunk's position in chunks.z when
+    compressed) and on_close() once the files are closed.
+    """
+
+    def __init__(self, path: str, columns: Sequence[Tuple[str, str]] = SENSOR_COLUMNS,
+                 compression: Optional[str] = None, metadata: Optional[dict] = None,
+                 clock: Optional[dict] = None, observer=None):
+        if compression not in (None, 'zlib'):
+            raise ValueError("compression must be None or 'zlib'")
+        self.path = path
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in columns]
+        self.compression = compression
+        os.makedirs(path, exist_ok=True)
+
+        # Wall clock at a known monotonic instant lets readers recover absolute time
+        schema = {
+            'version': FORMAT_VERSION,
+            'columns': [{'name': name, 'dtype': dtype.str} for name, dtype in self.columns],
+            'compression': compression,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'clock': clock or {'monotonic': time.monotonic(), 'wall': time.time()},
+            'metadata': metadata or {}
+        }
+        with open(os.path.join(path, SCHEMA_FILE), 'w') as f:
+            json.dump(schema, f, indent=2)
+
+        if compression:
+            self._files = [open(os.path.join(path, CHUNKS_FILE), 'ab')]
+        else:
+            self._files = [open(os.path.join(path, f"{name}.bin"), 'ab') for name, _ in self.columns]
+        self.bytes_written = 0
+        self.rows_written = 0
+        self.observer = observer
+
+    def encode_chunk(self, rows) -> List[np.ndarray]:
+        """Split rows into one contiguous little-endian array per column."""
+        values = list(zip(*rows))
+        return [np.asarray(column, dtype=dtype) for column, (_, dtype) in zip(values, self.columns)]
+
+    def write_rows(self, rows) -> None:
+        arrays = self.encode_chunk(rows)
+        offset = self.bytes_written
+        if self.compression:
+            payload = zlib.compress(b''.join(a.tobytes() for a in arrays), 6)
+            data = CHUNK_HEADER.pack(CHUNK_MAGIC, len(rows), len(payload)) + payload
+            self._files[0].write(data)
+            self.bytes_written += len(data)
+        else:
+            for f, array in zip(self._files, arrays):
+                f.write(array.tobytes())
+                self.bytes_written += array.nbytes
+        first_row = self.rows_written
+        self.rows_written += len(rows)
+        if self.observer is not None:
+            self.observer.on_chunk({name: a for (name, _), a in zip(self.columns, arrays)}, first_row, offset)
+
+    def flush(self) -> None:
+        for f in self._files:
+            f.flush()
+
+    def fsync(self) -> None:
+        for f in self._files:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self) -> None:
+        for f in self._files:
+            f.close()
+        if self.observer is not None:
+            self.observer.on_close()
+
+
+def read_schema(path: str) -> dict:
+    with open(os.path.join(path, SCHEMA_FILE)) as f:
+        return json.load(f)
+
+
+def read_session(path: str) -> Dict[str, np.ndarray]:
+    """Load a session as {column: array}.
+
+    Uncompressed columns are read-only memory maps: nothing is parsed or
+    copied until the data is touched. A row being written concurrently is
+    excluded by trimming every column to the shortest one.
+    """
+    schema = read_schema(path)
+    columns = [(c['name'], np.dtype(c['dtype'])) for c in schema['columns']]
+
+    if schema.get('compression'):
+        return _read_compressed(path, columns)
+
+    arrays = {}
+    for name, dtype in columns:
+        file_path = os.path.join(path, f"{name}.bin")
+        count = os.path.getsize(file_path) // dtype.itemsize
+        arrays[name] = np.memmap(file_path, dtype=dtype, mode='r', shape=(count,)) if count else np.empty(0, dtype)
+    rows = min((len(a) for a in arrays.values()), default=0)
+    return {name: a[:rows] for name, a in arrays.items()}
+
+
+def read_chunks(path: str, byte_offset: int = 0, stop_after: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """Decompress chunks of a compressed session starting at byte_offset.
+
+    Stops after the first chunk whose first column (time) passes stop_after,
+    so a time slice only decompresses the chunks it overlaps.
+    """
+    schema = read_schema(path)
+    columns = [(c['name'], np.dtype(c['dtype'])) for c in schema['columns']]
+    return _read_compressed(path, columns, byte_offset, stop_after)
+
+
+def iter_chunks(path: str, columns, byte_offset: int = 0) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+    """Yield (byte offset, {column: array}) for each chunk in chunks.z."""
+    with open(os.path.join(path, CHUNKS_FILE), 'rb') as f:
+        f.seek(byte_offset)
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if len(header) < CHUNK_HEADER.size:
+                return
+            magic, rows, size = CHUNK_HEADER.unpack(header)
+            payload = f.read(size)
+            if magic != CHUNK_MAGIC or len(payload) < size:
+                return  # Truncated tail from an interrupted write
+            raw = zlib.decompress(payload)
+            chunk, offset = {}, 0
+            for name, dtype in columns:
+                chunk[name] = np.frombuffer(raw, dtype=dtype, count=rows, offset=offset)
+                offset += rows * dtype.itemsize
+            yield byte_offset, chunk
+            byte_offset += CHUNK_HEADER.size + size
+
+
+def chunk_offsets(path: str) -> List[Tuple[int, int]]:
+    """(byte offset, rows) of every chunk in chunks.z, read from headers only."""
+    offsets = []
+    with open(os.path.join(path, CHUNKS_FILE), 'rb') as f:
+        while True:
+            position = f.tell()
+            header = f.read(CHUNK_HEADER.size)
+            if len(header) < CHUNK_HEADER.size:
+                break
+            magic, rows, size = CHUNK_HEADER.unpack(header)
+            if magic != CHUNK_MAGIC:
+                break
+            f.seek(size, os.SEEK_CUR)
+            offsets.append((position, rows))
+    return offsets
+
+
+def _read_compressed(path: str, columns, byte_offset: int = 0,
+                     stop_after: Optional[float] = None) -> Dict[str, np.ndarray]:
+    parts = {name: [] for name, _ in columns}
+    time_column = columns[0][0]
+    for _, chunk in iter_chunks(path, columns, byte_offset):
+        for name, _ in columns:
+            parts[name].append(chunk[name])
+        if stop_after is not None and len(chunk[time_column]) and chunk[time_column][-1] > stop_after:
+            break
+    return {name: (np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype))
+            for name, dtype in columns}
+
+
+def session_size(path: str) -> int:
+    """Bytes on disk used by a session."""
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def encode_distance(value) -> Tuple[float, int, int]:
+    """Map a SensorInterface distance to (cm, valid, out_of_range)."""
+    if value == "Out of range":
+        return float('nan'), 0, 1
+    try:
+        distance = float(value)
+    except (TypeError, ValueError):
+        return float('nan'), 0, 0
+    if distance < 0:  # Sensor error
+        return float('nan'), 0, 0
+    return distance, 1, 0
+
+
+def sensor_row(t, x, y, theta, ultrasonic, lidar) -> tuple:
+    """Build a SENSOR_COLUMNS row from raw readings."""
+    u_cm, u_valid, u_oor = encode_distance(ultrasonic)
+    l_cm, l_valid, l_oor = encode_distance(lidar)
+    valid = (ULTRASONIC_VALID * u_valid | LIDAR_VALID * l_valid |
+             ULTRASONIC_OUT_OF_RANGE * u_oor | LIDAR_OUT_OF_RANGE * l_oor)
+    return t, x, y, theta, u_cm, l_cm, valid
+
+
+def _decode_distance(value, valid_bit, out_of_range_bit, flags):
+    if flags & valid_bit:
+        return round(float(value), 2)
+    if flags & out_of_range_bit:
+        return "Out of range"
+    return -1
+
+
+def session_to_csv(session_path: str, csv_path: str) -> int:
+    """Export a sensor session in the legacy CSV layout; returns the row count."""
+    schema = read_schema(session_path)
+    data = read_session(session_path)
+    clock = schema['clock']
+    with open(csv_path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['timestamp', 'x', 'y', 'ultrasonic', 'lidar'])
+        for t, x, y, u, l, flags in zip(data['t'], data['x'], data['y'],
+                                        data['ultrasonic'], data['lidar'], data['valid']):
+            wall = clock['wall'] + (t - clock['monotonic'])
+            writer.writerow([
+                datetime.fromtimestamp(wall).strftime('%H:%M:%S'),
+                float(x), float(y),
+                _decode_distance(u, ULTRASONIC_VALID, ULTRASONIC_OUT_OF_RANGE, flags),
+                _decode_distance(l, LIDAR_VALID, LIDAR_OUT_OF_RANGE, flags)
+            ])
+    return len(data['t'])
+
+
+def csv_to_session(csv_path: str, session_path: str, compression: Optional[str] = None,
+                   chunk_rows: int = 4096) -> int:
+    """Import a legacy CSV recording; returns the row count.
+
+    CSV timestamps only have second resolution and no date, so t is seconds
+    since the first row (midnight rollovers are unwrapped) and theta is NaN.
+    """
+    with open(csv_path, newline='') as file:
+        records = list(csv.DictReader(file))
+
+    # Anchor t=0 to the first timestamp on the day the CSV was last written
+    day = datetime.fromtimestamp(os.path.getmtime(csv_path)).replace(hour=0, minute=0, second=0, microsecond=0)
+    first = records[0]['timestamp'] if records else '00:00:00'
+    h, m, s = (int(part) for part in first.split(':'))
+    clock = {'monotonic': 0.0, 'wall': day.timestamp() + h * 3600 + m * 60 + s}
+
+    sink = ColumnarSink(session_path, SENSOR_COLUMNS, compression,
+                        metadata={'source': os.path.basename(csv_path)}, clock=clock)
+    rows, count = [], 0
+    start = previous = None
+    day_offset = 0
+    try:
+        for record in records:
+            h, m, s = (int(part) for part in record['timestamp'].split(':'))
+            seconds = h * 3600 + m * 60 + s + day_offset
+            if previous is not None and seconds < previous:
+                day_offset += 86400
+                seconds += 86400
+            if start is None:
+                start = seconds
+            previous = seconds
+            rows.append(sensor_row(float(seconds - start), float(record['x']), float(record['y']),
+                                   float('nan'), record['ultrasonic'], record['lidar']))
+            if len(rows) >= chunk_rows:
+                sink.write_rows(rows)
+                count += len(rows)
+                rows = []
+        if rows:
+            sink.write_rows(rows)
+            count += len(rows)
+    finally:
+        sink.close()
+    return count
@@ -0,0 +1,30 @@
+"""
+Convert recordings between the legacy CSV layout and columnar sessions.
+
+    python -m modules.recording.convert modules/training/2025-01-01_12-00-00.csv
+    python -m modules.recording.convert modules/training/2025-01-01_12-00-00.rec
+"""
+
+import argparse
+import os
+from .columnar import csv_to_session, session_to_csv
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help='a .csv file or a .rec session directory')
+    parser.add_argument('destination', nargs='?', help='defaults to the source with the other extension')
+    parser.add_argument('--compress', action='store_true', help='write a zlib-compressed session')
+    args = parser.parse_args()
+
+    source = args.source.rstrip(os.sep)
+    if os.path.isdir(source):
+        destination = args.destination or os.path.splitext(source)[0] + '.csv'
+        rows = session_to_csv(source, destination)
+    else:
+        destination = args.destination or os.path.splitext(source)[0] + '.rec'
+        rows = csv_to_session(source, destination, 'zlib' if args.compress else None)
+    print(f"Wrote {rows} rows to {destination}")
+
+
+if __name__ == '__main__':
+    main()
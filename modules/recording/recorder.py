@@ -0,0 +1,338 @@
+"""
+Synchronized multimodal session recorder.
+
+Every source is recorded at its native rate with the monotonic time at which
+it was captured, so all streams share one clock:
+
+    <name>.session/
+        index.json          streams, schemas, clock anchor and counts
+        odometry.rec/       t, x, y, theta, v, omega           (EncoderTracker topic)
+        sensors.rec/        t_ultrasonic, ultrasonic, t_lidar, lidar, valid
+        frames.rec/         t, seq, offset, length              (VideoStream frames)
+        frames.mjpeg        concatenated JPEG frames, addressed by offset/length
+        detections.rec/     t, seq, class_id, confidence, x1, y1, x2, y2
+
+Each stream is a columnar session (see columnar.py) written by its own
+BackgroundWriter, so producers only enqueue and never touch the disk.
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+import numpy as np
+from .columnar import ColumnarSink, encode_distance, read_session, ULTRASONIC_VALID, LIDAR_VALID, \
+    ULTRASONIC_OUT_OF_RANGE, LIDAR_OUT_OF_RANGE
+from .writer import BackgroundWriter
+from .budget import DISK_OK, DISK_LOW, DISK_CRITICAL
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+FRAME_BLOB = 'frames.mjpeg'
+
+STREAM_COLUMNS = {
+    'odometry': [('t', '<f8'), ('x', '<f4'), ('y', '<f4'), ('theta', '<f4'), ('v', '<f4'), ('omega', '<f4')],
+    'sensors': [('t_ultrasonic', '<f8'), ('ultrasonic', '<f4'), ('t_lidar', '<f8'), ('lidar', '<f4'), ('valid', 'u1')],
+    'frames': [('t', '<f8'), ('seq', '<u4'), ('offset', '<u8'), ('length', '<u4')],
+    'detections': [('t', '<f8'), ('seq', '<u4'), ('class_id', '<u2'), ('confidence', '<f4'),
+                   ('x1', '<f4'), ('y1', '<f4'), ('x2', '<f4'), ('y2', '<f4')],
+}
+
+
+class FrameSink:
+    """Appends JPEG bytes to a blob file and indexes them in a columnar stream.
+
+    Rows are (t, seq, jpeg_bytes). With store_images=False only the capture
+    time and sequence number are kept as frame references.
+    """
+
+    def __init__(self, session_path: str, clock: dict, store_images: bool = True, observer=None):
+        self.index = ColumnarSink(os.path.join(session_path, 'frames.rec'), STREAM_COLUMNS['frames'], clock=clock,
+                                  observer=observer)
+        self.store_images = store_images
+        self._blob = open(os.path.join(session_path, FRAME_BLOB), 'ab') if store_images else None
+        self._offset = 0
+        self.bytes_written = 0
+
+    def write_rows(self, rows) -> None:
+        index_rows = []
+        for t, seq, jpeg in rows:
+            length = 0
+            if self._blob is not None:
+                self._blob.write(jpeg)
+                length = len(jpeg)
+            index_rows.append((t, seq, self._offset, length))
+            self._offset += length
+        self.index.write_rows(index_rows)
+        self.bytes_written = self._offset + self.index.bytes_written
+
+    def flush(self) -> None:
+        if self._blob is not None:
+            self._blob.flush()
+        self.index.flush()
+
+    def fsync(self) -> None:
+        if self._blob is not None:
+            self._blob.flush()
+            os.fsync(self._blob.fileno())
+        self.index.fsync()
+
+    def close(self) -> None:
+        if self._blob is not None:
+            self._blob.close()
+        self.index.close()
+
+
+class SessionRecorder:
+    """Record frames, detections, sensor readings and odometry on one monotonic clock.
+
+    With a DiskBudget, old recordings are evicted when a session starts and
+    stops, and free space is checked every check_interval seconds like
+    DataCollector does: while it is low, only every low_disk_slowdown-th
+    frame is kept (frames are most of a session's size); when it is
+    critical the session stops. Sessions are not split into segments, since
+    each one is a single directory sharing one clock.
+    """
+
+    def __init__(self, base_folder: str, video_stream=None, encoder_tracker=None, sensor_interface=None,
+                 batch_rows: int = 100, flush_interval: float = 1.0, catalog=None, budget=None,
+                 low_disk_slowdown: int = 4, check_interval: float = 5.0):
+        self.base_folder = base_folder
+        self.catalog = catalog
+        self.budget = budget
+        self.low_disk_slowdown = low_disk_slowdown
+        self.check_interval = check_interval
+        self.disk_state = DISK_OK
+        self.stop_reason = None
+        self.video_stream = video_stream
+        self.encoder_tracker = encoder_tracker
+        self.sensor_interface = sensor_interface
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+
+        self.session_path = None
+        self.is_recording = False
+        self._writers: Dict[str, BackgroundWriter] = {}
+        self._clock = None
+        self._started = None
+        self._options = {}
+        self._frame_stride = 1
+        self._lock = threading.Lock()  # start()/stop() from routes and the disk watcher
+        self._stopped = threading.Event()
+
+    def start(self, frames: str = 'jpeg', frame_stride: int = 1) -> str:
+        """Start a session; frames is 'jpeg' (store images), 'ref' (timestamps only) or 'off'."""
+        if frames not in ('jpeg', 'ref', 'off'):
+            raise ValueError("frames must be 'jpeg', 'ref' or 'off'")
+        with self._lock:
+            return self._start(frames, frame_stride)
+
+    def _start(self, frames: str, frame_stride: int) -> str:
+        if self.is_recording:
+            return self.session_path
+        if self.budget:
+            self.disk_state = self.budget.state()
+            if self.disk_state == DISK_CRITICAL:
+                self.stop_reason = 'disk_full'
+                raise RuntimeError("Not enough free disk space to record")
+            self.budget.enforce()
+        self.stop_reason = None
+
+        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.session_path = os.path.join(self.base_folder, f"{timestamp}.session")
+        os.makedirs(self.session_path, exist_ok=True)
+        self._clock = {'monotonic': time.monotonic(), 'wall': time.time()}
+        self._started = self._clock['monotonic']
+        self._options = {'frames': frames, 'frame_stride': max(1, frame_stride)}
+        self._frame_stride = self._current_stride()
+
+        def observer(name):
+            if self.catalog is None:
+                return None
+            return self.catalog.observer(self.session_path, name, f"{name}.rec")
+
+        def stream_writer(name):
+            sink = ColumnarSink(os.path.join(self.session_path, f"{name}.rec"), STREAM_COLUMNS[name], clock=self._clock,
+                                observer=observer(name))
+            return BackgroundWriter(sink, self.batch_rows, self.flush_interval)
+
+        if self.encoder_tracker is not None:
+            self._writers['odometry'] = stream_writer('odometry')
+            self.encoder_tracker.topic.add_listener(self._on_odometry)
+        if self.sensor_interface is not None:
+            self._writers['sensors'] = stream_writer('sensors')
+            self.sensor_interface.topic.add_listener(self._on_sensors)
+        if self.video_stream is not None and frames != 'off':
+            sink = FrameSink(self.session_path, self._clock, store_images=(frames == 'jpeg'),
+                             observer=observer('frames'))
+            # Frames are large; flush them in smaller batches
+            self._writers['frames'] = BackgroundWriter(sink, batch_rows=10, flush_interval=self.flush_interval)
+            self._writers['detections'] = stream_writer('detections')
+            self.video_stream.add_frame_listener(self._on_frame)
+
+        self.is_recording = True
+        self._write_index()
+        if self.budget:
+            self._stopped = threading.Event()  # One per session, so an old watcher never outlives its stop
+            threading.Thread(target=self._watch_disk, args=(self._stopped,), name='session-disk',
+                             daemon=True).start()
+        logger.info(f"Recording session started at {self.session_path}")
+        return self.session_path
+
+    def _current_stride(self) -> int:
+        return self._options['frame_stride'] * (self.low_disk_slowdown if self.disk_state == DISK_LOW else 1)
+
+    def _watch_disk(self, stopped: threading.Event) -> None:
+        """Thin frames while free space is low and stop the session when it is critical."""
+        while not stopped.wait(self.check_interval):
+            state = self.budget.state()
+            if state != self.disk_state:
+                logger.warning(f"Recording disk space is {state}")
+            self.disk_state = state
+            self._frame_stride = self._current_stride()
+            if state == DISK_CRITICAL:
+                logger.error("Stopping session recording: the recording disk is almost full")
+                self.stop(reason='disk_full')
+                return
+
+    def stop(self, reason: Optional[str] = None) -> Optional[str]:
+        """Detach from all sources, flush every stream and finalize the index."""
+        with self._lock:
+            return self._stop(reason)
+
+    def _stop(self, reason: Optional[str]) -> Optional[str]:
+        if not self.is_recording:
+            return None
+        self.is_recording = False
+        self.stop_reason = reason
+        self._stopped.set()
+        if self.encoder_tracker is not None:
+            self.encoder_tracker.topic.remove_listener(self._on_odometry)
+        if self.sensor_interface is not None:
+            self.sensor_interface.topic.remove_listener(self._on_sensors)
+        if self.video_stream is not None:
+            self.video_stream.remove_frame_listener(self._on_frame)
+        for writer in self._writers.values():
+            writer.close()
+        self._write_index(stopped=time.monotonic())
+        self._writers = {}
+        if self.catalog is not None:
+            self.catalog.sync(self.session_path)
+        if self.budget:
+            self.budget.enforce()
+        logger.info(f"Recording session saved to {self.session_path}")
+        return self.session_path
+
+    def _write_index(self, stopped: Optional[float] = None) -> None:
+        index = {
+            'version': 1,
+            'clock': self._clock,
+            'started': self._started,
+            'stopped': stopped,
+            'options': self._options,
+            'streams': {
+                name: {
+                    'path': f"{name}.rec",
+                    'columns': [{'name': n, 'dtype': d} for n, d in STREAM_COLUMNS[name]],
+                    'rows': writer.rows_written,
+                    'dropped': writer.rows_dropped
+                }
+                for name, writer in self._writers.items()
+            }
+        }
+        if 'frames' in self._writers:
+            index['streams']['frames']['blob'] = FRAME_BLOB if self._options.get('frames') == 'jpeg' else None
+            names = getattr(getattr(self.video_stream, 'engine', None), 'names', None)
+            if names:
+                index['streams']['detections']['class_names'] = {str(k): v for k, v in dict(names).items()}
+        with open(os.path.join(self.session_path, INDEX_FILE), 'w') as f:
+            json.dump(index, f, indent=2)
+
+    # Source callbacks: run on the producers' threads, so they only enqueue
+
+    def _write(self, stream, row) -> None:
+        writer = self._writers.get(stream)
+        if writer is not None:
+            writer.write(row)
+
+    def _on_odometry(self, pose) -> None:
+        # Listeners run on the odometry thread right after the step, so get_pose() is
+        # still that step: stamp it with the step's own time, not when the message arrived
+        t = self.encoder_tracker.get_pose()['t']
+        self._write('odometry', (t, pose['x'], pose['y'], pose['theta'], pose['v'], pose['omega']))
+
+    def _on_sensors(self, data) -> None:
+        ultrasonic = data.get('ultrasonic', {})
+        lidar = data.get('lidar', {})
+        u_cm, u_valid, u_oor = encode_distance(ultrasonic.get('distance', -1))
+        l_cm, l_valid, l_oor = encode_distance(lidar.get('distance', -1))
+        valid = (ULTRASONIC_VALID * u_valid | LIDAR_VALID * l_valid |
+                 ULTRASONIC_OUT_OF_RANGE * u_oor | LIDAR_OUT_OF_RANGE * l_oor)
+        self._write('sensors', (ultrasonic.get('monotonic', np.nan), u_cm,
+                                        lidar.get('monotonic', np.nan), l_cm, valid))
+
+    def _on_frame(self, capture_time, seq, frame_bytes, detections) -> None:
+        if seq % self._frame_stride == 0:
+            self._write('frames', (capture_time, seq, frame_bytes))
+        for class_id, confidence, x1, y1, x2, y2 in detections or ():
+            self._write('detections', (capture_time, seq, class_id, confidence, x1, y1, x2, y2))
+
+    def get_status(self) -> dict:
+        return {
+            'recording': self.is_recording,
+            'session': os.path.basename(self.session_path) if self.session_path else None,
+            'elapsed': time.monotonic() - self._started if self.is_recording else 0,
+            'disk_state': self.disk_state,
+            'stop_reason': self.stop_reason,
+            'streams': {name: writer.get_stats() for name, writer in self._writers.items()}
+        }
+
+
+class RecordedSession:
+    """Read access to a recorded multimodal session."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        self._streams = {}
+        self._blob = None
+
+    def stream(self, name: str) -> Dict[str, np.ndarray]:
+        """Columns of one stream as (memory-mapped) arrays."""
+        if name not in self._streams:
+            self._streams[name] = read_session(os.path.join(self.path, self.index['streams'][name]['path']))
+        return self._streams[name]
+
+    def frame(self, i: int) -> bytes:
+        """JPEG bytes of the i-th recorded frame."""
+        frames = self.stream('frames')
+        if self._blob is None:
+            self._blob = np.memmap(os.path.join(self.path, FRAME_BLOB), dtype=np.uint8, mode='r')
+        offset, length = int(frames['offset'][i]), int(frames['length'][i])
+        return self._blob[offset:offset + length].tobytes()
+
+    def to_wall_time(self, t):
+        """Convert shared monotonic timestamps to UNIX time."""
+        clock = self.index['clock']
+        return clock['wall'] + (np.asarray(t) - clock['monotonic'])
+
+
+def nearest_indices(times, t) -> np.ndarray:
+    """Index into the sorted timestamps t closest to each of times."""
+    t = np.asarray(t)
+    times = np.asarray(times)
+    if len(t) < 2:
+        return np.zeros(len(times), dtype=np.intp)
+    right = np.clip(np.searchsorted(t, times), 1, len(t) - 1)
+    left = right - 1
+    return np.where(np.abs(times - t[left]) <= np.abs(t[right] - times), left, right)
+
+
+def interpolate_at(times, t, values) -> np.ndarray:
+    """Linearly interpolate a recorded signal at the given timestamps (e.g. frame times)."""
+    return np.interp(np.asarray(times), np.asarray(t), np.asarray(values))
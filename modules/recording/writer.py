@@ -0,0 +1,149 @@
+import csv
+import os
+import queue
+import threading
+import time
+import logging
+from typing import Any, Sequence
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ('never', 'batch', 'close')
+_CLOSE = object()
+
+class BackgroundWriter:
+    """Queue rows from any producer thread and write them to a sink in batches.
+
+    Producers only pay for a queue put. A single writer thread keeps the sink
+    open and flushes whenever `batch_rows` rows are pending or `flush_interval`
+    seconds have passed since the first pending row, whichever comes first.
+
+    fsync policy:
+        'never' - leave durability to the OS page cache (default)
+        'batch' - fsync after every flushed batch
+        'close' - fsync once when the writer is closed
+    """
+
+    def __init__(self, sink, batch_rows: int = 50, flush_interval: float = 1.0,
+                 fsync: str = 'never', max_queue: int = 10000):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+        self.sink = sink
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+
+        # Statistics
+        self.rows_written = 0
+        self.batches_written = 0
+        self.rows_dropped = 0
+        self.bytes_written = 0
+        self.last_batch_latency = 0.0
+        self.avg_batch_latency = 0.0  # Exponential moving average
+        self.max_batch_latency = 0.0
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name='recording-writer')
+        self._thread.start()
+
+    def write(self, row: Sequence[Any]) -> bool:
+        """Queue one row without blocking; returns False if it had to be dropped."""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.rows_dropped += 1
+            return False
+
+    def close(self) -> None:
+        """Flush everything still queued, then close the sink."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _run(self) -> None:
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                row = self._queue.get(timeout=timeout)
+                if row is _CLOSE:
+                    break
+                batch.append(row)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass  # Flush deadline reached
+            if batch and (len(batch) >= self.batch_rows or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+        if batch:
+            self._flush(batch)
+        try:
+            if self.fsync in ('batch', 'close'):
+                self.sink.fsync()
+            self.sink.close()
+        except Exception as e:
+            logger.error(f"Error closing recording sink: {e}")
+
+    def _flush(self, batch) -> None:
+        start = time.monotonic()
+        try:
+            self.sink.write_rows(batch)
+            self.sink.flush()
+            if self.fsync == 'batch':
+                self.sink.fsync()
+            self.rows_written += len(batch)
+            self.batches_written += 1
+            self.bytes_written = getattr(self.sink, 'bytes_written', 0)
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} recorded rows: {e}")
+        latency = time.monotonic() - start
+        self.last_batch_latency = latency
+        self.avg_batch_latency = latency if self.batches_written <= 1 else 0.9 * self.avg_batch_latency + 0.1 * latency
+        self.max_batch_latency = max(self.max_batch_latency, latency)
+
+    def get_stats(self) -> dict:
+        return {
+            'rows_written': self.rows_written,
+            'batches_written': self.batches_written,
+            'rows_dropped': self.rows_dropped,
+            'queued': self._queue.qsize(),
+            'bytes_written': self.bytes_written,
+            'last_batch_latency': self.last_batch_latency,
+            'avg_batch_latency': self.avg_batch_latency,
+            'max_batch_latency': self.max_batch_latency
+        }
+
+
+class CsvSink:
+    """CSV file kept open for the whole session."""
+
+    def __init__(self, path: str, header: Sequence[str]):
+        self.path = path
+        self._file = open(path, mode='w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+        self.bytes_written = 0
+
+    def write_rows(self, rows) -> None:
+        self._writer.writerows(rows)
+
+    def flush(self) -> None:
+        self._file.flush()
+        self.bytes_written = self._file.tell()
+
+    def fsync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
@@ -1,12 +1,19 @@
 from flask import Blueprint, render_template, Response, send_file, jsonify, request
-import json
+import os
 import time
 import logging
-from .monitor import SystemMonitor
+import numpy as np
+from .monitor import SystemMonitor, ThermalGovernor
 from .video_stream import video_stream  # Import the singleton instance
-from .gpio import motor_controller, servo_arm, servo_gripper, mp3_player, encoder_tracker
+from .gpio import motor_controller, servo_arm, servo_gripper, mp3_player, encoder_tracker, wheel_controller
 from .sensor_interface import sensor_interface
-from .saving import data_collector
+from .control import control_channel
+from .sequencer import sequencer
+from .safety import obstacle_reflex
+from .mapping import map_builder
+from .saving import data_collector, session_recorder, session_catalog
+from .utils.geometry import simplify_path, decimate_path
+from .telemetry import REGISTRY, CONTENT_TYPE, tracer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,7 +21,7 @@ logger = logging.getLogger(__name__)
 
 routes = Blueprint('routes', __name__)
 system_monitor = SystemMonitor()
-is_recording = False  # Track recording state
+thermal_governor = ThermalGovernor(video_stream, sensor_interface)
 
 @routes.route('/')
 def index():
@@ -24,20 +31,65 @@ def index():
 @routes.route('/system-events')
 def system_events():
     """Server-Sent Events endpoint for system monitoring"""
-    def generate():
-        while True:
-            # Get current stats
-            stats = system_monitor.get_minimal_stats()
-            if stats:
-                yield f"data: {json.dumps(stats)}\n\n"
-            time.sleep(1)  # Update every second
-    
-    return Response(generate(), mimetype='text/event-stream')
+    return Response(system_monitor.topic.stream(), mimetype='text/event-stream')
 
 @routes.route('/api/system-stats')
 def get_system_stats():
     """Get full system statistics including history"""
-    return json.dumps(system_monitor.get_stats())
+    return system_monitor.snapshot.stats_json
+
+@routes.route('/thermal-events')
+def thermal_events():
+    """Server-Sent Events endpoint for the thermal governor level"""
+    return Response(thermal_governor.topic.stream(), mimetype='text/event-stream')
+
+@routes.route('/api/thermal')
+def thermal_status():
+    """Current thermal level, the reason for it and the latest sysfs readings"""
+    return jsonify({'status': 'success', **thermal_governor.get_status()})
+
+@routes.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+@routes.route('/api/trace')
+def export_trace():
+    """Recent spans as Chrome/Perfetto trace JSON (open in ui.perfetto.dev)"""
+    seconds = request.args.get('seconds', 10.0, type=float)
+    response = jsonify(tracer.export(seconds))
+    response.headers['Content-Disposition'] = f'attachment; filename=trace-{int(time.time())}.json'
+    return response
+
+@routes.route('/api/trace/toggle', methods=['POST'])
+def toggle_trace():
+    """Enable or disable span recording; body {"enabled": bool} or empty to flip"""
+    options = request.get_json(silent=True) or {}
+    tracer.enable(bool(options.get('enabled', not tracer.enabled)))
+    if options.get('clear'):
+        tracer.clear()
+    return jsonify({'status': 'success', **tracer.get_status()})
+
+@routes.route('/api/trace/status')
+def trace_status():
+    """Whether tracing is on and how many spans are kept"""
+    return jsonify({'status': 'success', **tracer.get_status()})
+
+@routes.route('/api/system-stats/history')
+def get_system_history():
+    """Long-range metric history; start/end are UNIX seconds, default the last 10 minutes"""
+    try:
+        now = time.time()
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        window = request.args.get('window', type=float)  # Seconds back from end, instead of start
+        if window is not None:
+            start = (end or now) - window
+        history = system_monitor.get_history(request.args.get('metric', 'cpu'), start, end,
+                                             request.args.get('resolution', type=float))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    return jsonify({'status': 'success', **history})
 
 @routes.route('/video_feed')
 def video_feed():
@@ -92,74 +144,256 @@ def get_video_stats():
 
 @routes.route('/api/encoder/path')
 def encoder_path_stream():
-    def generate():
-        while True:
-            try:
-                # Get updated position
-                x, y, _ = encoder_tracker.vehicle_path()
-                # Format data with higher precision
-                data = {
-                    'x': float(round(x, 4)),
-                    'y': float(round(y, 4))
-                }
-                yield f"data: {json.dumps(data)}\n\n"
-                time.sleep(0.2)  # Update 10 times per second for smoother path
-            except Exception as e:
-                logger.error(f"Error streaming encoder path: {e}")
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
-                time.sleep(1)  # Wait before retrying on error
-
-    return Response(generate(), mimetype='text/event-stream')
+    """Server-Sent Events endpoint pushing each new encoder position"""
+    return Response(encoder_tracker.topic.stream(), mimetype='text/event-stream')
+
+@routes.route('/api/encoder/path/points')
+def encoder_path_points():
+    """Path points after a cursor, optionally simplified, as JSON or packed float32"""
+    since = request.args.get('since', 0, type=int)
+    tolerance = request.args.get('tolerance', 0.0, type=float)  # meters
+    method = request.args.get('method', 'dp')  # 'dp' (Douglas-Peucker) or 'distance'
+    fmt = request.args.get('format', 'json')  # 'json' or 'f32'
+    if method not in ('dp', 'distance') or fmt not in ('json', 'f32'):
+        return jsonify({
+            'status': 'error',
+            'message': "method must be 'dp' or 'distance' and format 'json' or 'f32'"
+        }), 400
+
+    # Read before the path: a reset in between shows up as a new generation on the next message
+    generation = encoder_tracker.generation
+    points, first, cursor = encoder_tracker.get_path(max(since, 0))
+    if tolerance > 0:
+        points = simplify_path(points, tolerance) if method == 'dp' else decimate_path(points, tolerance)
+
+    if fmt == 'f32':
+        # Little-endian float32 x, y pairs; cursor metadata travels in headers
+        return Response(np.ascontiguousarray(points, dtype='<f4').tobytes(),
+                        mimetype='application/octet-stream',
+                        headers={
+                            'X-Path-First': str(first),
+                            'X-Path-Cursor': str(cursor),
+                            'X-Path-Generation': str(generation),
+                            'X-Path-Count': str(len(points))
+                        })
+    return jsonify({
+        'status': 'success',
+        'first': first,
+        'cursor': cursor,
+        'generation': generation,
+        'points': np.round(points, 4).tolist()
+    })
+
+@routes.route('/api/encoder/reset', methods=['POST'])
+def reset_encoder():
+    """Reset odometry to the origin"""
+    encoder_tracker.reset()
+    return '', 200
+
+@routes.route('/api/map/tiles')
+def map_tiles():
+    """Tiles changed after ?since=<version>; a client older than cleared_at must drop its tiles first"""
+    since = request.args.get('since', 0, type=int)
+    stats = map_builder.get_status()
+    if since < stats['cleared_at']:
+        since = 0
+    tiles = [{'tx': tx, 'ty': ty, 'version': version} for tx, ty, version in map_builder.grid.changed_since(since)]
+    return jsonify({'status': 'success', **stats, 'changed': tiles})
+
+@routes.route('/api/map/tile/<int(signed=True):tx>/<int(signed=True):ty>.png')
+def map_tile_png(tx, ty):
+    png = map_builder.grid.tile_png(tx, ty)
+    if png is None:
+        return jsonify({'status': 'error', 'message': 'No such tile'}), 404
+    return Response(png, mimetype='image/png', headers={'Cache-Control': 'no-cache'})
+
+@routes.route('/api/map/delta')
+def map_delta():
+    """Binary delta of tiles changed after ?since=<version>, see modules/mapping/grid.py for the layout"""
+    since = request.args.get('since', 0, type=int)
+    if since < map_builder.grid.cleared_at:
+        since = 0
+    return Response(map_builder.grid.delta(since), mimetype='application/octet-stream')
+
+@routes.route('/api/map/reset', methods=['POST'])
+def reset_map():
+    map_builder.reset()
+    return jsonify({'status': 'success', **map_builder.get_status()})
 
 @routes.route('/api/gpio/motor/forward', methods=['POST'])
 def forward():
+    control_channel.release_drive()
+    wheel_controller.release()
     motor_controller.forward()
     return '', 200
 
 @routes.route('/api/gpio/motor/backward', methods=['POST'])
 def backward():
+    control_channel.release_drive()
+    wheel_controller.release()
     motor_controller.backward()
     return '', 200
 
 @routes.route('/api/gpio/motor/left', methods=['POST'])
 def left():
+    control_channel.release_drive()
+    wheel_controller.release()
     motor_controller.left()
     return '', 200
 
 @routes.route('/api/gpio/motor/right', methods=['POST'])
 def right():
+    control_channel.release_drive()
+    wheel_controller.release()
     motor_controller.right()
     return '', 200
 
 @routes.route('/api/gpio/motor/stop', methods=['POST'])
 def stop():
+    control_channel.release_drive()
+    wheel_controller.release()
     motor_controller.stop()
     return '', 200
 
+@routes.route('/api/gpio/motor/velocity', methods=['POST'])
+def set_velocity():
+    """Closed-loop drive: v in m/s and omega in rad/s, ramped by the wheel controller"""
+    data = request.get_json(silent=True) or {}
+    control_channel.release_drive()
+    try:
+        wheel_controller.set_velocity(float(data.get('v', 0.0)), float(data.get('omega', 0.0)))
+    except (TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': f"Invalid velocity: {e}"}), 400
+    return jsonify({'status': 'success', **wheel_controller.get_status()})
+
+@routes.route('/api/gpio/motor/control-status')
+def wheel_control_status():
+    """Wheel loop setpoints, tracking error and timing jitter"""
+    return jsonify({'status': 'success', **wheel_controller.get_status()})
+
+@routes.route('/api/safety/status')
+def safety_status():
+    """Obstacle reflex state, current threshold and recent triggers with their latency"""
+    return jsonify({'status': 'success', **obstacle_reflex.get_status()})
+
+@routes.route('/api/safety/toggle', methods=['POST'])
+def toggle_safety():
+    obstacle_reflex.set_enabled(not obstacle_reflex.enabled)
+    return jsonify({'status': 'success', 'enabled': obstacle_reflex.enabled})
+
+@routes.route('/safety-events')
+def safety_events():
+    """Server-Sent Events endpoint for obstacle reflex triggers"""
+    return Response(obstacle_reflex.topic.stream(), mimetype='text/event-stream')
+
+SERVOS = {'arm': servo_arm, 'gripper': servo_gripper}
+
+@routes.route('/api/sequence', methods=['POST'])
+def run_sequence():
+    """Run a list of timed actions on the robot; see modules/sequencer.py for the format"""
+    data = request.get_json(silent=True) or {}
+    try:
+        sequence = sequencer.submit(data.get('actions'), replace=bool(data.get('replace', False)))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 409
+    control_channel.release_drive()
+    return jsonify({'status': 'success', 'sequence': sequence}), 202
+
+@routes.route('/api/sequence/cancel', methods=['POST'])
+def cancel_sequence():
+    return jsonify({'status': 'success', 'cancelled': sequencer.cancel()})
+
+@routes.route('/api/sequence/status')
+def sequence_status():
+    return jsonify({'status': 'success', **sequencer.get_status()})
+
+@routes.route('/sequence-events')
+def sequence_events():
+    """Server-Sent Events endpoint for sequence progress"""
+    return Response(sequencer.topic.stream(), mimetype='text/event-stream')
+
+@routes.route('/api/control', methods=['POST'])
+def control_command():
+    """HTTP fallback for the /ws/control channel: one JSON command per request"""
+    try:
+        reply = control_channel.submit(request.get_json(force=True))
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        return jsonify({'status': 'error', 'message': f"Invalid command: {e}"}), 400
+    return jsonify({'status': 'success', **(reply or {})})
+
+@routes.route('/api/control/status')
+def control_status():
+    return jsonify({'status': 'success', **control_channel.get_status()})
+
 @routes.route('/api/gpio/servo/up', methods=['POST'])
 def up():
-    servo_arm.arm_up()
-    return '', 200
+    return jsonify({'status': 'success', 'move': servo_arm.arm_up()})
 
 @routes.route('/api/gpio/servo/down', methods=['POST'])
 def down():
-    servo_arm.arm_down()
-    return '', 200
+    return jsonify({'status': 'success', 'move': servo_arm.arm_down()})
 
 @routes.route('/api/gpio/servo/close', methods=['POST'])
 def close():
-    servo_gripper.close_gripper()
-    return '', 200
+    return jsonify({'status': 'success', 'move': servo_gripper.close_gripper()})
 
 @routes.route('/api/gpio/servo/open', methods=['POST'])
 def open():
-    servo_gripper.open_gripper()
-    return '', 200
+    return jsonify({'status': 'success', 'move': servo_gripper.open_gripper()})
+
+@routes.route('/api/gpio/servo/<name>/move', methods=['POST'])
+def move_servo(name):
+    """Move a servo to a duty cycle (ns) with optional duration (s) and easing"""
+    servo = SERVOS.get(name)
+    if servo is None:
+        return jsonify({'status': 'error', 'message': f"Unknown servo '{name}'"}), 404
+    data = request.get_json(silent=True) or {}
+    try:
+        target = int(data['target'])
+        duration = None if data.get('duration') is None else float(data['duration'])
+        move = servo.move_to(target, duration=duration, easing=data.get('easing', 'ease_in_out'))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': f"Invalid move: {e}"}), 400
+    return jsonify({'status': 'success', 'move': move})
+
+@routes.route('/api/gpio/servo/<name>/stop', methods=['POST'])
+def stop_servo(name):
+    servo = SERVOS.get(name)
+    if servo is None:
+        return jsonify({'status': 'error', 'message': f"Unknown servo '{name}'"}), 404
+    servo.stop()
+    return jsonify({'status': 'success', 'move': servo.get_status()})
+
+@routes.route('/api/gpio/servo/status')
+def servo_status():
+    return jsonify({'status': 'success', 'servos': {name: servo.get_status() for name, servo in SERVOS.items()}})
 
 @routes.route('/api/gpio/player/sayhello', methods=['POST'])
 def play_hello():
-    mp3_player.play_song_one()
-    return '', 200
+    return jsonify({'status': 'success', **mp3_player.play_song_one()})
+
+@routes.route('/api/gpio/player/play/<clip>', methods=['POST'])
+def play_clip(clip):
+    """Queue a preloaded clip; body may set priority and policy (queue/interrupt/drop_if_busy)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        result = mp3_player.play(clip, priority=int(data.get('priority', 0)), policy=data.get('policy', 'queue'))
+    except (TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    if result['outcome'] == 'unavailable':
+        return jsonify({'status': 'error', 'message': f"Clip '{clip}' is not available"}), 404
+    return jsonify({'status': 'success', **result})
+
+@routes.route('/api/gpio/player/stop', methods=['POST'])
+def stop_audio():
+    mp3_player.stop()
+    return jsonify({'status': 'success'})
+
+@routes.route('/api/gpio/player/status')
+def audio_status():
+    return jsonify({'status': 'success', **mp3_player.get_status()})
 
 @routes.route('/video/camera-type')
 def get_camera_type():
@@ -185,13 +419,26 @@ def toggle_ai():
         is_ai_mode  = video_stream.toggle_ai()
     except Exception as e:
         successful = False
-        message = e
+        message = str(e)
     return jsonify({
         'status': 'success' if successful else 'error',
         'streaming': is_ai_mode if successful else False,
         'message': message
     })
 
+@routes.route('/api/ai/engines')
+def ai_engines():
+    """Registered inference engines, benchmark results and the active selection"""
+    engine = video_stream.engine
+    return jsonify({'status': 'success', 'active': engine.name if engine else None, **video_stream.engine_status()})
+
+@routes.route('/api/ai/benchmark', methods=['POST'])
+def ai_benchmark():
+    """Re-run the inference benchmark in the background and switch to the new choice"""
+    if not video_stream.benchmark_engines():
+        return jsonify({'status': 'error', 'message': 'Benchmark already running'}), 409
+    return jsonify({'status': 'success', 'state': video_stream.engine_status()['state']}), 202
+
 @routes.route('/video/toggle', methods=['POST'])
 def toggle_video():
     """Toggle video stream on/off"""
@@ -199,7 +446,7 @@ def toggle_video():
     message = "Video stream toggled successfully"
     try:
         is_streaming = video_stream.toggle_stream()
-    except Excetion as e:
+    except Exception as e:
         successful = False
         message = str(e)
     return jsonify({
@@ -211,29 +458,104 @@ def toggle_video():
 @routes.route('/sensor-data')
 def sensor_data():
     """Server-Sent Events endpoint for live sensor data."""
-    def generate():
-        while True:
-            try:
-                data = sensor_interface.get_latest_data()
-                if data:
-                    yield f"data: {json.dumps(data)}\n\n"
-                time.sleep(0.5)  # Adjust sampling rate as needed
-            except Exception as e:
-                print(f"Error in sensor-data SSE: {e}")
-                yield "data: {}\n\n"
-    return Response(generate(), mimetype='text/event-stream')
+    return Response(sensor_interface.topic.stream(), mimetype='text/event-stream')
 
 @routes.route('/api/recording/toggle', methods=['POST'])
 def toggle_recording():
     """Toggle the recording state."""
-    global is_recording
-    if is_recording:
+    if data_collector.is_collecting:
         data_collector.stop_collection()
-    else:
-        data_collector.start_collection()
-    is_recording = not is_recording
+    elif not data_collector.start_collection():
+        return jsonify({
+            'status': 'error',
+            'recording': False,
+            'message': 'Not enough free disk space to record'
+        }), 507
     return jsonify({
         'status': 'success',
-        'recording': is_recording,
+        'recording': data_collector.is_collecting,
         'message': 'Recording state toggled successfully'
-    })
\ No newline at end of file
+    })
+
+@routes.route('/api/recording/status')
+def recording_status():
+    """Data collector write metrics, segment and disk budget state."""
+    return jsonify({'status': 'success', **data_collector.get_stats()})
+
+@routes.route('/api/recorder/start', methods=['POST'])
+def start_session_recording():
+    """Start a synchronized frames/detections/sensors/odometry session."""
+    options = request.get_json(silent=True) or {}
+    try:
+        session_path = session_recorder.start(
+            frames=options.get('frames', 'jpeg'),
+            frame_stride=int(options.get('frame_stride', 1))
+        )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 507
+    return jsonify({
+        'status': 'success',
+        'session': os.path.basename(session_path)
+    })
+
+@routes.route('/api/recorder/stop', methods=['POST'])
+def stop_session_recording():
+    """Stop the synchronized session recording."""
+    session_path = session_recorder.stop()
+    return jsonify({
+        'status': 'success',
+        'session': os.path.basename(session_path) if session_path else None
+    })
+
+@routes.route('/api/recorder/status')
+def session_recording_status():
+    """Current session recorder state and per-stream writer stats."""
+    return jsonify({'status': 'success', **session_recorder.get_status()})
+
+def _columns_to_json(columns):
+    """Column arrays to JSON lists, with NaN as null."""
+    return {name: [None if v != v else v for v in np.asarray(values).tolist()] for name, values in columns.items()}
+
+def _optional_float(name):
+    value = request.args.get(name)
+    return None if value in (None, '') else float(value)
+
+@routes.route('/api/recordings')
+def list_recordings():
+    """Catalog of recorded sessions with their summaries."""
+    return jsonify({'status': 'success', 'recordings': session_catalog.list()})
+
+@routes.route('/api/recordings/<name>')
+def recording_details(name):
+    """Summary and per-stream metadata of one recording."""
+    entry = session_catalog.get(name)
+    if entry is None:
+        return jsonify({'status': 'error', 'message': f'Unknown recording {name}'}), 404
+    return jsonify({'status': 'success', 'recording': entry})
+
+@routes.route('/api/recordings/<name>/slice')
+def recording_slice(name):
+    """Rows between start and end seconds after the recording began."""
+    try:
+        max_rows = request.args.get('max_rows', type=int)
+        result = session_catalog.time_slice(name, _optional_float('start'), _optional_float('end'),
+                                            request.args.get('stream'), max_rows)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except KeyError as e:
+        return jsonify({'status': 'error', 'message': f'Unknown recording or stream {e}'}), 404
+    result['columns'] = _columns_to_json(result['columns'])
+    return jsonify({'status': 'success', **result})
+
+@routes.route('/api/recordings/<name>/overview')
+def recording_overview(name):
+    """Downsampled view of a whole recording stream."""
+    try:
+        result = session_catalog.overview(name, request.args.get('points', 500, type=int),
+                                          request.args.get('stream'))
+    except KeyError as e:
+        return jsonify({'status': 'error', 'message': f'Unknown recording or stream {e}'}), 404
+    result['columns'] = _columns_to_json(result['columns'])
+    return jsonify({'status': 'success', **result})
@@ -0,0 +1,205 @@
+"""
+Obstacle-stop reflex between the range sensors and the drive motors.
+
+The reflex listens to SensorInterface's topic directly, so each reading is
+checked on the sensor thread as soon as it is published, with no HTTP or SSE
+hop in between. The fused distance (nearest valid ultrasonic/lidar reading)
+is compared with a threshold that grows with speed:
+
+    threshold = min_distance + v * (sensor interval + reaction_budget) + v^2 / (2 * deceleration)
+
+i.e. the distance covered until the next reading can arrive, plus the
+distance needed to stop. Below it, the motors are stopped and forward motion
+is blocked in motorControl (turning and reversing stay allowed) until the
+distance clears the threshold by `clearance`. Optionally, a YOLO person box
+taller than person_height of the frame does the same. A watchdog also brakes
+if readings stop arriving while the robot drives forward.
+
+Each trigger records its sensor-to-brake latency, i.e. from the time the
+reading was taken to the time the motors were stopped.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+from .gpio import motor_controller, encoder_tracker, wheel_controller
+from .sensor_interface import sensor_interface
+from .video_stream import video_stream
+from .utils.pubsub import Topic
+from .telemetry import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+REFLEX_TRIGGERS = Counter('safety_reflex_triggers_total', 'Obstacle reflex brakes by cause', ['cause'])
+REFLEX_LATENCY = Histogram('safety_reflex_latency_seconds', 'Time from sensor reading to motor stop',
+                           buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+
+PERSON_CLASS = 0  # COCO class id used by the YOLO models
+
+
+class ObstacleReflex:
+    """Brakes and blocks forward motion when an obstacle is closer than the stopping distance."""
+
+    def __init__(self, motors, sensors, encoders=None, wheels=None, video=None, min_distance=10.0,
+                 reaction_budget=0.25, deceleration=0.5, clearance=5.0, person_height=0.6,
+                 stale_after=3.0, history=50):
+        self.motors = motors
+        self.sensors = sensors
+        self.encoders = encoders
+        self.wheels = wheels
+        self.video = video
+        self.min_distance = min_distance  # cm
+        self.reaction_budget = reaction_budget  # s, allowed sensor-to-brake latency (lidar reads take ~200 ms)
+        self.deceleration = deceleration  # m/s^2
+        self.clearance = clearance  # cm of hysteresis before forward motion is allowed again
+        self.person_height = person_height  # fraction of frame height
+        self.stale_after = stale_after  # sensor intervals without a reading before braking
+
+        self.enabled = True
+        self.blocked_by = set()  # Active causes: 'range', 'person', 'stale'
+        self.distance = None
+        self.threshold = min_distance
+        self.triggers = deque(maxlen=history)
+        self.budget_misses = 0
+        self._last_reading = time.monotonic()
+        self._lock = threading.Lock()
+        self.topic = Topic('safety')
+
+        sensors.topic.add_listener(self._on_reading)
+        if video is not None and person_height:
+            video.add_frame_listener(self._on_frame)
+        self._watchdog = threading.Thread(target=self._watch, name='obstacle-reflex', daemon=True)
+        self._watchdog.start()
+
+    def _speed(self) -> float:
+        """Forward speed in m/s, from odometry when available."""
+        if self.encoders is not None:
+            return max(0.0, self.encoders.get_pose()['v'])
+        return 0.0
+
+    def stopping_distance(self, speed: float) -> float:
+        """Threshold in cm for a forward speed in m/s."""
+        lead_time = self.sensors.interval + self.reaction_budget
+        return self.min_distance + 100 * (speed * lead_time + speed * speed / (2 * self.deceleration))
+
+    @staticmethod
+    def fuse(reading: dict) -> Optional[float]:
+        """Nearest valid distance (cm) across the sensors, or None if none is usable."""
+        distances = [sensor.get('distance') for sensor in (reading.get('ultrasonic', {}), reading.get('lidar', {}))]
+        valid = [d for d in distances if isinstance(d, (int, float)) and d >= 0]
+        return min(valid) if valid else None
+
+    def _on_reading(self, reading: dict) -> None:
+        now = time.monotonic()
+        self._last_reading = now
+        distance = self.fuse(reading)
+        taken = min((sensor['monotonic'] for sensor in reading.values()
+                     if isinstance(sensor, dict) and 'monotonic' in sensor), default=now)
+        with self._lock:
+            self.distance = distance
+            self.threshold = self.stopping_distance(self._speed())
+            if distance is None:
+                clear = not any(isinstance(sensor, dict) and sensor.get('distance') == -1.0
+                                for sensor in reading.values())
+                obstacle = False  # "Out of range" clears; sensor errors keep the current state
+            else:
+                obstacle = distance < self.threshold
+                clear = distance >= self.threshold + self.clearance
+        if obstacle:
+            self._trigger('range', taken, distance=distance)
+        elif clear:
+            self._release('range')
+        self._release('stale')
+
+    def _on_frame(self, capture_time, seq, frame_bytes, detections) -> None:
+        if detections is None:
+            return  # Inference skipped on this frame
+        try:
+            height = int(self.video.stats['resolution'].split('x')[1])
+        except (KeyError, ValueError, IndexError):
+            return
+        near = [det for det in detections if det[0] == PERSON_CLASS and height and
+                (det[5] - det[3]) / height >= self.person_height]
+        if near:
+            self._trigger('person', capture_time, confidence=round(max(det[1] for det in near), 3))
+        else:
+            self._release('person')
+
+    def _watch(self) -> None:
+        """Brake if readings stop while driving forward (e.g. the sensor thread stalled)."""
+        while True:
+            time.sleep(0.1)
+            silence = time.monotonic() - self._last_reading
+            if silence > self.stale_after * self.sensors.interval and self.motors.is_moving_forward():
+                self._trigger('stale', time.monotonic(), silence=round(silence, 3))
+
+    def _trigger(self, cause: str, taken: float, **details) -> None:
+        if not self.enabled:
+            return
+        moving = self.motors.is_moving_forward()
+        # Causes come from the sensor, video and watchdog threads; the lock keeps
+        # blocked_by and forward_blocked in step (publishing and braking stay outside it)
+        with self._lock:
+            newly_blocked = cause not in self.blocked_by
+            self.blocked_by.add(cause)
+            self.motors.forward_blocked = True
+        if not moving:
+            if newly_blocked:
+                self._publish()
+            return
+
+        # Brake first, book-keep after
+        if self.wheels is not None:
+            self.wheels.release()
+        self.motors.stop()
+        latency = time.monotonic() - taken
+
+        REFLEX_TRIGGERS.labels(cause).inc()
+        REFLEX_LATENCY.observe(latency)
+        over_budget = latency > self.reaction_budget
+        if over_budget:
+            self.budget_misses += 1
+        event = {'cause': cause, 'time': time.time(), 'latency_ms': round(latency * 1000, 2),
+                 'threshold': round(self.threshold, 1), 'over_budget': over_budget, **details}
+        self.triggers.append(event)
+        logger.warning(f"Obstacle reflex braked ({cause}): {event}")
+        self._publish()
+
+    def _release(self, cause: str) -> None:
+        with self._lock:
+            if cause not in self.blocked_by:
+                return
+            self.blocked_by.discard(cause)
+            if not self.blocked_by:
+                self.motors.forward_blocked = False
+        self._publish()
+
+    def set_enabled(self, enabled: bool) -> None:
+        with self._lock:
+            self.enabled = enabled
+            if not enabled:
+                self.blocked_by.clear()
+                self.motors.forward_blocked = False
+        self._publish()
+
+    def _publish(self) -> None:
+        self.topic.publish(self.get_status(history=1))
+
+    def get_status(self, history: Optional[int] = None) -> dict:
+        with self._lock:
+            blocked = sorted(self.blocked_by)
+        triggers = list(self.triggers)
+        return {
+            'enabled': self.enabled,
+            'blocked': blocked,
+            'distance': self.distance,
+            'threshold': round(self.threshold, 1),
+            'budget_ms': round(self.reaction_budget * 1000),
+            'budget_misses': self.budget_misses,
+            'triggers': triggers[-history:] if history else triggers,
+        }
+
+
+obstacle_reflex = ObstacleReflex(motor_controller, sensor_interface, encoder_tracker, wheel_controller, video_stream)
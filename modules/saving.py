@@ -1,71 +1,258 @@
-import csv
 import time
 import threading
 import os
+import logging
+from collections import deque
 from datetime import datetime
 from .gpio.encoder import encoder_tracker
 from .sensor_interface import sensor_interface
+from .video_stream import video_stream
+from .recording import BackgroundWriter, CsvSink, ColumnarSink, DiskBudget, SessionCatalog, SessionRecorder, \
+    sensor_row, DISK_OK, DISK_LOW, DISK_CRITICAL
+
+logger = logging.getLogger(__name__)
 
 class DataCollector:
-    def __init__(self, base_folder):
+    def __init__(self, base_folder, record_format='binary', compression=None,
+                 batch_rows=50, flush_interval=1.0, fsync='never', catalog=None,
+                 max_segment_bytes=None, max_segment_seconds=None, budget=None,
+                 low_disk_slowdown=4, check_interval=5.0):
+        if record_format not in ('binary', 'csv'):
+            raise ValueError("record_format must be 'binary' or 'csv'")
         self.base_folder = base_folder
-        self.csv_file_path = None
+        self.record_format = record_format  # 'binary' columnar session or legacy 'csv'
+        self.compression = compression  # None or 'zlib' (binary only)
+        self.session_path = None
         self.is_collecting = False
         self._collection_thread = None
+        self._writer = None
+        self.catalog = catalog  # SessionCatalog kept up to date as chunks are written
+
+        # Disk writes happen on the writer thread in batches, see BackgroundWriter
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        # A new segment (file) is started once either limit is reached
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.segments = 0
+        self._segment_started = None
+
+        # DiskBudget evicts old recordings; low free space slows sampling, critical stops it
+        self.budget = budget
+        self.low_disk_slowdown = low_disk_slowdown
+        self.check_interval = check_interval
+        self.disk_state = DISK_OK
+        self.stop_reason = None
+
+        # Write metrics across segments
+        self._bytes_closed = 0
+        self._closing = []  # Rotated-out writers still being closed in the background
+        self._closing_lock = threading.Lock()
+        self._throughput = deque(maxlen=12)  # (monotonic, total bytes) at each disk check
 
     def _generate_file_path(self):
         """Generate a unique file path based on the current date and time."""
         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-        return os.path.join(self.base_folder, f"{timestamp}.csv")
+        extension = 'rec' if self.record_format == 'binary' else 'csv'
+        path = os.path.join(self.base_folder, f"{timestamp}.{extension}")
+        suffix = 1
+        while os.path.exists(path):  # Segments rotated within the same second
+            path = os.path.join(self.base_folder, f"{timestamp}-{suffix}.{extension}")
+            suffix += 1
+        return path
+
+    def _open_sink(self):
+        if self.record_format == 'binary':
+            observer = self.catalog.observer(self.session_path) if self.catalog else None
+            return ColumnarSink(self.session_path, compression=self.compression, observer=observer)
+        return CsvSink(self.session_path, ['timestamp', 'x', 'y', 'ultrasonic', 'lidar'])
+
+    def _open_segment(self):
+        """Open a new file; the previous writer (if any) is returned for closing."""
+        previous = self._writer
+        self.session_path = self._generate_file_path()
+        self._writer = BackgroundWriter(self._open_sink(), self.batch_rows, self.flush_interval, self.fsync)
+        self._segment_started = time.monotonic()
+        self.segments += 1
+        return previous
+
+    def _close_writer(self, writer, keep):
+        """Flush and close a writer, then catalog it and evict old recordings past the budget."""
+        try:
+            writer.close()
+            if self.budget:
+                self.budget.enforce(keep=keep)  # Rescans the catalog first
+            elif self.catalog:
+                self.catalog.scan()  # Picks up CSV sessions, which have no chunk observer
+        except Exception as e:
+            logger.error(f"Error closing recording segment: {e}")
+        finally:
+            with self._closing_lock:
+                self._bytes_closed += writer.bytes_written
+                self._closing.remove((writer, threading.current_thread()))
+
+    def _retire(self, writer, background):
+        """Close a writer, on its own thread when background so sampling is not held up."""
+        keep = [self.session_path]
+        if not background:
+            with self._closing_lock:
+                self._closing.append((writer, threading.current_thread()))
+            self._close_writer(writer, keep)
+            return
+        thread = threading.Thread(target=self._close_writer, args=(writer, keep), name='segment-close', daemon=True)
+        with self._closing_lock:
+            self._closing.append((writer, thread))
+        thread.start()
+
+    def _segment_full(self):
+        if self.max_segment_bytes and self._writer.bytes_written >= self.max_segment_bytes:
+            return True
+        if self.max_segment_seconds and time.monotonic() - self._segment_started >= self.max_segment_seconds:
+            return True
+        return False
+
+    def _rotate(self):
+        """Continue in a new segment without a gap: open the next file, then close the last."""
+        previous = self._open_segment()
+        logger.info(f"Recording continues in segment {self.session_path}")
+        self._retire(previous, background=True)
+
+    def _check_disk(self):
+        """Sample the write rate and react to the free space left on the recording disk."""
+        self._throughput.append((time.monotonic(), self.bytes_written))
+        if not self.budget:
+            return
+        state = self.budget.state()
+        if state != self.disk_state:
+            logger.warning(f"Recording disk space is {state}")
+        self.disk_state = state
+        if state == DISK_CRITICAL:
+            logger.error("Stopping data collection: the recording disk is almost full")
+            self.stop_reason = 'disk_full'
+            self.is_collecting = False
 
     def start_collection(self, interval=0.5):
         """Start collecting data at a fixed interval."""
         if not self.is_collecting:
-            self.is_collecting = True
-            self.csv_file_path = self._generate_file_path()
+            # Wait for a collection that stopped by itself to finish closing its file
+            if self._collection_thread:
+                self._collection_thread.join()
 
             # Ensure the training folder exists
             os.makedirs(self.base_folder, exist_ok=True)
 
-            # Initialize the CSV file with headers
-            with open(self.csv_file_path, mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(['timestamp', 'x', 'y', 'ultrasonic', 'lidar'])
+            if self.budget:
+                self.disk_state = self.budget.state()
+                if self.disk_state == DISK_CRITICAL:
+                    self.stop_reason = 'disk_full'
+                    logger.error("Not starting data collection: the recording disk is almost full")
+                    return False
+                self.budget.enforce()
+
+            self.is_collecting = True
+            self.stop_reason = None
+            self.segments = 0
+            self._bytes_closed = 0
+            self._throughput.clear()
+
+            # Each segment stays open until it is rotated or collection stops
+            self._open_segment()
 
             self._collection_thread = threading.Thread(target=self._collect_data, args=(interval,))
             self._collection_thread.daemon = True
             self._collection_thread.start()
+        return True
 
     def stop_collection(self):
-        """Stop collecting data."""
+        """Stop collecting data and flush anything still queued."""
         self.is_collecting = False
         if self._collection_thread:
             self._collection_thread.join()
+            self._collection_thread = None
+
+    @property
+    def bytes_written(self):
+        with self._closing_lock:
+            closing = sum(writer.bytes_written for writer, _ in self._closing)
+            closed = self._bytes_closed
+        return closed + closing + (self._writer.bytes_written if self._writer else 0)
+
+    def get_stats(self):
+        """Write metrics for the current collection, including disk state."""
+        bytes_per_second = 0.0
+        if len(self._throughput) >= 2:
+            (t0, b0), (t1, b1) = self._throughput[0], self._throughput[-1]
+            bytes_per_second = (b1 - b0) / (t1 - t0) if t1 > t0 else 0.0
+        stats = {
+            'collecting': self.is_collecting,
+            'session': os.path.basename(self.session_path) if self.session_path else None,
+            'segments': self.segments,
+            'bytes_written': self.bytes_written,
+            'bytes_per_second': bytes_per_second,
+            'disk_state': self.disk_state,
+            'stop_reason': self.stop_reason,
+            'writer': self._writer.get_stats() if self._writer else None
+        }
+        if self.budget:
+            stats['budget'] = self.budget.get_stats()
+        return stats
 
     def _collect_data(self, interval):
-        """Collect data from the robot's position and sensors."""
+        """Sample the robot's position and sensors on a fixed schedule."""
+        next_sample = next_check = time.monotonic()
         while self.is_collecting:
+            if time.monotonic() >= next_check:
+                self._check_disk()
+                next_check += self.check_interval
+                if not self.is_collecting:
+                    break
             try:
-                # Get robot position
-                x, y = encoder_tracker.get_position()
+                # Get robot pose
+                pose = encoder_tracker.get_pose()
 
                 # Get sensor data
                 sensor_data = sensor_interface.get_latest_data()
                 ultrasonic = sensor_data.get('ultrasonic', {}).get('distance', -1)
                 lidar = sensor_data.get('lidar', {}).get('distance', -1)
 
-                # Get the current time in HH:MM:SS format
-                timestamp = datetime.now().strftime('%H:%M:%S')
+                # Queue the row; the writer thread does the disk I/O
+                if self.record_format == 'binary':
+                    row = sensor_row(time.monotonic(), pose['x'], pose['y'], pose['theta'], ultrasonic, lidar)
+                else:
+                    # Get the current time in HH:MM:SS format
+                    timestamp = datetime.now().strftime('%H:%M:%S')
+                    row = [timestamp, pose['x'], pose['y'], ultrasonic, lidar]
+                self._writer.write(row)
 
-                # Write data to CSV
-                with open(self.csv_file_path, mode='a', newline='') as file:
-                    writer = csv.writer(file)
-                    writer.writerow([timestamp, x, y, ultrasonic, lidar])
+                if self._segment_full():
+                    self._rotate()
 
             except Exception as e:
                 print(f"Error collecting data: {e}")
 
-            time.sleep(interval)
+            # Sample less often while free space is low, to make it last
+            next_sample += interval * (self.low_disk_slowdown if self.disk_state == DISK_LOW else 1)
+            time.sleep(max(0.0, next_sample - time.monotonic()))
+
+        # Segments rotated out just before stopping must be on disk when stop_collection() returns
+        with self._closing_lock:
+            threads = [thread for _, thread in self._closing]
+        for thread in threads:
+            thread.join()
+        writer, self._writer = self._writer, None
+        self._retire(writer, background=False)
+
+# Catalog of every recording in the training folder
+session_catalog = SessionCatalog(f'{os.path.dirname(os.path.realpath(__file__))}/training')
+
+# Initialize the data collector with the training folder: 30 minute segments, 2 GiB for all recordings
+recording_budget = DiskBudget(session_catalog, max_bytes=2 * 1024 ** 3)
+data_collector = DataCollector(session_catalog.base_folder, catalog=session_catalog,
+                               max_segment_bytes=64 * 1024 ** 2, max_segment_seconds=30 * 60,
+                               budget=recording_budget)
 
-# Initialize the data collector with the training folder
-data_collector = DataCollector(f'{os.path.dirname(os.path.realpath(__file__))}/training')
+# Multimodal recorder writing synchronized sessions to the same folder, under the same budget
+session_recorder = SessionRecorder(data_collector.base_folder, video_stream, encoder_tracker, sensor_interface,
+                                   catalog=session_catalog, budget=recording_budget)
@@ -4,14 +4,25 @@ from typing import Dict, Optional, List
 import threading
 from queue import Queue
 import json
-from gpiozero import DistanceSensor
-import board
-import busio
-import adafruit_vl53l0x
+from .simulation import SIMULATION
+from .utils.pubsub import Topic
+from .telemetry import Counter, Histogram, tracer
+
+if SIMULATION:
+    from .simulation.sensors import DistanceSensor, VL53L0X
+else:
+    from gpiozero import DistanceSensor
+    import board
+    import busio
+    import adafruit_vl53l0x
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+SENSOR_READ_SECONDS = Histogram('sensor_read_seconds', 'Time to read one distance sensor', ['sensor'],
+                                buckets=(0.001, 0.005, 0.01, 0.02, 0.03, 0.05, 0.075, 0.1, 0.25, 0.5))
+SENSOR_READ_ERRORS = Counter('sensor_read_errors_total', 'Sensor readings that returned an error value', ['sensor'])
+
 class SensorInterface:
     def __init__(self):
         self.sensor_data = {}
@@ -20,12 +31,18 @@ class SensorInterface:
         self._collection_thread = None
         self._lock = threading.Lock()
         self._lidar = None
+        self.topic = Topic('sensor-data')  # Notifies SSE clients of each new reading
+        self.base_interval = 0.5  # Match the interval with the data collector
+        self.interval = self.base_interval
 
         # Initialize the VL53L0X sensor
         try:
             logger.info("Initializing VL53L0X sensor...")
-            i2c = busio.I2C(board.SCL, board.SDA)
-            self._lidar = adafruit_vl53l0x.VL53L0X(i2c)
+            if SIMULATION:
+                self._lidar = VL53L0X()
+            else:
+                i2c = busio.I2C(board.SCL, board.SDA)
+                self._lidar = adafruit_vl53l0x.VL53L0X(i2c)
             self._lidar.measurement_timing_budget = 200000  # Optional: Set timing budget
             time.sleep(0.1)  # Allow sensor to stabilize
             logger.info("VL53L0X sensor initialized successfully")
@@ -53,12 +70,17 @@ class SensorInterface:
 
     def _collect_data(self) -> None:
         """Continuously collect data from sensors."""
-        interval = 0.5  # Match the interval with the data collector
         while self.is_collecting:
             try:
                 # Real-time sensor readings
-                ultrasonic_reading = self._read_ultrasonic_sensor()
-                lidar_reading = self._read_lidar_sensor()
+                with tracer.span('ultrasonic_read', 'sensors'), SENSOR_READ_SECONDS.labels('ultrasonic').time():
+                    ultrasonic_reading = self._read_ultrasonic_sensor()
+                with tracer.span('lidar_read', 'sensors'), SENSOR_READ_SECONDS.labels('lidar').time():
+                    lidar_reading = self._read_lidar_sensor()
+                if ultrasonic_reading['distance'] == -1.0:
+                    SENSOR_READ_ERRORS.labels('ultrasonic').inc()
+                if lidar_reading['distance'] == -1.0:
+                    SENSOR_READ_ERRORS.labels('lidar').inc()
 
                 # Check if ultrasonic sensor distance is greater than 100 cm
                 if ultrasonic_reading['distance'] > 100:
@@ -69,6 +91,9 @@ class SensorInterface:
                         'ultrasonic': ultrasonic_reading,
                         'lidar': lidar_reading
                     })
+                    snapshot = self.sensor_data.copy()
+                with tracer.span('publish', 'sensors'):
+                    self.topic.publish(snapshot)
 
                 logger.debug(f"Ultrasonic Reading: {ultrasonic_reading}")
                 logger.debug(f"Lidar Reading: {lidar_reading}")
@@ -76,7 +101,11 @@ class SensorInterface:
             except Exception as e:
                 logger.error(f"Error collecting sensor data: {e}")
 
-            time.sleep(interval)  # Adjusted interval
+            time.sleep(self.interval)  # Adjusted interval
+
+    def set_interval(self, interval: Optional[float] = None) -> None:
+        """Slow the collection loop down to at least `interval` seconds; None restores the default."""
+        self.interval = max(self.base_interval, interval) if interval else self.base_interval
 
     def _read_ultrasonic_sensor(self) -> Dict[str, float]:
         """Read data from ultrasonic sensor using gpiozero"""
@@ -95,7 +124,8 @@ class SensorInterface:
             if raw_distance_1 > 400:  # 400 cm is the max_distance in cm
                 return {
                     'distance': "Out of range",
-                    'timestamp': time.time()
+                    'timestamp': time.time(),
+                    'monotonic': time.monotonic()
                 }
         except Exception as e:
             logger.error(f"Error reading ultrasonic sensor: {e}")
@@ -103,7 +133,8 @@ class SensorInterface:
 
         return {
             'distance': distance,
-            'timestamp': time.time()
+            'timestamp': time.time(),
+            'monotonic': time.monotonic()  # Capture time on the shared recording clock
         }
 
     def _read_lidar_sensor(self) -> Dict[str, float]:
@@ -112,7 +143,8 @@ class SensorInterface:
             logger.debug("Lidar sensor not initialized (_lidar is None)")
             return {
                 'distance': -1.0,
-                'timestamp': time.time()
+                'timestamp': time.time(),
+                'monotonic': time.monotonic()
             }
 
         try:
@@ -131,7 +163,8 @@ class SensorInterface:
 
         return {
             'distance': distance,
-            'timestamp': time.time()
+            'timestamp': time.time(),
+            'monotonic': time.monotonic()  # Capture time on the shared recording clock
         }
 
     def get_latest_data(self) -> Dict[str, float]:
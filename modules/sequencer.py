@@ -0,0 +1,329 @@
+"""
+Timed action sequences for scripted manoeuvres (e.g. pick-and-place).
+
+A sequence is a list of actions submitted in one request and run by a single
+scheduler thread against time.monotonic() deadlines, so steps are spaced by
+the robot's clock rather than by network round trips. Back-to-back timed
+steps are chained from the previous step's deadline, not from when it
+actually finished, so small wake-up delays do not accumulate.
+
+Actions (JSON objects, "action" selects the kind):
+    {"action": "drive", "speed": 0.6, "turn": 0, "ms": 800}      open loop, for a duration
+    {"action": "drive", "v": 0.08, "omega": 0, "ticks": 40}      closed loop, until ticks
+    {"action": "stop"}
+    {"action": "servo", "servo": "arm", "position": "down"}       or "target": duty ns
+    {"action": "wait", "ms": 250}
+    {"action": "wait_distance", "below": 12, "sensor": "ultrasonic", "timeout_ms": 5000}
+    {"action": "play", "clip": "hello", "policy": "queue"}
+
+A drive step stops the motors when it ends unless the next step is also a
+drive. Tick- and distance-terminated steps take timeout_ms (default 10 s)
+and fail the sequence if it passes. Cancelling, failing or finishing a
+sequence always leaves the motors stopped.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+from .gpio import motor_controller, servo_arm, servo_gripper, mp3_player, encoder_tracker, wheel_controller
+from .sensor_interface import sensor_interface
+from .utils.pubsub import Topic
+from .telemetry import Histogram, tracer
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_STEP_LATENESS = Histogram('sequence_step_lateness_seconds', 'How late each timed sequence step ended',
+                                   buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05))
+
+ACTIONS = ('drive', 'stop', 'servo', 'wait', 'wait_distance', 'play')
+DEFAULT_TIMEOUT_MS = 10_000
+MAX_ACTIONS = 200
+
+
+class SequenceCancelled(Exception):
+    pass
+
+
+class ActionSequencer:
+    """Runs one action sequence at a time on a scheduler thread."""
+
+    def __init__(self, motors, servos, player, sensors, encoders, wheels=None):
+        self.motors = motors
+        self.servos = servos
+        self.player = player
+        self.sensors = sensors
+        self.encoders = encoders
+        self.wheels = wheels
+        self.topic = Topic('sequence')
+
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._queued = None
+        self._current = None
+        self._cancel = False
+        self._thread = threading.Thread(target=self._run, name='sequencer', daemon=True)
+        self._thread.start()
+
+    # Submission and control
+
+    def validate(self, actions: List[Dict]) -> List[Dict]:
+        """Check a sequence before it runs; raises ValueError describing the first bad step."""
+        if not isinstance(actions, list) or not actions:
+            raise ValueError("actions must be a non-empty list")
+        if len(actions) > MAX_ACTIONS:
+            raise ValueError(f"at most {MAX_ACTIONS} actions per sequence")
+        for index, action in enumerate(actions):
+            kind = action.get('action') if isinstance(action, dict) else None
+            try:
+                if kind not in ACTIONS:
+                    raise ValueError(f"unknown action '{kind}', expected one of {ACTIONS}")
+                if kind == 'drive':
+                    if ('ms' in action) == ('ticks' in action):
+                        raise ValueError("drive needs exactly one of ms or ticks")
+                    if 'v' in action and self.wheels is None:
+                        raise ValueError("closed-loop drive is not available")
+                    float(action.get('ms', action.get('ticks')))
+                elif kind == 'servo':
+                    if action.get('servo') not in self.servos:
+                        raise ValueError(f"unknown servo '{action.get('servo')}'")
+                    self._servo_target(action)
+                elif kind == 'wait':
+                    float(action['ms'])
+                elif kind == 'wait_distance':
+                    float(action['below'])
+                    if action.get('sensor', 'ultrasonic') not in ('ultrasonic', 'lidar'):
+                        raise ValueError("sensor must be ultrasonic or lidar")
+                elif kind == 'play' and action.get('clip') not in self.player.clips:
+                    raise ValueError(f"unknown clip '{action.get('clip')}'")
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"step {index} ({kind}): {e}")
+        return actions
+
+    def submit(self, actions: List[Dict], replace: bool = False) -> dict:
+        """Queue a sequence to start now; with replace, cancel any running one first."""
+        self.validate(actions)
+        with self._condition:
+            busy = self._queued is not None or (self._current is not None and self._current['state'] == 'running')
+            if busy and not replace:
+                raise RuntimeError("A sequence is already running")
+            self._cancel = busy
+            self._queued = self._new_sequence(actions)
+            self._condition.notify_all()
+            return self._summary(self._queued)
+
+    def cancel(self) -> bool:
+        """Cancel the running or queued sequence; returns whether there was one."""
+        with self._condition:
+            active = self._queued is not None or (self._current is not None and self._current['state'] == 'running')
+            self._queued = None
+            self._cancel = active
+            self._condition.notify_all()
+            return active
+
+    def _new_sequence(self, actions):
+        return {
+            'id': next(self._ids),
+            'state': 'queued',
+            'step': 0,
+            'total': len(actions),
+            'actions': actions,
+            'steps': [{'action': action['action'], 'state': 'pending'} for action in actions],
+            'started': None,
+            'elapsed_ms': 0.0,
+            'error': None,
+        }
+
+    # Scheduler
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._queued is None:
+                    self._condition.wait()
+                sequence, self._queued = self._queued, None
+                self._cancel = False
+                self._current = sequence
+            try:
+                self._execute(sequence)
+                state = 'done'
+            except SequenceCancelled:
+                state = 'cancelled'
+            except Exception as e:
+                logger.error(f"Sequence {sequence['id']} failed at step {sequence['step']}: {e}")
+                sequence['error'] = str(e)
+                state = 'failed'
+            self._stop_motors()
+            with self._condition:
+                sequence['state'] = state
+                sequence['elapsed_ms'] = round((time.monotonic() - sequence['started']) * 1000, 3)
+                for step in sequence['steps']:
+                    if step['state'] in ('pending', 'running'):
+                        step['state'] = 'skipped' if step['state'] == 'pending' else state
+                self._condition.notify_all()
+            self._publish(sequence)
+
+    def _execute(self, sequence):
+        start = time.monotonic()
+        sequence['started'] = start
+        sequence['state'] = 'running'
+        deadline = start  # Where the previous step ended on the schedule
+        actions = sequence['actions']
+        for index, action in enumerate(actions):
+            step = sequence['steps'][index]
+            now = time.monotonic()
+            with self._condition:
+                sequence['step'] = index
+                step.update({'state': 'running', 'started_ms': round((now - start) * 1000, 3)})
+            self._publish(sequence)
+
+            with tracer.span(f"sequence_{action['action']}", 'sequencer', step=index):
+                deadline = self._perform(action, deadline, now)
+            if action['action'] == 'drive' and (index + 1 == len(actions) or actions[index + 1]['action'] != 'drive'):
+                self._stop_motors()
+
+            ended = time.monotonic()
+            step.update({'state': 'done', 'ended_ms': round((ended - start) * 1000, 3)})
+            if deadline is not None:
+                step['lateness_ms'] = round((ended - deadline) * 1000, 3)
+                SEQUENCE_STEP_LATENESS.observe(max(0.0, ended - deadline))
+            else:
+                deadline = ended  # Event-terminated: the schedule continues from now
+        sequence['step'] = len(actions)
+
+    def _perform(self, action, deadline, now) -> Optional[float]:
+        """Run one action; returns its scheduled end, or None if it ended on an event."""
+        kind = action['action']
+        # Chain timed steps on the schedule unless we are already behind it
+        base = deadline if deadline is not None and deadline <= now else now
+
+        if kind == 'drive':
+            if 'v' in action:
+                self.wheels.set_velocity(float(action['v']), float(action.get('omega', 0.0)))
+            else:
+                if self.wheels is not None:
+                    self.wheels.release()
+                self.motors.drive(float(action.get('speed', 1.0)), float(action.get('turn', 0.0)))
+            if 'ms' in action:
+                return self._sleep_until(base + float(action['ms']) / 1000)
+            return self._wait_for_ticks(int(action['ticks']), self._timeout(action, now))
+        if kind == 'stop':
+            self._stop_motors()
+            return None
+        if kind == 'servo':
+            servo = self.servos[action['servo']]
+            servo.move_to(self._servo_target(action), duration=action.get('duration'),
+                          easing=action.get('easing', 'ease_in_out'))
+            if action.get('wait', True):
+                self._wait_on(lambda: not servo.get_status().get('moving'), self._timeout(action, now), poll=0.01)
+            return None
+        if kind == 'wait':
+            return self._sleep_until(base + float(action['ms']) / 1000)
+        if kind == 'wait_distance':
+            self._wait_for_distance(float(action['below']), action.get('sensor', 'ultrasonic'),
+                                    self._timeout(action, now))
+            return None
+        if kind == 'play':
+            result = self.player.play(action['clip'], priority=int(action.get('priority', 0)),
+                                      policy=action.get('policy', 'queue'))
+            if result['outcome'] == 'unavailable':
+                raise RuntimeError(f"clip {action['clip']} unavailable")
+            return None
+        raise ValueError(f"unknown action {kind}")
+
+    @staticmethod
+    def _timeout(action, now):
+        return now + float(action.get('timeout_ms', DEFAULT_TIMEOUT_MS)) / 1000
+
+    def _servo_target(self, action):
+        if 'target' in action:
+            return int(action['target'])
+        servo = self.servos[action['servo']]
+        positions = {'up': servo.up_position, 'down': servo.down_position,
+                     'closed': servo.closed_position, 'open': servo.opened_position}
+        if action.get('position') not in positions:
+            raise ValueError(f"servo needs target or position in {sorted(positions)}")
+        return positions[action['position']]
+
+    def _sleep_until(self, deadline) -> float:
+        """Wait until deadline; a cancel wakes the condition and aborts the sequence."""
+        with self._condition:
+            while True:
+                if self._cancel:
+                    raise SequenceCancelled()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return deadline
+                self._condition.wait(remaining)
+
+    def _wait_on(self, done, timeout_at, poll=None):
+        """Wait until done() is true, waking on notify (or every poll seconds)."""
+        with self._condition:
+            while not done():
+                if self._cancel:
+                    raise SequenceCancelled()
+                remaining = timeout_at - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("step timed out")
+                self._condition.wait(min(remaining, poll) if poll else remaining)
+        if self._cancel:
+            raise SequenceCancelled()
+
+    def _notify(self, _data=None):
+        with self._condition:
+            self._condition.notify_all()
+
+    def _wait_for_ticks(self, ticks, timeout_at):
+        start_left, start_right = self.encoders.get_tick_counts()
+
+        def reached():
+            left, right = self.encoders.get_tick_counts()
+            return ((left - start_left) + (right - start_right)) / 2 >= ticks
+
+        self.encoders.topic.add_listener(self._notify)
+        try:
+            self._wait_on(reached, timeout_at, poll=0.1)
+        finally:
+            self.encoders.topic.remove_listener(self._notify)
+        return None
+
+    def _wait_for_distance(self, below, sensor, timeout_at):
+        def reached():
+            reading = self.sensors.get_latest_data().get(sensor, {})
+            distance = reading.get('distance')
+            return isinstance(distance, (int, float)) and 0 <= distance < below
+
+        self.sensors.topic.add_listener(self._notify)
+        try:
+            self._wait_on(reached, timeout_at)
+        finally:
+            self.sensors.topic.remove_listener(self._notify)
+
+    def _stop_motors(self):
+        if self.wheels is not None:
+            self.wheels.release()
+        self.motors.stop()
+
+    # Progress
+
+    def _summary(self, sequence):
+        summary = {key: value for key, value in sequence.items() if key != 'actions'}
+        summary['steps'] = [dict(step) for step in sequence['steps']]
+        if sequence['state'] == 'running':
+            summary['elapsed_ms'] = round((time.monotonic() - sequence['started']) * 1000, 3)
+        return summary
+
+    def _publish(self, sequence):
+        with self._condition:
+            summary = self._summary(sequence)
+        self.topic.publish(summary)
+
+    def get_status(self) -> dict:
+        with self._condition:
+            sequence = self._queued or self._current
+            return {'sequence': self._summary(sequence) if sequence else None}
+
+
+sequencer = ActionSequencer(motor_controller, {'arm': servo_arm, 'gripper': servo_gripper}, mp3_player,
+                            sensor_interface, encoder_tracker, wheel_controller)
@@ -0,0 +1,24 @@
+"""
+Hardware Simulation Package
+
+Drop-in replacements for the robot's hardware libraries so the whole server
+can run (and be profiled) on any Linux machine.
+
+Enable it by setting an environment variable before starting the server:
+    ROBOT_SIMULATION=1 python app.py
+
+When enabled, the hardware modules import their devices from here instead of
+gpiozero, board/busio, adafruit_vl53l0x, pygame and picamera2:
+    - gpio.py:    PWMOutputDevice / DigitalInputDevice (encoders tick from motor duty)
+    - sensors.py: DistanceSensor (ultrasonic) and VL53L0X (lidar) with real read timing
+    - sysfs.py:   a mock /sys/class/pwm tree for the servos
+    - audio.py:   a pygame-compatible null mixer
+    - camera.py:  a synthetic Picamera2 producing paced frames
+All of them share one simulated robot in world.py.
+"""
+
+import os
+
+SIMULATION = os.environ.get('ROBOT_SIMULATION', '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+__all__ = ['SIMULATION']
@@ -0,0 +1,103 @@
+"""Null audio backend exposing the subset of pygame used by MP3Player.
+
+Import it in place of pygame (``from ..simulation import audio as pygame``).
+Playback produces no sound but stays "busy" for the clip's estimated length,
+so code that waits on audio keeps its real timing. Both mixer.music and
+preloaded mixer.Sound clips are supported.
+"""
+
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+ASSUMED_BITRATE = 128_000  # bits per second, used to estimate clip length
+
+class error(Exception):
+    """Mirror of pygame.error."""
+
+
+def clip_duration(file_path):
+    """Estimate a clip's playback length in seconds from its size."""
+    try:
+        return os.path.getsize(file_path) * 8 / ASSUMED_BITRATE
+    except OSError as e:
+        raise error(str(e))
+
+
+class _Music:
+    def __init__(self):
+        self._file_path = None
+        self._duration = 0.0
+        self._ends_at = 0.0
+
+    def load(self, file_path):
+        self._duration = clip_duration(file_path)
+        self._file_path = file_path
+
+    def play(self, loops=0, start=0.0):
+        if self._file_path is None:
+            raise error("music not loaded")
+        self._ends_at = time.monotonic() + self._duration * (loops + 1) - start
+        logger.debug(f"Simulated playback of {self._file_path} ({self._duration:.1f}s)")
+
+    def stop(self):
+        self._ends_at = 0.0
+
+    def get_busy(self):
+        return time.monotonic() < self._ends_at
+
+
+class _Channel:
+    def __init__(self, duration):
+        self._ends_at = time.monotonic() + duration
+
+    def stop(self):
+        self._ends_at = 0.0
+
+    def get_busy(self):
+        return time.monotonic() < self._ends_at
+
+
+class Sound:
+    """Stand-in for pygame.mixer.Sound; 'decoding' only measures the clip."""
+
+    def __init__(self, file_path):
+        self._duration = clip_duration(file_path)
+        self._channels = []
+        logger.debug(f"Simulated decode of {file_path} ({self._duration:.1f}s)")
+
+    def get_length(self):
+        return self._duration
+
+    def play(self, loops=0):
+        channel = _Channel(self._duration * (loops + 1))
+        self._channels = [c for c in self._channels if c.get_busy()] + [channel]
+        return channel
+
+    def stop(self):
+        for channel in self._channels:
+            channel.stop()
+        self._channels = []
+
+
+class _Mixer:
+    Sound = Sound
+
+    def __init__(self):
+        self.music = _Music()
+        self._initialized = False
+
+    def init(self, *args, **kwargs):
+        self._initialized = True
+        logger.info("Simulated audio mixer initialized (no sound output)")
+
+    def get_init(self):
+        return self._initialized
+
+    def quit(self):
+        self._initialized = False
+
+
+mixer = _Mixer()
@@ -0,0 +1,82 @@
+"""Synthetic camera exposing the subset of Picamera2 used by VideoStream."""
+
+import time
+import logging
+import cv2
+import numpy as np
+from .world import sim_world
+
+logger = logging.getLogger(__name__)
+
+class Picamera2:
+    """Generates paced 4-channel frames (like the XBGR8888 preview stream), or planar YUV420, that track the simulated robot."""
+
+    def __init__(self, camera_num=0):
+        self.sensor_modes = [{'size': (640, 480), 'fps': 30.0, 'format': 'SRGGB10_CSI2P'}]
+        self.size = (640, 480)
+        self.frame_duration = 1 / 30
+        self._next_frame = 0.0
+        self._started = False
+        self._background = None
+        self.format = 'XBGR8888'
+
+    def create_preview_configuration(self, main=None, **kwargs):
+        size = tuple((main or {}).get('size', self.size))
+        return {'main': {'size': size, 'format': (main or {}).get('format', 'XBGR8888')}}
+
+    def create_video_configuration(self, main=None, **kwargs):
+        return self.create_preview_configuration(main, **kwargs)
+
+    def configure(self, config):
+        self.size = tuple(config['main']['size'])
+        self.format = config['main'].get('format', 'XBGR8888')
+        width, height = self.size
+        # Static gradient scrolled horizontally as the robot turns
+        xs = np.linspace(0, 255, width, dtype=np.float32)
+        ys = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        self._background = np.zeros((height, width, 4), dtype=np.uint8)
+        self._background[..., 0] = xs.astype(np.uint8)
+        self._background[..., 1] = ys.astype(np.uint8)
+        self._background[..., 2] = ((xs + ys) / 2).astype(np.uint8)
+        self._background[..., 3] = 255
+
+    def set_controls(self, controls):
+        limits = controls.get('FrameDurationLimits')
+        if limits:
+            self.frame_duration = limits[0] / 1_000_000
+
+    def start(self):
+        if self._background is None:
+            self.configure(self.create_preview_configuration())
+        self._started = True
+        self._next_frame = time.monotonic()
+        logger.info("Synthetic camera started at %sx%s", *self.size)
+
+    def stop(self):
+        self._started = False
+
+    def close(self):
+        self.stop()
+
+    def capture_array(self, name='main'):
+        """Block until the next frame is due, like a sensor running at a fixed frame rate."""
+        if not self._started:
+            raise RuntimeError("Camera not started")
+        now = time.monotonic()
+        if self._next_frame > now:
+            time.sleep(self._next_frame - now)
+        self._next_frame = max(self._next_frame + self.frame_duration, time.monotonic())
+
+        x, y, theta = sim_world.get_pose()
+        width, height = self.size
+        shift = int(theta / (2 * np.pi) * width) % width
+        frame = np.roll(self._background, shift, axis=1)
+        # Obstacle-like block whose size follows the forward range reading
+        distance = sim_world.raycast()
+        block = int(min(height / 2, 40 / max(distance, 0.05)))
+        top, left = height // 2 - block // 2, width // 2 - block // 2
+        frame[top:top + block, left:left + block, :3] = (40, 40, 200)
+        if self.format == 'YUV420':
+            # Frames hold [R, G, B, X] pixels, like the real XBGR8888 stream
+            return cv2.cvtColor(frame, cv2.COLOR_RGBA2YUV_I420)
+        return frame
@@ -0,0 +1,54 @@
+"""Simulated gpiozero output/input devices backed by the shared SimWorld."""
+
+from .world import sim_world
+
+class PWMOutputDevice:
+    """Stand-in for gpiozero.PWMOutputDevice that feeds its duty cycle to the world."""
+
+    def __init__(self, pin, active_high=True, initial_value=0, frequency=100, pin_factory=None):
+        self.pin = pin
+        self.frequency = frequency
+        self._value = 0.0
+        self.value = initial_value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        value = float(value)
+        if not 0 <= value <= 1:
+            raise ValueError("PWM value must be between 0 and 1")
+        self._value = value
+        sim_world.set_pin(self.pin, value)
+
+    def on(self):
+        self.value = 1
+
+    def off(self):
+        self.value = 0
+
+    def close(self):
+        self.off()
+
+
+class DigitalInputDevice:
+    """Stand-in for gpiozero.DigitalInputDevice; the world activates it once per encoder slot."""
+
+    def __init__(self, pin, pull_up=False, active_state=None, bounce_time=None, pin_factory=None):
+        self.pin = pin
+        self.when_activated = None
+        self.when_deactivated = None
+        self._closed = False
+        sim_world.register_encoder(pin, self._activate)
+
+    def _activate(self):
+        callback = self.when_activated
+        if callback is not None:
+            callback()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            sim_world.unregister_encoder(self.pin, self._activate)
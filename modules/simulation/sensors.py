@@ -0,0 +1,44 @@
+"""Simulated range sensors with the read latency of the real parts."""
+
+import time
+from .world import sim_world
+
+SPEED_OF_SOUND = 343.0  # m/s
+
+class DistanceSensor:
+    """Stand-in for gpiozero.DistanceSensor (HC-SR04 ultrasonic)."""
+
+    def __init__(self, echo=None, trigger=None, queue_len=9, max_distance=1, threshold_distance=0.3,
+                 partial=False, pin_factory=None):
+        self.echo = echo
+        self.trigger = trigger
+        self.max_distance = max_distance
+
+    @property
+    def distance(self):
+        """Distance in meters, capped at max_distance like gpiozero."""
+        distance = sim_world.raycast(max_range=self.max_distance, noise=0.005)
+        # Trigger pulse plus the echo round trip
+        time.sleep(0.00001 + 2 * distance / SPEED_OF_SOUND)
+        return min(distance, self.max_distance)
+
+    def close(self):
+        pass
+
+
+class VL53L0X:
+    """Stand-in for adafruit_vl53l0x.VL53L0X time-of-flight lidar."""
+
+    OUT_OF_RANGE_MM = 8190
+
+    def __init__(self, i2c=None, address=0x29, io_timeout_s=0):
+        self.measurement_timing_budget = 33000  # microseconds, sensor default
+
+    @property
+    def range(self):
+        """Distance in millimeters; blocks for the configured timing budget."""
+        time.sleep(self.measurement_timing_budget / 1_000_000)
+        distance = sim_world.raycast(max_range=2.0, noise=0.003)
+        if distance >= 2.0:
+            return self.OUT_OF_RANGE_MM
+        return int(distance * 1000)
@@ -0,0 +1,29 @@
+"""Mock /sys/class/pwm tree so servoControl can write real files off-robot."""
+
+import os
+import tempfile
+import logging
+
+logger = logging.getLogger(__name__)
+
+def create_pwm_tree(root=None, chips=None):
+    """Create pwmchip directories with pre-exported channels and return the root path.
+
+    The real kernel creates pwmN/ when a channel number is written to export; here
+    the channel directories already exist, so export_pwm() finds them immediately.
+    """
+    root = root or tempfile.mkdtemp(prefix='sim-pwm-')
+    chips = chips or {'pwmchip0': (2, 3)}
+    for chip, channels in chips.items():
+        chip_path = os.path.join(root, chip)
+        os.makedirs(chip_path, exist_ok=True)
+        for name in ('export', 'unexport'):
+            open(os.path.join(chip_path, name), 'a').close()
+        for channel in channels:
+            channel_path = os.path.join(chip_path, f"pwm{channel}")
+            os.makedirs(channel_path, exist_ok=True)
+            for name, value in (('period', '0'), ('duty_cycle', '0'), ('enable', '0')):
+                with open(os.path.join(channel_path, name), 'w') as f:
+                    f.write(value)
+    logger.info(f"Simulated PWM sysfs tree created at {root}")
+    return root
@@ -0,0 +1,158 @@
+import math
+import random
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class SimWorld:
+    """Differential-drive robot in a walled arena, driven by the simulated motor pins."""
+
+    # Pin numbers mirror modules/gpio/motor.py and modules/gpio/encoder.py
+    MOTOR_PINS = {'left': (23, 22), 'right': (17, 27)}  # (forward, backward)
+    ENCODER_PINS = {'left': 5, 'right': 6}
+
+    def __init__(self, arena_size=4.0, max_wheel_rpm=30, step_interval=0.005):
+        # Geometry matches EncoderTracker so simulated odometry is consistent
+        self.wheel_radius = 0.065 / 2
+        self.wheel_distance = 0.15
+        self.encoder_slots = 20
+        self.robot_radius = 0.12
+        self.max_wheel_rpm = max_wheel_rpm
+        self.step_interval = step_interval
+
+        # Square arena centred on the start position plus a few round obstacles (x, y, radius)
+        self.half_size = arena_size / 2
+        self.obstacles: List[Tuple[float, float, float]] = [(0.0, 1.2, 0.15), (-1.0, -0.5, 0.2), (1.1, 0.4, 0.1)]
+
+        # True robot state (x, y, theta)
+        self.x = 0.0
+        self.y = 0.0
+        self.theta = math.pi / 2
+
+        self._pin_values: Dict[int, float] = {}
+        self._encoders: Dict[int, List[Callable[[], None]]] = {}
+        self._tick_remainder = {'left': 0.0, 'right': 0.0}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def set_pin(self, pin: int, value: float) -> None:
+        """Record the duty cycle written to a simulated PWM pin."""
+        with self._lock:
+            self._pin_values[pin] = value
+        self.ensure_running()
+
+    def register_encoder(self, pin: int, callback: Callable[[], None]) -> None:
+        """Register a tick callback for an encoder input pin."""
+        with self._lock:
+            self._encoders.setdefault(pin, []).append(callback)
+        self.ensure_running()
+
+    def unregister_encoder(self, pin: int, callback: Callable[[], None]) -> None:
+        with self._lock:
+            callbacks = self._encoders.get(pin, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def ensure_running(self) -> None:
+        """Start the physics thread on first use."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True, name='sim-world')
+                    self._thread.start()
+                    logger.info("Simulated world started")
+
+    def get_pose(self) -> Tuple[float, float, float]:
+        with self._lock:
+            return self.x, self.y, self.theta
+
+    def wheel_duty(self, side: str) -> float:
+        """Signed duty (-1..1) of one wheel from its forward/backward pins."""
+        forward_pin, backward_pin = self.MOTOR_PINS[side]
+        return self._pin_values.get(forward_pin, 0.0) - self._pin_values.get(backward_pin, 0.0)
+
+    def _run(self) -> None:
+        last = time.monotonic()
+        while True:
+            time.sleep(self.step_interval)
+            now = time.monotonic()
+            ticks = self._step(now - last)
+            last = now
+            # Fire callbacks outside the lock, like gpiozero's callback thread
+            for pin, count in ticks.items():
+                for _ in range(count):
+                    for callback in list(self._encoders.get(pin, [])):
+                        try:
+                            callback()
+                        except Exception as e:
+                            logger.error(f"Simulated encoder callback failed: {e}")
+
+    def _step(self, dt: float) -> Dict[int, int]:
+        """Advance the robot by dt seconds and return whole encoder ticks per pin."""
+        max_wheel_speed = self.max_wheel_rpm / 60 * 2 * math.pi * self.wheel_radius  # m/s
+        slot_length = 2 * math.pi * self.wheel_radius / self.encoder_slots
+        ticks = {}
+        with self._lock:
+            travel = {}
+            for side in ('left', 'right'):
+                travel[side] = self.wheel_duty(side) * max_wheel_speed * dt
+                # Slot encoders count regardless of direction
+                self._tick_remainder[side] += abs(travel[side]) / slot_length
+                whole = int(self._tick_remainder[side])
+                self._tick_remainder[side] -= whole
+                if whole:
+                    ticks[self.ENCODER_PINS[side]] = whole
+
+            distance = (travel['left'] + travel['right']) / 2
+            delta_theta = (travel['right'] - travel['left']) / self.wheel_distance
+            heading = self.theta + delta_theta / 2
+            new_x = self.x + distance * math.cos(heading)
+            new_y = self.y + distance * math.sin(heading)
+            # Wheels keep slipping against walls, so ticks still count while blocked
+            if not self._collides(new_x, new_y):
+                self.x, self.y = new_x, new_y
+            self.theta += delta_theta
+        return ticks
+
+    def _collides(self, x: float, y: float) -> bool:
+        limit = self.half_size - self.robot_radius
+        if abs(x) > limit or abs(y) > limit:
+            return True
+        return any(math.hypot(x - ox, y - oy) < r + self.robot_radius for ox, oy, r in self.obstacles)
+
+    def raycast(self, angle_offset=0.0, max_range=9.0, noise=0.0) -> float:
+        """Distance in meters from the robot front along its heading to the nearest surface."""
+        x, y, theta = self.get_pose()
+        dx, dy = math.cos(theta + angle_offset), math.sin(theta + angle_offset)
+        # Sensors sit at the front of the chassis
+        x += dx * self.robot_radius
+        y += dy * self.robot_radius
+
+        nearest = max_range
+        # Arena walls
+        for origin, direction in ((x, dx), (y, dy)):
+            if direction > 1e-9:
+                nearest = min(nearest, (self.half_size - origin) / direction)
+            elif direction < -1e-9:
+                nearest = min(nearest, (-self.half_size - origin) / direction)
+        # Round obstacles
+        for ox, oy, r in self.obstacles:
+            fx, fy = x - ox, y - oy
+            b = fx * dx + fy * dy
+            c = fx * fx + fy * fy - r * r
+            disc = b * b - c
+            if disc >= 0:
+                hit = -b - math.sqrt(disc)
+                if 0 <= hit < nearest:
+                    nearest = hit
+
+        if noise:
+            nearest += random.gauss(0, noise)
+        return max(0.0, min(nearest, max_range))
+
+
+# Shared by every simulated device
+sim_world = SimWorld()
@@ -0,0 +1,12 @@
+"""
+Telemetry Package
+
+Lightweight instrumentation for the hot paths of the server. metrics.py
+provides Prometheus counters, gauges and histograms served by /metrics;
+tracing.py records per-stage spans exportable as a Chrome trace.
+"""
+
+from .metrics import Counter, Gauge, Histogram, Registry, REGISTRY, CONTENT_TYPE
+from .tracing import Tracer, tracer, traced
+
+__all__ = ['Counter', 'Gauge', 'Histogram', 'Registry', 'REGISTRY', 'CONTENT_TYPE', 'Tracer', 'tracer', 'traced']
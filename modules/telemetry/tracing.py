@@ -0,0 +1,108 @@
+"""
+Span tracing for the capture, sensor, odometry and HTTP paths.
+
+Spans are appended to a bounded ring (a deque, whose appends are atomic, so
+recording takes no lock) and can be exported as Chrome trace JSON, which
+chrome://tracing and ui.perfetto.dev show as one timeline row per thread.
+Tracing is off by default; while disabled, span() returns a shared no-op
+context manager. Set ROBOT_TRACE=1 to enable it at startup.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+from typing import Optional
+
+_NOOP = nullcontext()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start, time.perf_counter_ns(), self.category, self.args)
+        return False
+
+
+class Tracer:
+    """Bounded in-memory span recorder with Chrome trace export."""
+
+    def __init__(self, capacity: int = 50_000, enabled: bool = False):
+        self.enabled = enabled
+        self._events = deque(maxlen=capacity)
+        self._thread_names = {}
+
+    @property
+    def capacity(self) -> int:
+        return self._events.maxlen
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+    def span(self, name: str, category: str = 'app', **args):
+        """Context manager recording the duration of its block as one span."""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, category, args or None)
+
+    def record(self, name: str, start_ns: int, end_ns: int, category: str = 'app', args: Optional[dict] = None) -> None:
+        """Record a span measured elsewhere; times are time.perf_counter_ns() values."""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        if thread.ident not in self._thread_names:
+            self._thread_names[thread.ident] = thread.name
+        self._events.append((name, category, thread.ident, start_ns, end_ns - start_ns, args))
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def export(self, seconds: Optional[float] = None) -> dict:
+        """Spans from the last `seconds` (default: all kept) as a Chrome trace document."""
+        events = list(self._events)
+        if seconds is not None:
+            cutoff = time.perf_counter_ns() - int(seconds * 1e9)
+            events = [event for event in events if event[3] + event[4] >= cutoff]
+
+        pid = os.getpid()
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in list(self._thread_names.items())]
+        for name, category, tid, start_ns, duration_ns, args in events:
+            event = {'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': tid,
+                     'ts': start_ns / 1000, 'dur': duration_ns / 1000}
+            if args:
+                event['args'] = args
+            trace.append(event)
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def get_status(self) -> dict:
+        return {'enabled': self.enabled, 'spans': len(self._events), 'capacity': self.capacity}
+
+
+def traced(name: Optional[str] = None, category: str = 'app'):
+    """Decorator recording each call of a function as a span."""
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+tracer = Tracer(enabled=os.environ.get('ROBOT_TRACE', '').strip().lower() in ('1', 'true', 'yes', 'on'))
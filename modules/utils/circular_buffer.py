@@ -1,29 +1,115 @@
-from collections import deque
 from threading import Lock
+from typing import Dict, Optional, Sequence, Tuple
 import time
+import numpy as np
+
+# (bucket width in seconds, number of buckets): 1 s for 10 min, 10 s for 6 h, 1 min for 7 days
+DEFAULT_TIERS = ((1.0, 600), (10.0, 6 * 360), (60.0, 7 * 1440))
+
+class _Tier:
+    """Preallocated ring of fixed-width time buckets holding min/sum/max/count."""
+
+    def __init__(self, resolution: float, slots: int):
+        self.resolution = resolution
+        self.slots = slots
+        self.bucket = np.full(slots, -1, dtype=np.int64)  # Absolute bucket number held by each slot
+        self.min = np.zeros(slots, dtype=np.float32)
+        self.max = np.zeros(slots, dtype=np.float32)
+        self.sum = np.zeros(slots, dtype=np.float64)
+        self.count = np.zeros(slots, dtype=np.uint32)
+
+    @property
+    def span(self) -> float:
+        return self.resolution * self.slots
+
+    def add(self, t: float, value: float) -> None:
+        bucket = int(t // self.resolution)
+        slot = bucket % self.slots
+        if self.bucket[slot] != bucket:
+            # Slot last held a bucket one lap ago: start it over
+            self.bucket[slot] = bucket
+            self.min[slot] = self.max[slot] = value
+            self.sum[slot] = value
+            self.count[slot] = 1
+            return
+        self.min[slot] = min(self.min[slot], value)
+        self.max[slot] = max(self.max[slot], value)
+        self.sum[slot] += value
+        self.count[slot] += 1
+
+    def query(self, start: float, end: float) -> Dict[str, np.ndarray]:
+        first, last = int(start // self.resolution), int(end // self.resolution)
+        picks = np.flatnonzero((self.bucket >= first) & (self.bucket <= last) & (self.count > 0))
+        picks = picks[np.argsort(self.bucket[picks])]
+        return {
+            't': self.bucket[picks] * self.resolution,
+            'min': self.min[picks].astype(np.float64),
+            'mean': self.sum[picks] / self.count[picks],
+            'max': self.max[picks].astype(np.float64),
+        }
+
+    def clear(self) -> None:
+        self.bucket.fill(-1)
+        self.count.fill(0)
+
 
 class CircularBuffer:
-    def __init__(self, size=60):
-        self.buffer = deque(maxlen=size)
+    """Timestamped metric history kept at several resolutions in bounded memory.
+
+    Every sample is folded into each tier's current bucket, so the coarser
+    tiers are roll-ups of the finer ones with exact min/mean/max. get_all()
+    keeps returning the last `size` per-second means for existing callers;
+    query() serves longer ranges from the finest tier that still covers them.
+    """
+
+    def __init__(self, size=60, tiers: Sequence[Tuple[float, int]] = DEFAULT_TIERS, clock=time.time):
+        self.size = size
+        self.tiers = [_Tier(resolution, slots) for resolution, slots in sorted(tiers)]
+        self.clock = clock
         self.lock = Lock()
-        self.last_update = 0
-        self.update_threshold = 0.5  # 500ms minimum between updates
-    
-    def add(self, item):
-        current_time = time.time()
+        self._latest = None
+
+    def add(self, item, timestamp: Optional[float] = None):
+        t = self.clock() if timestamp is None else timestamp
+        value = float(item)
+        with self.lock:
+            for tier in self.tiers:
+                tier.add(t, value)
+            self._latest = item
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None,
+              resolution: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Aggregates for buckets between start and end (UNIX seconds).
+
+        Uses the tier matching `resolution` if given, otherwise the finest
+        tier whose span reaches back to `start`. Returns arrays t (bucket
+        start), min, mean and max, plus the chosen 'resolution'.
+        """
+        now = self.clock()
+        end = now if end is None else end
+        start = end - self.tiers[0].span if start is None else start
+        if resolution is not None:
+            tier = min(self.tiers, key=lambda candidate: abs(candidate.resolution - resolution))
+        else:
+            tier = next((candidate for candidate in self.tiers if now - candidate.span <= start), self.tiers[-1])
         with self.lock:
-            if current_time - self.last_update >= self.update_threshold:
-                self.buffer.append(item)
-                self.last_update = current_time
-    
+            result = tier.query(start, end)
+        result['resolution'] = tier.resolution
+        return result
+
     def get_all(self):
+        """Per-second means of the last `size` seconds, oldest first"""
+        now = self.clock()
         with self.lock:
-            return list(self.buffer)
-    
+            means = self.tiers[0].query(now - self.size, now)['mean']
+        return np.round(means[-self.size:], 2).tolist()
+
     def get_latest(self):
         with self.lock:
-            return self.buffer[-1] if self.buffer else None
-    
+            return self._latest
+
     def clear(self):
         with self.lock:
-            self.buffer.clear()
+            for tier in self.tiers:
+                tier.clear()
+            self._latest = None
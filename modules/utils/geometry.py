@@ -0,0 +1,52 @@
+import numpy as np
+
+def simplify_path(points, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker simplification of an (N, 2) polyline.
+
+    Keeps the endpoints and every point that deviates more than `tolerance`
+    (same units as the points) from the simplified line. Distances are
+    measured to segments rather than infinite lines, so back-and-forth
+    manoeuvres are preserved. Iterative with vectorised distance checks.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = len(points)
+    if n < 3 or tolerance <= 0:
+        return points
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a = points[start]
+        segment = points[end] - a
+        inner = points[start + 1:end] - a
+        length_sq = segment @ segment
+        if length_sq > 0:
+            t = np.clip(inner @ segment / length_sq, 0.0, 1.0)
+            offsets = inner - t[:, None] * segment
+        else:
+            offsets = inner
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+
+def decimate_path(points, spacing: float) -> np.ndarray:
+    """Keep roughly one point per `spacing` of travelled distance, plus both endpoints."""
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) < 3 or spacing <= 0:
+        return points
+    steps = np.diff(points, axis=0)
+    travelled = np.concatenate(([0.0], np.cumsum(np.hypot(steps[:, 0], steps[:, 1]))))
+    bucket = np.floor(travelled / spacing)
+    keep = np.concatenate(([True], bucket[1:] != bucket[:-1]))
+    keep[-1] = True
+    return points[keep]
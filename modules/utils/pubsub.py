@@ -0,0 +1,97 @@
+from threading import Condition
+from typing import Any, Callable, Generator, Optional, Tuple
+import json
+import logging
+import weakref
+from ..telemetry import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+_topics = weakref.WeakSet()
+SSE_CLIENTS = Gauge('sse_clients', 'Connected Server-Sent Events clients', ['topic'])
+SSE_CLIENTS.set_function(lambda: {(topic.name,): topic.subscribers for topic in list(_topics)})
+TOPIC_UPDATES = Counter('topic_updates_total', 'Updates accepted by a topic (duplicates excluded)', ['topic'])
+
+class Topic:
+    """Latest-value channel: producers publish, SSE subscribers wake immediately.
+
+    Each update is serialized once into a ready-to-send SSE frame that all
+    subscribers share. Publishing a payload identical to the previous one is a
+    no-op, so subscribers never wake for unchanged data.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._condition = Condition()
+        self._seq = 0
+        self._data = None
+        self._payload = None
+        self._listeners = []
+        self.subscribers = 0  # Open SSE streams
+        self._updates = TOPIC_UPDATES.labels(name)
+        _topics.add(self)
+
+    def add_listener(self, callback: Callable[[Any], None]) -> None:
+        """Call callback(data) on the publisher's thread for every accepted update.
+
+        Unlike SSE subscribers, listeners see every update rather than the
+        latest one, so they must be quick (e.g. put the data on a queue).
+        """
+        with self._condition:
+            self._listeners = self._listeners + [callback]
+
+    def remove_listener(self, callback: Callable[[Any], None]) -> None:
+        with self._condition:
+            self._listeners = [listener for listener in self._listeners if listener != callback]
+
+    def publish(self, data: Any) -> bool:
+        """Publish a new value; returns False if it matched the previous one."""
+        payload = f"data: {json.dumps(data)}\n\n"
+        with self._condition:
+            if payload == self._payload:
+                return False
+            self._seq += 1
+            self._data = data
+            self._payload = payload
+            self._condition.notify_all()
+            listeners = self._listeners
+        self._updates.inc()
+        for listener in listeners:
+            try:
+                listener(data)
+            except Exception as e:
+                logger.error(f"Listener on topic {self.name} failed: {e}")
+        return True
+
+    def latest(self) -> Tuple[int, Any]:
+        """Return (sequence number, data) of the most recent update."""
+        with self._condition:
+            return self._seq, self._data
+
+    def wait(self, last_seq: int, timeout: Optional[float] = None) -> Tuple[int, Optional[str]]:
+        """Block until an update newer than last_seq arrives.
+
+        Returns (seq, payload), or (last_seq, None) on timeout. Updates that
+        happen while a slow subscriber is busy are coalesced into the latest.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._seq != last_seq, timeout):
+                return last_seq, None
+            return self._seq, self._payload
+
+    def stream(self, keepalive: float = 15.0) -> Generator[str, None, None]:
+        """Yield SSE frames for every update, starting with the current value.
+
+        A comment line is sent after `keepalive` idle seconds so that
+        disconnected clients are noticed and their generator exits.
+        """
+        seq = 0
+        with self._condition:
+            self.subscribers += 1
+        try:
+            while True:
+                seq, payload = self.wait(seq, timeout=keepalive)
+                yield payload if payload is not None else ": keepalive\n\n"
+        finally:
+            with self._condition:
+                self.subscribers -= 1
@@ -0,0 +1,161 @@
+import struct
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import numpy as np
+
+# Ring header: magic, slot count, slot capacity, latest committed seq, seq held by the reader
+_HEADER = struct.Struct('<4sIIQQ')
+# Slot header: begin seq, end seq, payload length, capture time, three free-form meta values
+_SLOT = struct.Struct('<QQIdddd')
+_MAGIC = b'SHR1'
+_U64 = struct.Struct('<Q')  # Written alone (the writer owns latest, the reader owns held)
+_LATEST_OFFSET = 12
+_HELD_OFFSET = 20
+_ALIGN = 64
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class ShmRing:
+    """Single-writer ring of fixed-size slots in one multiprocessing.shared_memory block.
+
+    Every committed payload gets the next sequence number. A slot's header
+    carries it twice: `begin` is set before the payload is written and `end`
+    after, so a reader knows a slot holds seq exactly when both equal seq,
+    and checks again after using the payload to catch an overwrite
+    (a seqlock). Sequence numbers start at 1; 0 means none.
+
+    One reader may hold() a seq while it works on the payload in place (e.g.
+    inference on a raw frame); the writer then skips that slot rather than
+    overwrite it, so a long read needs slots >= 3. Payloads are never
+    pickled: readers map the same memory and get memoryviews/arrays on it.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        magic, self.slots, self.capacity, _, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{shm.name} is not a ShmRing")
+        self._stride = _aligned(_SLOT.size) + _aligned(self.capacity)
+        self._next_slot = 0
+        self._writing = None  # (seq, slot index) between begin_write and commit
+
+    @classmethod
+    def create(cls, slots: int, capacity: int, name: Optional[str] = None) -> 'ShmRing':
+        size = _aligned(_HEADER.size) + slots * (_aligned(_SLOT.size) + _aligned(capacity))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, slots, capacity, 0, 0)
+        for index in range(slots):
+            offset = _aligned(_HEADER.size) + index * (_aligned(_SLOT.size) + _aligned(capacity))
+            _SLOT.pack_into(shm.buf, offset, 0, 0, 0, 0.0, 0.0, 0.0, 0.0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'ShmRing':
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _slot_offset(self, index: int) -> int:
+        return _aligned(_HEADER.size) + index * self._stride
+
+    @property
+    def latest(self) -> int:
+        return _U64.unpack_from(self.shm.buf, _LATEST_OFFSET)[0]
+
+    @property
+    def held(self) -> int:
+        return _U64.unpack_from(self.shm.buf, _HELD_OFFSET)[0]
+
+    def _find(self, seq: int) -> Optional[int]:
+        for index in range(self.slots):
+            begin, end = struct.unpack_from('<QQ', self.shm.buf, self._slot_offset(index))
+            if begin == end == seq:
+                return index
+        return None
+
+    # Writer side
+
+    def begin_write(self, length: int) -> Tuple[int, memoryview]:
+        """Claim the next slot for seq latest + 1; returns the seq and a view of its payload."""
+        if length > self.capacity:
+            raise ValueError(f"payload of {length} bytes exceeds slot capacity {self.capacity}")
+        seq = self.latest + 1
+        held = self.held
+        index = self._next_slot
+        if held and self._find(held) == index:
+            index = (index + 1) % self.slots  # Never overwrite the slot a reader is holding
+        self._next_slot = (index + 1) % self.slots
+        self._writing = (seq, index)
+        offset = self._slot_offset(index)
+        struct.pack_into('<QQ', self.shm.buf, offset, seq, 0)
+        start = offset + _aligned(_SLOT.size)
+        return seq, self.shm.buf[start:start + length]
+
+    def commit(self, seq: int, length: int, capture_time: float = 0.0, meta: Tuple[float, ...] = ()) -> None:
+        if self._writing is None or self._writing[0] != seq:
+            raise KeyError(f"seq {seq} was not begun")
+        index = self._writing[1]
+        self._writing = None
+        meta = tuple(meta) + (0.0,) * (3 - len(meta))
+        _SLOT.pack_into(self.shm.buf, self._slot_offset(index), seq, seq, length, capture_time, *meta[:3])
+        _U64.pack_into(self.shm.buf, _LATEST_OFFSET, seq)
+
+    def write(self, data, capture_time: float = 0.0, meta: Tuple[float, ...] = ()) -> int:
+        """Copy a bytes-like payload into the next slot and commit it; returns its seq."""
+        data = memoryview(data).cast('B')
+        seq, view = self.begin_write(len(data))
+        view[:] = data
+        view.release()
+        self.commit(seq, len(data), capture_time, meta)
+        return seq
+
+    # Reader side
+
+    def read(self, seq: int) -> Optional[Tuple[memoryview, float, Tuple[float, float, float]]]:
+        """(payload view, capture time, meta) of seq, or None if it has been overwritten.
+
+        The view aliases the slot: check valid(seq) after using it.
+        """
+        index = self._find(seq)
+        if index is None:
+            return None
+        offset = self._slot_offset(index)
+        _, _, length, capture_time, *meta = _SLOT.unpack_from(self.shm.buf, offset)
+        start = offset + _aligned(_SLOT.size)
+        return self.shm.buf[start:start + length], capture_time, tuple(meta)
+
+    def array(self, seq: int, shape, dtype=np.uint8) -> Optional[Tuple[np.ndarray, float, Tuple[float, float, float]]]:
+        """Like read(), with the payload as an ndarray of the given shape (no copy)."""
+        found = self.read(seq)
+        if found is None:
+            return None
+        view, capture_time, meta = found
+        return np.frombuffer(view, dtype=dtype).reshape(shape), capture_time, meta
+
+    def valid(self, seq: int) -> bool:
+        return self._find(seq) is not None
+
+    def hold(self, seq: int) -> bool:
+        """Ask the writer to keep seq's slot; False if it was already overwritten."""
+        _U64.pack_into(self.shm.buf, _HELD_OFFSET, seq)
+        return self.valid(seq)
+
+    def release(self) -> None:
+        self.hold(0)
+
+    def close(self) -> None:
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # A view is still alive; the mapping goes away with the process
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,160 @@
+from threading import Lock
+from typing import Optional, Tuple
+import numpy as np
+
+class TrajectoryBuffer:
+    """Append-only store of fixed-width rows (e.g. x, y, theta) with amortised O(1) append.
+
+    Rows live in a preallocated NumPy array whose capacity doubles when full.
+    Growth and compaction always move rows into a *new* array and appends only
+    write past the current end, so read-only views handed to readers stay
+    valid and never change underneath them.
+
+    With max_rows set, the live window is bounded: when full, its older half is
+    thinned to every archive_stride-th row and moved to a downsampled archive.
+    The archive is bounded too (max_archive_rows, default max_rows): when it
+    fills, every other archived row is dropped and the stride doubles, so it
+    always covers the whole run at an even spacing. Rows keep a global index
+    (see since()) that survives compaction.
+    """
+
+    def __init__(self, columns: int = 3, initial_capacity: int = 1024,
+                 max_rows: Optional[int] = None, archive_stride: int = 10,
+                 max_archive_rows: Optional[int] = None):
+        if max_rows is not None and max_rows < 2:
+            raise ValueError("max_rows must be at least 2")
+        self.columns = columns
+        self.max_rows = max_rows
+        self._initial_stride = archive_stride
+        self.archive_stride = archive_stride  # Current spacing of archived rows, doubles as it fills
+        self.max_archive_rows = max(2, max_archive_rows or max_rows or 2)
+        if max_rows is not None:
+            initial_capacity = min(initial_capacity, max_rows)
+        self._data = np.empty((initial_capacity, columns), dtype=np.float64)
+        self._size = 0
+        self._dropped = 0  # rows moved out of the live window
+        self._archive = np.empty((self.max_archive_rows, columns), dtype=np.float64) if max_rows else None
+        self._archive_size = 0
+        self._lock = Lock()
+
+    def append(self, row) -> int:
+        """Append one row and return its global index."""
+        with self._lock:
+            if self._size == len(self._data):
+                if self.max_rows is not None and self._size >= self.max_rows:
+                    self._compact()
+                else:
+                    self._grow()
+            self._data[self._size] = row
+            self._size += 1
+            return self._dropped + self._size - 1
+
+    def extend(self, rows: np.ndarray) -> None:
+        """Append many rows at once."""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, self.columns)
+        if self.max_rows is not None:
+            for row in rows:
+                self.append(row)
+            return
+        with self._lock:
+            needed = self._size + len(rows)
+            if needed > len(self._data):
+                self._grow(needed)
+            self._data[self._size:needed] = rows
+            self._size = needed
+
+    def _grow(self, minimum: int = 0) -> None:
+        capacity = max(len(self._data) * 2, minimum, 1)
+        if self.max_rows is not None:
+            capacity = min(capacity, self.max_rows)
+        data = np.empty((capacity, self.columns), dtype=np.float64)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+
+    def _compact(self) -> None:
+        half = self._size // 2
+        # Archive rows whose global index is a multiple of the stride, so spacing stays even across calls
+        start = -self._dropped % self.archive_stride
+        self._archive_rows(self._data[start:half:self.archive_stride], self._dropped + start)
+        data = np.empty_like(self._data)
+        data[:self._size - half] = self._data[half:self._size]
+        self._data = data
+        self._size -= half
+        self._dropped += half
+
+    def _archive_rows(self, rows: np.ndarray, first: int) -> None:
+        """Append rows spaced archive_stride apart, the first with global index `first`."""
+        while self._archive_size + len(rows) > self.max_archive_rows:
+            # Keep rows at multiples of twice the stride, copying into a new array so
+            # views already handed out are untouched
+            kept = self._archive[:self._archive_size:2]
+            self._archive = np.empty_like(self._archive)
+            self._archive[:len(kept)] = kept
+            self._archive_size = len(kept)
+            offset = (first // self.archive_stride) % 2
+            rows = rows[offset::2]
+            first += offset * self.archive_stride
+            self.archive_stride *= 2
+        self._archive[self._archive_size:self._archive_size + len(rows)] = rows
+        self._archive_size += len(rows)
+
+    def _readonly(self, rows: np.ndarray) -> np.ndarray:
+        view = rows.view()
+        view.flags.writeable = False
+        return view
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def total(self) -> int:
+        """Global index the next appended row will get."""
+        with self._lock:
+            return self._dropped + self._size
+
+    @property
+    def first_index(self) -> int:
+        """Global index of the oldest row still in the live window."""
+        return self._dropped
+
+    def latest(self) -> Optional[np.ndarray]:
+        """Zero-copy view of the newest row, or None if empty."""
+        with self._lock:
+            if not self._size:
+                return None
+            return self._readonly(self._data[self._size - 1])
+
+    def view(self) -> np.ndarray:
+        """Zero-copy, read-only view of all live rows."""
+        with self._lock:
+            return self._readonly(self._data[:self._size])
+
+    def since(self, index: int) -> Tuple[np.ndarray, int, int]:
+        """Rows with global index >= index as a read-only view.
+
+        Returns (rows, first_index, next_index). first_index is larger than
+        the requested index if those rows were already compacted away.
+        """
+        with self._lock:
+            start = max(index - self._dropped, 0)
+            start = min(start, self._size)
+            return (self._readonly(self._data[start:self._size]),
+                    self._dropped + start,
+                    self._dropped + self._size)
+
+    def archive(self) -> np.ndarray:
+        """Downsampled rows evicted from the live window (empty if unbounded)."""
+        if self._archive is None:
+            return np.empty((0, self.columns), dtype=np.float64)
+        with self._lock:
+            return self._readonly(self._archive[:self._archive_size])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data = np.empty_like(self._data)
+            self._size = 0
+            self._dropped = 0
+            if self._archive is not None:
+                self._archive = np.empty_like(self._archive)
+                self._archive_size = 0
+                self.archive_stride = self._initial_stride
@@ -1,33 +1,90 @@
-import os.path
-from picamera2 import Picamera2
-from libcamera import controls
 import cv2
 import time
 import psutil
 import logging
 import threading
+import atexit
+import struct
+import multiprocessing
+import multiprocessing.connection
+import os
 import queue
 import numpy as np
-from ultralytics import YOLO
 from typing import Generator, Tuple, Optional, Dict
+from .simulation import SIMULATION
+from .telemetry import Counter, Gauge, Histogram, tracer
+
+if SIMULATION:
+    from .simulation.camera import Picamera2
+else:
+    from picamera2 import Picamera2
+    from libcamera import controls
+
+from .object_detection.engines import draw_detections
+from .object_detection.benchmark import engine_selector
+from .utils.shm_ring import ShmRing
+from .encoding import create_encoder, EncodePool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+MULTIPROCESS = _env_flag('ROBOT_VIDEO_PROCESSES')
+# JPEG encoding, see modules/encoding/__init__.py
+JPEG_ENCODER = os.environ.get('ROBOT_JPEG_ENCODER', 'opencv')
+JPEG_SUBSAMPLING = os.environ.get('ROBOT_JPEG_SUBSAMPLING', '420')
+JPEG_FAST_DCT = _env_flag('ROBOT_JPEG_FAST_DCT')
+JPEG_WORKERS = int(os.environ.get('ROBOT_JPEG_WORKERS', 0))
+CAMERA_YUV = _env_flag('ROBOT_CAMERA_YUV')
+MAX_FRAME_BYTES = 1920 * 1080 * 3  # Ring slot size; shared memory pages are only backed once touched
+MAX_DETECTIONS = 100
+_SEQ = struct.Struct('<Q')
+
+# Prometheus metrics, see /metrics
+FRAME_CAPTURE_SECONDS = Histogram('video_frame_capture_seconds', 'Time to capture and color-convert a frame')
+FRAME_INFERENCE_SECONDS = Histogram('video_frame_inference_seconds', 'Time spent in YOLO inference and drawing',
+                                    buckets=(0.01, 0.025, 0.05, 0.1, 0.15, 0.25, 0.5, 1.0, 2.5, 5.0))
+FRAME_ENCODE_SECONDS = Histogram('video_frame_encode_seconds', 'Time to JPEG encode a frame')
+FRAMES_TOTAL = Counter('video_frames_total', 'Frames captured and encoded')
+FRAMES_DROPPED = Counter('video_frames_dropped_total', 'Frames lost before reaching the stream queue', ['reason'])
+STREAM_CLIENTS = Gauge('video_stream_clients', 'Connected MJPEG clients')
+FRAME_QUEUE_DEPTH = Gauge('video_frame_queue_depth', 'Encoded frames waiting in the stream queue')
+
 class VideoStream:
     def __init__(self, target_fps: int = 30, jpeg_quality: int = 80, queue_size: int = 5):
         self.camera = None
         self.camera_type = None
+        self.camera_format = None  # 'YUV420' when the Pi Camera delivers planar YUV
         self.is_streaming = True
         self.is_ai_mode = False
         self.lock = threading.Lock()
         self.frame_queue = queue.Queue(maxsize=queue_size)
-        self.yolo_model = self.init_ai()
+        self._latest_frame = None  # Last BGR frame, sampled by the inference benchmark
+        self.engine = self.init_ai()
+
+        # Called as listener(capture_time, seq, frame_bytes, detections) for every encoded frame
+        self.frame_listeners = []
+        self.frame_seq = 0
 
         # Capture parameters
         self.target_fps = target_fps
         self.jpeg_quality = jpeg_quality
+        self.encoder = create_encoder(JPEG_ENCODER, JPEG_SUBSAMPLING, JPEG_FAST_DCT)
+        self.encode_pool = self._create_encode_pool()
+        logger.info("JPEG encoder: %s, %s worker thread(s)", self.encoder.describe(),
+                    self.encode_pool.workers if self.encode_pool else 0)
+
+        # Configured values, restored when ThermalGovernor lifts its limits
+        self.base_fps = target_fps
+        self.base_quality = jpeg_quality
+        self.inference_interval = 1  # Run YOLO on every Nth frame
+        self.ai_allowed = True
+        self._ai_suspended = False
+        self._last_detections = []
 
         # Metrics tracking
         self.frame_count = 0
@@ -42,6 +99,8 @@ class VideoStream:
             'cpu_usage': 0
         }
 
+        FRAME_QUEUE_DEPTH.set_function(self.frame_queue.qsize)
+
         # Initialize the camera and start the capture thread
         self.init_camera()
         self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
@@ -57,7 +116,7 @@ class VideoStream:
             if not self.camera.sensor_modes:
                 raise RuntimeError("No Pi Camera detected - check camera connection")
 
-            config = self.camera.create_preview_configuration()
+            config = self.camera.create_preview_configuration(main={'format': 'YUV420'} if CAMERA_YUV else None)
             self.camera.configure(config)
             self.camera.start()
 
@@ -70,6 +129,7 @@ class VideoStream:
             })
 
             self.camera_type = 'picam'
+            self.camera_format = config['main'].get('format')
             logger.info("Available sensor modes: %s", self.camera.sensor_modes)
             self.stats['resolution'] = f'{config["main"]["size"][0]}x{config["main"]["size"][1]}'
             return
@@ -94,63 +154,185 @@ class VideoStream:
         raise RuntimeError("No camera available (tried Pi Camera and USB)")
 
     def init_ai(self):
-        # Compiling to ncnn for ARM based chips like rpi5
-        if not os.path.exists("./yolo11n_ncnn_model"):
-            YOLO("yolo11n.pt").export(format="ncnn")
-        return YOLO("./yolo11n_ncnn_model")
+        """Pick the inference engine, see modules/object_detection/benchmark.py."""
+        return engine_selector.startup(on_select=self.set_engine, frame_source=self.sample_frames)
+
+    def set_engine(self, engine) -> None:
+        """Swap the inference engine; takes effect from the next frame."""
+        self.engine = engine
+        self._last_detections = []
+        logger.info("Inference engine switched to %s", engine.name)
+
+    def benchmark_engines(self) -> bool:
+        """Re-run the inference benchmark in the background; False if one is already running."""
+        return engine_selector.start_benchmark(on_select=self.set_engine, frame_source=self.sample_frames)
+
+    def engine_status(self) -> Dict:
+        return engine_selector.get_status()
+
+    def sample_frames(self, count: int = 8, spacing: float = 0.25, timeout: float = 15.0) -> list:
+        """Up to `count` distinct recent camera frames, for benchmarking engines."""
+        frames = []
+        deadline = time.monotonic() + timeout
+        while len(frames) < count and time.monotonic() < deadline:
+            frame = self._latest_frame
+            if frame is not None and (not frames or frame is not frames[-1][1]):
+                frames.append((self._to_bgr(frame), frame))
+            time.sleep(spacing)
+        return [bgr for bgr, _ in frames]
+
+    def _to_bgr(self, frame: np.ndarray) -> np.ndarray:
+        """3-channel frame for inference and drawing; YUV420 captures are converted."""
+        return cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_I420) if frame.ndim == 2 else frame
+
+    def _create_encode_pool(self) -> Optional[EncodePool]:
+        if JPEG_WORKERS <= 0:
+            return None
+        return EncodePool(self.encoder, JPEG_WORKERS, self._on_encoded)
+
+    def _read_frame(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Capture one BGR frame (what cv2.imencode and the engines take), into `out` when given; None on failure."""
+        try:
+            if self.camera_type == 'usb':
+                with tracer.span('capture', 'video'):
+                    success, frame = self.camera.read()
+                if not success or frame is None:
+                    logger.error("Failed to read from USB camera")
+                    FRAMES_DROPPED.labels('capture_error').inc()
+                    return None
+                with tracer.span('convert', 'video'):
+                    # Already BGR; optional: flip the frame horizontally
+                    frame = cv2.flip(frame, 1, dst=out)
+            else:  # picam
+                with tracer.span('capture', 'video'):
+                    frame = self.camera.capture_array()
+                with tracer.span('convert', 'video'):
+                    if self.camera_format == 'YUV420':
+                        if out is None:
+                            return frame  # Kept as YUV: encoded directly, converted only for inference
+                        frame = cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_I420, dst=out)
+                    else:
+                        # XBGR8888 is R, G, B, X in memory: swap to BGR and drop X
+                        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+        except Exception as e:
+            logger.error("Error capturing frame: %s", str(e))
+            FRAMES_DROPPED.labels('capture_error').inc()
+            return None
+        if out is not None and frame is not out:
+            np.copyto(out, frame)  # OpenCV allocated a new array (size mismatch raises here)
+            frame = out
+        return frame
 
     def _capture_loop(self):
         """Continuously capture frames in a separate thread."""
-        encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
         while True:
             while not self.is_streaming:
                 continue
-            frame = None
-            try:
-                if self.camera_type == 'usb':
-                    success, frame = self.camera.read()
-                    if not success or frame is None:
-                        logger.error("Failed to read from USB camera")
-                        continue
-                    # Convert BGR to RGB for consistent color representation
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    # Optional: Flip the frame horizontally
-                    frame = cv2.flip(frame, 1)
-                else:  # picam
-                    frame = self.camera.capture_array()
-                    # Ensure frame is in RGB format
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            except Exception as e:
-                logger.error("Error capturing frame: %s", str(e))
-                continue
-
+            capture_start = time.perf_counter()
+            frame = self._read_frame()
             if frame is None:
                 continue
+            # Shared monotonic clock, see modules/recording/recorder.py
+            capture_time = time.monotonic()
+            FRAME_CAPTURE_SECONDS.observe(time.perf_counter() - capture_start)
+            self._latest_frame = frame
 
-            if self.is_ai_mode:
-                # logger.info(self.yolo_model(frame)[0].plot())
-                frame = self.yolo_model(frame)[0].plot()
+            detections = None
+            engine = self.engine
+            is_yuv = frame.ndim == 2
+            if self.is_ai_mode and is_yuv:
+                with tracer.span('convert', 'video'):
+                    frame, is_yuv = self._to_bgr(frame), False
+            if self.is_ai_mode and engine is not None and (self.frame_seq + 1) % self.inference_interval == 0:
+                with tracer.span('inference', 'video'), FRAME_INFERENCE_SECONDS.time():
+                    detections = engine.infer(frame)
+                    frame = draw_detections(frame, detections, engine.names)
+                self._last_detections = detections
+            elif self.is_ai_mode:
+                # Skipped by the inference interval: keep showing the last boxes
+                frame = draw_detections(frame, self._last_detections, engine.names if engine else None)
 
-            # JPEG encode the frame
-            success, buffer = cv2.imencode('.jpg', frame, encode_params)
-            if not success:
-                logger.error("Failed to encode frame")
-                continue
-            frame_bytes = buffer.tobytes()
-
-            # Update metrics
-            self._update_metrics(len(frame_bytes))
-            
-            # Put frame in queue; if full, drop the frame
-            try:
-                self.frame_queue.put(frame_bytes, timeout=0.01)
-            except queue.Full:
-                logger.debug("Frame queue full; dropping frame")
-                continue
+            # JPEG encode the frame, on the pool's threads when there is one
+            if self.encode_pool is not None:
+                with tracer.span('encode_submit', 'video'):
+                    self.encode_pool.submit(frame, self.jpeg_quality, (capture_time, detections), yuv=is_yuv)
+            else:
+                with tracer.span('encode', 'video'), FRAME_ENCODE_SECONDS.time():
+                    frame_bytes = (self.encoder.encode_yuv(frame, self.jpeg_quality) if is_yuv
+                                   else self.encoder.encode(frame, self.jpeg_quality))
+                if frame_bytes is None:
+                    logger.error("Failed to encode frame")
+                    FRAMES_DROPPED.labels('encode_error').inc()
+                    continue
+                if not self._publish_frame(capture_time, frame_bytes, detections):
+                    continue
 
             # Sleep to throttle capture rate based on target FPS
             time.sleep(1 / self.target_fps)
 
+    def _on_encoded(self, frame_bytes: Optional[bytes], seconds: float, context) -> None:
+        """EncodePool callback, in capture order."""
+        FRAME_ENCODE_SECONDS.observe(seconds)
+        if frame_bytes is None:
+            FRAMES_DROPPED.labels('encode_error').inc()
+            return
+        capture_time, detections = context
+        self._publish_frame(capture_time, frame_bytes, detections)
+
+    def _publish_frame(self, capture_time: float, frame_bytes: bytes, detections) -> bool:
+        """Hand an encoded frame to the listeners and the stream queue; False if the queue was full."""
+        FRAMES_TOTAL.inc()
+
+        # Update metrics
+        self._update_metrics(len(frame_bytes))
+
+        self.frame_seq += 1
+        with tracer.span('frame_listeners', 'video'):
+            for listener in self.frame_listeners:
+                try:
+                    listener(capture_time, self.frame_seq, frame_bytes, detections)
+                except Exception as e:
+                    logger.error("Frame listener failed: %s", str(e))
+
+        # Put frame in queue; if full, drop the frame
+        try:
+            with tracer.span('queue_put', 'video'):
+                self.frame_queue.put(frame_bytes, timeout=0.01)
+        except queue.Full:
+            logger.debug("Frame queue full; dropping frame")
+            FRAMES_DROPPED.labels('queue_full').inc()
+            return False
+        return True
+
+    def apply_limits(self, max_fps: Optional[int] = None, max_quality: Optional[int] = None,
+                     inference_interval: int = 1, allow_ai: bool = True) -> None:
+        """Cap capture rate, JPEG quality and inference; None restores the configured value.
+
+        When AI is disallowed while running it is switched off and turned back
+        on once it is allowed again.
+        """
+        with self.lock:
+            self.target_fps = min(self.base_fps, max_fps) if max_fps else self.base_fps
+            self.jpeg_quality = min(self.base_quality, max_quality) if max_quality else self.base_quality
+            self.inference_interval = max(1, int(inference_interval))
+            self.ai_allowed = allow_ai
+            if not allow_ai and self.is_ai_mode:
+                self.is_ai_mode = False
+                self._ai_suspended = True
+            elif allow_ai and self._ai_suspended:
+                self.is_ai_mode = self.engine is not None
+                self._ai_suspended = False
+        logger.info("Video limits: %s fps, quality %s, inference every %s frame(s), AI %s",
+                    self.target_fps, self.jpeg_quality, self.inference_interval,
+                    "allowed" if allow_ai else "disabled")
+
+    def add_frame_listener(self, listener) -> None:
+        """Receive every encoded frame; listeners run on the capture thread and must be quick."""
+        self.frame_listeners = self.frame_listeners + [listener]
+
+    def remove_frame_listener(self, listener) -> None:
+        self.frame_listeners = [l for l in self.frame_listeners if l != listener]
+
     def _update_metrics(self, frame_size: int):
         """Update streaming metrics less frequently (e.g., every second)."""
         with self.lock:
@@ -176,13 +358,18 @@ class VideoStream:
 
     def generate_frames(self) -> Generator[bytes, None, None]:
         """Generate frames for streaming from the capture thread queue."""
-        while self.is_streaming:
-            try:
-                frame_bytes = self.frame_queue.get(timeout=1)
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            except queue.Empty:
-                continue
+        STREAM_CLIENTS.inc()
+        try:
+            while self.is_streaming:
+                try:
+                    with tracer.span('queue_get', 'video'):
+                        frame_bytes = self.frame_queue.get(timeout=1)
+                    yield (b'--frame\r\n'
+                           b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                except queue.Empty:
+                    continue
+        finally:
+            STREAM_CLIENTS.dec()
 
     def toggle_stream(self) -> bool:
         """Toggle streaming state."""
@@ -192,7 +379,12 @@ class VideoStream:
 
     def toggle_ai(self) -> bool:
         """Toggle ai mode."""
+        if self.engine is None:
+            raise RuntimeError("AI model not available")
+        if not self.ai_allowed and not self.is_ai_mode:
+            raise RuntimeError("AI mode is disabled while the system is too hot")
         self.is_ai_mode = not self.is_ai_mode
+        self._ai_suspended = False
         logger.info("AI Mode  %s", "started" if self.is_streaming else "stopped")
         return self.is_ai_mode
 
@@ -212,5 +404,330 @@ class VideoStream:
         logger.info("Camera resources released")
 
 
-# Create a singleton instance to be used across the application
-video_stream = VideoStream()
+
+class _RemoteEngine:
+    """What the web process knows about the engine running in the inference process."""
+
+    def __init__(self, name: str, names: Dict[int, str]):
+        self.name = name
+        self.names = names
+
+
+class ProcessVideoStream(VideoStream):
+    """VideoStream with capture/encode and inference in their own processes.
+
+    The capture process converts each camera frame straight into a slot of
+    the raw ShmRing and JPEG-encodes it (with the latest boxes drawn) into the
+    jpeg ring. The inference process runs the engine in place on the newest
+    raw slot, holding it so it is not overwritten, and writes the boxes to
+    the detection ring. This process only copies encoded frames and boxes out
+    for the MJPEG clients and frame listeners, so Flask and the SSE loops no
+    longer compete with capture and inference for the GIL.
+
+    Only sequence numbers and small control messages go through pipes.
+    Their system calls also order the shared-memory writes before a reader
+    sees the sequence number. The workers are forked before the web
+    server starts, so they inherit the camera setup code without
+    re-importing the app.
+    """
+
+    def __init__(self, *args, raw_slots: int = 4, jpeg_slots: int = 8, **kwargs):
+        self.raw_ring = ShmRing.create(raw_slots, MAX_FRAME_BYTES)
+        self.jpeg_ring = ShmRing.create(jpeg_slots, MAX_FRAME_BYTES)
+        self.detection_ring = ShmRing.create(4, MAX_DETECTIONS * 6 * 4)
+        self.workers = {}
+        self._engine_status = {'state': 'starting', 'selected': None}
+        self._send_lock = threading.Lock()
+        self._closing = False
+        super().__init__(*args, **kwargs)
+        atexit.register(self.close)
+
+    # Web process side
+
+    def init_ai(self):
+        return None  # The inference process reports its engine once it has loaded it
+
+    def _create_encode_pool(self):
+        # The capture process encodes on its own thread; the raw ring slot a frame
+        # lives in would be overwritten under a pool lagging several frames behind
+        return None
+
+    def init_camera(self):
+        """Fork the capture and inference processes and wait for the camera to open."""
+        context = multiprocessing.get_context('fork')
+        self._capture_commands, capture_commands = context.Pipe()
+        self._inference_commands, inference_commands = context.Pipe()
+        self._frames, frames = context.Pipe(duplex=False)
+        raw_notify_reader, raw_notify = context.Pipe(duplex=False)
+        self._events = {}
+        for role, target, args in (('capture', self._capture_main, (capture_commands, frames, raw_notify)),
+                                   ('inference', self._inference_main, (inference_commands, raw_notify_reader))):
+            self._events[role], events = context.Pipe(duplex=False)
+            process = context.Process(target=target, args=args + (events,), name=f'video-{role}', daemon=True)
+            process.start()
+            events.close()
+            self.workers[role] = process
+        for conn in (capture_commands, frames, raw_notify, inference_commands, raw_notify_reader):
+            conn.close()
+
+        # Until the receiver thread runs, read the capture process's first event here
+        if not self._events['capture'].poll(15):
+            raise RuntimeError("Capture process did not start")
+        self._on_event(self._events['capture'].recv())
+        if self.camera_type is None:
+            raise RuntimeError("No camera available in the capture process")
+
+    def _capture_loop(self):
+        """Receive encoded frames and worker events from the child processes."""
+        conns = [self._frames, *self._events.values()]
+        while conns:
+            for conn in multiprocessing.connection.wait(conns):
+                try:
+                    if conn is self._frames:
+                        self._on_shared_frame(_SEQ.unpack(conn.recv_bytes())[0])
+                    else:
+                        self._on_event(conn.recv())
+                except (EOFError, OSError):
+                    conns.remove(conn)
+                    if not self._closing:
+                        logger.error("A video worker process exited")
+
+    def _on_shared_frame(self, seq: int) -> None:
+        found = self.jpeg_ring.read(seq)
+        if found is None:
+            FRAMES_DROPPED.labels('overwritten').inc()
+            return
+        view, capture_time, (capture_seconds, encode_seconds, detection_seq) = found
+        frame_bytes = bytes(view)
+        view.release()
+        if not self.jpeg_ring.valid(seq):
+            FRAMES_DROPPED.labels('overwritten').inc()
+            return
+        FRAME_CAPTURE_SECONDS.observe(capture_seconds)
+        FRAME_ENCODE_SECONDS.observe(encode_seconds)
+        detections = None
+        if detection_seq:
+            found = self.detection_ring.read(int(detection_seq))
+            if found is not None:
+                view, _, (inference_seconds, _, _) = found
+                detections = _unpack_detections(view)
+                view.release()
+                FRAME_INFERENCE_SECONDS.observe(inference_seconds)
+        self._publish_frame(capture_time, frame_bytes, detections)
+
+    def _on_event(self, event) -> None:
+        kind, data = event
+        if kind == 'ready':
+            self.camera_type = data['camera_type']
+            if data['resolution']:
+                self.stats['resolution'] = data['resolution']
+        elif kind == 'engine':
+            self.engine = _RemoteEngine(data['name'], data['names'])
+            self._last_detections = []
+            self._send('capture', 'set', {'names': data['names']})
+            logger.info("Inference engine switched to %s", data['name'])
+        elif kind == 'engine_status':
+            self._engine_status = data
+
+    def _send(self, role: str, *message) -> None:
+        conn = self._capture_commands if role == 'capture' else self._inference_commands
+        try:
+            with self._send_lock:
+                conn.send(message)
+        except (OSError, ValueError, BrokenPipeError):
+            logger.error("Video %s process is not running", role)
+
+    def _sync_workers(self) -> None:
+        state = {'is_streaming': self.is_streaming, 'is_ai_mode': self.is_ai_mode, 'target_fps': self.target_fps,
+                 'jpeg_quality': self.jpeg_quality, 'inference_interval': self.inference_interval}
+        self._send('capture', 'set', state)
+        self._send('inference', 'set', state)
+
+    def apply_limits(self, *args, **kwargs) -> None:
+        super().apply_limits(*args, **kwargs)
+        self._sync_workers()
+
+    def toggle_stream(self) -> bool:
+        streaming = super().toggle_stream()
+        self._sync_workers()
+        return streaming
+
+    def toggle_ai(self) -> bool:
+        ai = super().toggle_ai()
+        self._sync_workers()
+        return ai
+
+    def benchmark_engines(self) -> bool:
+        if self._engine_status.get('state') == 'benchmarking':
+            return False
+        self._engine_status = {**self._engine_status, 'state': 'benchmarking'}
+        self._send('inference', 'benchmark', None)
+        return True
+
+    def engine_status(self) -> Dict:
+        return dict(self._engine_status)
+
+    def close(self) -> None:
+        self._closing = True
+        for role in self.workers:
+            self._send(role, 'stop', None)
+        for process in self.workers.values():
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        self.workers = {}
+        for ring in (self.raw_ring, self.jpeg_ring, self.detection_ring):
+            ring.close()
+
+    # Child process side (forked; `self` is the child's copy)
+
+    def _apply_commands(self, commands) -> bool:
+        """Apply pending commands from the web process; False once told to stop."""
+        while commands.poll():
+            kind, data = commands.recv()
+            if kind == 'stop':
+                return False
+            if kind == 'set':
+                for key, value in data.items():
+                    setattr(self, key, value)
+            elif kind == 'benchmark':
+                engine_selector.start_benchmark(self._child_set_engine, self._sample_shared_frames)
+        return True
+
+    def _capture_main(self, commands, frames, raw_notify, events) -> None:
+        self.names = None
+        try:
+            VideoStream.init_camera(self)
+        except Exception as e:
+            logger.error("Capture process could not open a camera: %s", e)
+            events.send(('ready', {'camera_type': None, 'resolution': None}))
+            return
+        events.send(('ready', {'camera_type': self.camera_type, 'resolution': self.stats['resolution']}))
+        width, height = map(int, self.stats['resolution'].split('x'))
+        frame_bytes = width * height * 3
+        drawn = 0
+        try:
+            while self._apply_commands(commands):
+                if not self.is_streaming:
+                    time.sleep(0.05)
+                    continue
+                capture_start = time.perf_counter()
+                seq, view = self.raw_ring.begin_write(frame_bytes)
+                frame = self._read_frame(np.frombuffer(view, dtype=np.uint8).reshape(height, width, 3))
+                if frame is None:
+                    continue
+                capture_time = time.monotonic()
+                capture_seconds = time.perf_counter() - capture_start
+                self.raw_ring.commit(seq, frame_bytes, capture_time, (width, height))
+                if self.is_ai_mode:
+                    raw_notify.send_bytes(_SEQ.pack(seq))
+
+                # Draw the newest boxes; the frame that first shows them carries their seq
+                new_detections = 0
+                if self.is_ai_mode:
+                    latest = self.detection_ring.latest
+                    if latest != drawn:
+                        found = self.detection_ring.read(latest)
+                        if found is not None:
+                            self._last_detections = _unpack_detections(found[0])
+                            found[0].release()
+                            drawn = new_detections = latest
+                    frame = draw_detections(frame, self._last_detections, self.names)
+
+                encode_start = time.perf_counter()
+                jpeg = self.encoder.encode(frame, self.jpeg_quality)
+                if jpeg is None:
+                    logger.error("Failed to encode frame")
+                    continue
+                jpeg_seq = self.jpeg_ring.write(jpeg, capture_time, (capture_seconds,
+                                                                       time.perf_counter() - encode_start,
+                                                                       new_detections))
+                frames.send_bytes(_SEQ.pack(jpeg_seq))
+                time.sleep(1 / self.target_fps)
+        except (KeyboardInterrupt, BrokenPipeError):
+            pass
+        finally:
+            VideoStream.__del__(self)
+
+    def _child_set_engine(self, engine) -> None:
+        self.engine = engine
+        self._child_send(('engine', {'name': engine.name, 'names': engine.names}))
+
+    def _child_send(self, event) -> None:
+        with self._send_lock:  # The benchmark thread reports engines too
+            self._events_out.send(event)
+
+    def _sample_shared_frames(self, count: int = 8, spacing: float = 0.25, timeout: float = 15.0) -> list:
+        """Copies of recent raw frames, for benchmarking engines in the inference process."""
+        frames, last = [], 0
+        deadline = time.monotonic() + timeout
+        while len(frames) < count and time.monotonic() < deadline:
+            seq = self.raw_ring.latest
+            if seq != last:
+                frame, _ = self._shared_frame(seq)
+                if frame is not None:
+                    frames.append(frame.copy())
+                    last = seq
+            time.sleep(spacing)
+        return frames
+
+    def _shared_frame(self, seq: int) -> Tuple[Optional[np.ndarray], float]:
+        """Raw frame seq as an array on the ring slot (no copy) and its capture time."""
+        found = self.raw_ring.read(seq)
+        if found is None:
+            return None, 0.0
+        view, capture_time, (width, height, _) = found
+        return np.frombuffer(view, dtype=np.uint8).reshape(int(height), int(width), 3), capture_time
+
+    def _inference_main(self, commands, raw_notify, events) -> None:
+        self._events_out = events
+        engine = engine_selector.startup(on_select=self._child_set_engine, frame_source=self._sample_shared_frames)
+        if engine is not None:
+            self._child_set_engine(engine)
+        reported = None
+        try:
+            while self._apply_commands(commands):
+                status = (engine_selector.state, engine_selector.selected)
+                if status != reported:
+                    reported = status
+                    self._child_send(('engine_status', engine_selector.get_status()))
+
+                if not multiprocessing.connection.wait([raw_notify, commands], timeout=1.0):
+                    continue
+                seq = 0
+                while raw_notify.poll():
+                    seq = _SEQ.unpack(raw_notify.recv_bytes())[0]  # Only the newest frame matters
+                engine = self.engine
+                if not seq or engine is None or not self.is_ai_mode or seq % self.inference_interval:
+                    continue
+                if not self.raw_ring.hold(seq):
+                    continue
+                try:
+                    frame, capture_time = self._shared_frame(seq)
+                    if frame is None:
+                        continue
+                    start = time.perf_counter()
+                    detections = engine.infer(frame)
+                    inference_seconds = time.perf_counter() - start
+                    intact = self.raw_ring.valid(seq)  # False if the frame changed under inference
+                except Exception as e:
+                    logger.error("Inference failed: %s", e)
+                    continue
+                finally:
+                    frame = None
+                    self.raw_ring.release()
+                if intact:
+                    packed = np.asarray(detections, dtype=np.float32).reshape(-1, 6)[:MAX_DETECTIONS]
+                    self.detection_ring.write(packed.tobytes(), capture_time, (inference_seconds, seq, len(packed)))
+        except (KeyboardInterrupt, BrokenPipeError):
+            pass
+
+
+def _unpack_detections(view) -> list:
+    boxes = np.frombuffer(view, dtype=np.float32).reshape(-1, 6)
+    return [(int(box[0]), *map(float, box[1:])) for box in boxes]
+
+
+# Create a singleton instance to be used across the application;
+# ROBOT_VIDEO_PROCESSES=1 runs capture/encode and inference in separate processes
+video_stream = ProcessVideoStream() if MULTIPROCESS else VideoStream()
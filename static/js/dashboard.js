@@ -4,6 +4,7 @@ class DashboardUI {
         this.frameRequested = false;
         this.charts = this.initializeCharts();
         this.setupEventSource();
+        this.setupThermalEvents();
     }
 
     initializeCharts() {
@@ -155,6 +156,25 @@ class DashboardUI {
         };
     }
 
+    setupThermalEvents() {
+        const eventSource = new EventSource('/thermal-events');
+
+        eventSource.onmessage = (event) => {
+            const data = JSON.parse(event.data);
+            const element = document.getElementById('thermalLevel');
+            if (!element) return;
+            element.textContent = data.name.replace(/_/g, ' ');
+            element.title = data.reason;
+            element.classList.toggle('degraded', data.level > 0);
+        };
+
+        eventSource.onerror = (error) => {
+            console.error('Thermal EventSource failed:', error);
+            eventSource.close();
+            setTimeout(() => this.setupThermalEvents(), 5000);
+        };
+    }
+
     updateStats(data) {
         // Queue CPU updates
         this.pendingUpdates.set('cpuUsage', `${data.cpu.usage}%`);
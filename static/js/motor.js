@@ -1,37 +1,83 @@
 document.addEventListener('DOMContentLoaded', () => {
-    const MOTOR_BASE_PATH = '/api/gpio/motor';
+    const CONTROL_SOCKET_PATH = '/ws/control';
+    const CONTROL_HTTP_PATH = '/api/control';
+    const DRIVE_INTERVAL_MS = 50;  // Resend while held; keeps the server's deadman timer fed
     const forwardButton = document.getElementById('forward_button');
     const leftButton = document.getElementById('left_button');
     const rightButton = document.getElementById('right_button');
     const backwardButton = document.getElementById('backward_button');
 
-    let activeRequest = null;
+    let httpPending = false;
+    let socket = null;
+    let driveTimer = null;
+    let reconnectDelay = 500;
 
-    const sendMotorCommand = async (url) => {
-        try {
-            activeRequest = await fetch(url, { method: 'POST' });
-        } catch (error) {
-            console.error('Error sending motor command:', error);
+    // Persistent control channel; the same commands go to POST /api/control while it is down
+    const connect = () => {
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        socket = new WebSocket(`${protocol}//${window.location.host}${CONTROL_SOCKET_PATH}`);
+        socket.onopen = () => { reconnectDelay = 500; };
+        socket.onclose = () => {
+            socket = null;
+            setTimeout(connect, reconnectDelay);
+            reconnectDelay = Math.min(reconnectDelay * 2, 10000);
+        };
+        socket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            if (message.type === 'error') {
+                console.error('Control channel error:', message.message);
+            }
+        };
+    };
+
+    const socketOpen = () => socket && socket.readyState === WebSocket.OPEN;
+
+    const post = (command) => fetch(CONTROL_HTTP_PATH, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(command),
+    }).catch((error) => console.error('Error sending motor command:', error));
+
+    // Resends while held skip a beat if the previous HTTP request is still in flight
+    const sendDrive = async (command) => {
+        if (socketOpen()) {
+            socket.send(JSON.stringify(command));
+        } else if (!httpPending) {
+            httpPending = true;
+            await post(command);
+            httpPending = false;
         }
     };
 
-    const stopMotor = async () => {
-        if (activeRequest) {
-            await fetch(`${MOTOR_BASE_PATH}/stop`, { method: 'POST' });
-            activeRequest = null;
+    const startDrive = (speed, turn) => {
+        clearInterval(driveTimer);
+        const send = () => sendDrive({ type: 'drive', speed, turn });
+        send();
+        driveTimer = setInterval(send, DRIVE_INTERVAL_MS);
+    };
+
+    const stopMotor = () => {
+        clearInterval(driveTimer);
+        driveTimer = null;
+        const command = { type: 'stop' };
+        if (socketOpen()) {
+            socket.send(JSON.stringify(command));
+        } else {
+            post(command);  // Never skipped, even behind a pending drive request
         }
     };
 
-    forwardButton?.addEventListener('mousedown', () => sendMotorCommand(`${MOTOR_BASE_PATH}/forward`));
+    forwardButton?.addEventListener('mousedown', () => startDrive(1, 0));
     forwardButton?.addEventListener('mouseup', stopMotor);
 
-    leftButton?.addEventListener('mousedown', () => sendMotorCommand(`${MOTOR_BASE_PATH}/left`));
+    leftButton?.addEventListener('mousedown', () => startDrive(0, -1));
     leftButton?.addEventListener('mouseup', stopMotor);
 
-    rightButton?.addEventListener('mousedown', () => sendMotorCommand(`${MOTOR_BASE_PATH}/right`));
+    rightButton?.addEventListener('mousedown', () => startDrive(0, 1));
     rightButton?.addEventListener('mouseup', stopMotor);
 
-    backwardButton?.addEventListener('mousedown', () => sendMotorCommand(`${MOTOR_BASE_PATH}/backward`));
+    backwardButton?.addEventListener('mousedown', () => startDrive(-1, 0));
     backwardButton?.addEventListener('mouseup', stopMotor);
-});
 
+    connect();
+});
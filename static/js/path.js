@@ -8,8 +8,13 @@ class PathGraph {
 
         this.ctx = this.canvas.getContext('2d');
         this.path = [];
+        this.cursor = 0; // Server path index after the last point we hold
+        this.generation = null; // Server reset count the held points belong to
         this.scale = 1; // Each grid cell represents 1 meter
         this.gridSize = 3; // Half of 6x6 grid (3 meters in each direction)
+        this.mapTiles = new Map(); // "tx,ty" -> { tx, ty, image } occupancy tiles from /api/map
+        this.mapVersion = 0;
+        this.mapTileMeters = 0;
 
         // Set fixed canvas size
         this.canvas.width = 450; // Fixed width in pixels
@@ -28,6 +33,42 @@ class PathGraph {
         this.draw();
     }
 
+    addPoints(values) {
+        // values is a flat [x0, y0, x1, y1, ...] array
+        for (let i = 0; i + 1 < values.length; i += 2) {
+            this.path.push({ x: values[i], y: values[i + 1] });
+        }
+        this.draw();
+    }
+
+    clear() {
+        this.path = [];
+        this.cursor = 0;
+        this.generation = null;
+    }
+
+    setMapTile(tx, ty, image) {
+        this.mapTiles.set(`${tx},${ty}`, { tx, ty, image });
+        this.draw();
+    }
+
+    clearMap() {
+        this.mapTiles.clear();
+        this.mapVersion = 0;
+    }
+
+    drawMap(centerX, centerY, cellSize) {
+        const ctx = this.ctx;
+        const size = this.mapTileMeters * cellSize;
+        ctx.imageSmoothingEnabled = false;
+        this.mapTiles.forEach(({ tx, ty, image }) => {
+            // Tile images are north-up, so their top edge is the tile's highest y
+            const x = centerX + tx * this.mapTileMeters * cellSize;
+            const y = centerY - (ty + 1) * this.mapTileMeters * cellSize;
+            ctx.drawImage(image, x, y, size, size);
+        });
+    }
+
     draw() {
         const ctx = this.ctx;
         const canvas = this.canvas;
@@ -38,6 +79,9 @@ class PathGraph {
         // Clear canvas
         ctx.clearRect(0, 0, canvas.width, canvas.height);
 
+        // Occupancy map underneath everything else
+        this.drawMap(centerX, centerY, cellSize);
+
         // Draw grid
         ctx.strokeStyle = 'rgba(255, 219, 21, 0.1)';
         ctx.lineWidth = 1;
@@ -131,18 +175,60 @@ class PathGraph {
 document.addEventListener('DOMContentLoaded', () => {
     const pathGraph = new PathGraph('pathCanvas');
 
+    let syncing = false;
+
+    // Fetch every point after our cursor in one small float32 response
+    async function resyncPath() {
+        syncing = true;
+        try {
+            for (;;) {
+                const response = await fetch(`/api/encoder/path/points?since=${pathGraph.cursor}&tolerance=0.005&format=f32`);
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                const generation = parseInt(response.headers.get('X-Path-Generation'), 10);
+                if (pathGraph.cursor !== 0 && generation !== pathGraph.generation) {
+                    // Odometry was reset since our points were fetched: our cursor means nothing now
+                    pathGraph.clear();
+                    continue;
+                }
+                const cursor = parseInt(response.headers.get('X-Path-Cursor'), 10);
+                const values = new Float32Array(await response.arrayBuffer());
+                pathGraph.generation = generation;
+                pathGraph.cursor = cursor;
+                pathGraph.addPoints(values);
+                break;
+            }
+        } catch (e) {
+            console.error('Error fetching encoder path:', e);
+        } finally {
+            syncing = false;
+        }
+    }
+
     function fetchEncoderPath() {
         const eventSource = new EventSource('/api/encoder/path');
-        
+
+        eventSource.onopen = () => resyncPath();
+
         eventSource.onmessage = (event) => {
             try {
                 const data = JSON.parse(event.data);
                 if (data.error) {
                     console.error('Error in encoder data:', data.error);
                     eventSource.close();
-                } else if (data.x !== undefined && data.y !== undefined) {
-                    pathGraph.addPoint(data);
-                    console.log('Updated position:', data);  // Debug output
+                } else if (!syncing && data.cursor !== undefined) {
+                    if (data.generation !== pathGraph.generation || data.cursor < pathGraph.cursor) {
+                        // Odometry was reset on the server
+                        pathGraph.clear();
+                        resyncPath();
+                    } else if (data.cursor === pathGraph.cursor + 1) {
+                        pathGraph.cursor = data.cursor;
+                        pathGraph.addPoint({ x: data.x, y: data.y });
+                    } else if (data.cursor > pathGraph.cursor) {
+                        // Missed points; fetch the gap instead of guessing
+                        resyncPath();
+                    }
                 }
             } catch (e) {
                 console.error('Error parsing encoder data:', e);
@@ -152,10 +238,35 @@ document.addEventListener('DOMContentLoaded', () => {
         eventSource.onerror = () => {
             console.error('Connection to /api/encoder/path lost.');
             eventSource.close();
-            // Attempt to reconnect after 5 seconds
+            // Attempt to reconnect after 5 seconds; onopen resyncs from our cursor
             setTimeout(fetchEncoderPath, 5000);
         };
     }
 
+    // Poll for map tiles changed since the version we hold; only those are downloaded
+    async function syncMap() {
+        try {
+            const response = await fetch(`/api/map/tiles?since=${pathGraph.mapVersion}`);
+            const data = await response.json();
+            if (data.status !== 'success') {
+                return;
+            }
+            if (pathGraph.mapVersion < data.cleared_at) {
+                pathGraph.clearMap();
+            }
+            pathGraph.mapTileMeters = data.tile_size * data.resolution;
+            pathGraph.mapVersion = data.version;
+            data.changed.forEach(({ tx, ty, version }) => {
+                const image = new Image();
+                image.onload = () => pathGraph.setMapTile(tx, ty, image);
+                image.src = `/api/map/tile/${tx}/${ty}.png?v=${version}`;
+            });
+        } catch (e) {
+            console.error('Error fetching map tiles:', e);
+        }
+    }
+
     fetchEncoderPath();
+    syncMap();
+    setInterval(syncMap, 1000);
 });
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Hardware modules fall back to their simulated implementations
+os.environ.setdefault('ROBOT_SIMULATION', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from modules.recording import ColumnarSink, SessionCatalog
+
+COLUMNS = [('t', '<f8'), ('value', '<f4')]
+
+
+def record(catalog, folder, name, times, chunk_rows=4, compression=None):
+    """Write times (and value = row number) through a sink the catalog observes."""
+    path = str(folder / name)
+    sink = ColumnarSink(path, COLUMNS, compression, observer=catalog.observer(path))
+    rows = [(t, i) for i, t in enumerate(times)]
+    for start in range(0, len(rows), chunk_rows):
+        sink.write_rows(rows[start:start + chunk_rows])
+    sink.close()
+
+
+@pytest.fixture(params=[None, 'zlib'])
+def catalog(request, tmp_path):
+    catalog = SessionCatalog(str(tmp_path), index_interval=2.0)
+    record(catalog, tmp_path, 'run.rec', 100.0 + np.arange(20) * 0.5, compression=request.param)
+    return catalog
+
+
+def times(result):
+    return list(result['columns']['t'] - result['t_start'])
+
+
+def test_unbounded_slice_returns_every_row(catalog):
+    result = catalog.time_slice('run.rec')
+    assert result['stream'] == 'samples'
+    assert result['t_start'] == 100.0
+    assert times(result) == list(np.arange(20) * 0.5)
+
+
+def test_bounds_are_relative_to_recording_start_and_inclusive(catalog):
+    assert times(catalog.time_slice('run.rec', start=3.0, end=5.0)) == [3.0, 3.5, 4.0, 4.5, 5.0]
+    assert times(catalog.time_slice('run.rec', start=8.2)) == [8.5, 9.0, 9.5]
+    assert times(catalog.time_slice('run.rec', end=0.9)) == [0.0, 0.5]
+
+
+def test_slice_outside_recording_is_empty(catalog):
+    for start, end in [(50.0, 60.0), (-10.0, -5.0), (4.1, 4.4)]:
+        columns = catalog.time_slice('run.rec', start=start, end=end)['columns']
+        assert all(len(values) == 0 for values in columns.values())
+
+
+def test_max_rows_strides_evenly(catalog):
+    result = catalog.time_slice('run.rec', max_rows=5)
+    assert list(result['columns']['value']) == [0, 4, 9, 14, 19]
+
+
+def test_scanned_entry_slices_like_live_one(catalog, tmp_path):
+    (tmp_path / 'catalog.json').unlink()
+    rescanned = SessionCatalog(str(tmp_path), index_interval=2.0)
+    rescanned.scan()
+    assert times(rescanned.time_slice('run.rec', start=3.0, end=5.0)) == [3.0, 3.5, 4.0, 4.5, 5.0]
+
+
+def test_unknown_recording_or_stream(catalog):
+    with pytest.raises(KeyError):
+        catalog.time_slice('missing.rec')
+    with pytest.raises(KeyError):
+        catalog.time_slice('run.rec', stream='video')
+
+
+@pytest.mark.parametrize('compression', [None, 'zlib'])
+def test_nan_time_rows_kept_only_inside_slice(tmp_path, compression):
+    catalog = SessionCatalog(str(tmp_path), index_interval=1.0)
+    nan = float('nan')
+    record(catalog, tmp_path, 'gaps.rec', [100.0, nan, 101.0, nan, 102.0, nan, 103.0, nan],
+           chunk_rows=3, compression=compression)
+
+    result = catalog.time_slice('gaps.rec', start=1.0, end=2.0)
+    assert list(result['columns']['value']) == [2, 3, 4]
+
+    # Unbounded slices keep every row, NaN times included
+    assert len(catalog.time_slice('gaps.rec')['columns']['value']) == 8
+
+    # Only NaN rows between two in-range rows count as inside
+    assert list(catalog.time_slice('gaps.rec', start=1.2, end=1.8)['columns']['value']) == []
+    assert list(catalog.time_slice('gaps.rec', start=3.0)['columns']['value']) == [6]
+
+
+def test_legacy_csv_slice(tmp_path):
+    (tmp_path / 'old.csv').write_text(
+        'timestamp,x,y,ultrasonic,lidar\n'
+        '23:59:58,0.0,0.0,10.0,Out of range\n'
+        '23:59:59,1.0,0.0,11.0,20.0\n'
+        '00:00:00,2.0,0.0,-1,21.0\n'
+        '00:00:01,3.0,0.0,13.0,22.0\n'
+    )
+    catalog = SessionCatalog(str(tmp_path))
+    catalog.scan()
+    result = catalog.time_slice('old.csv', start=1.0, end=2.0)
+    assert list(result['columns']['t']) == [1.0, 2.0]
+    assert list(result['columns']['x']) == [1.0, 2.0]
+    assert np.isnan(result['columns']['ultrasonic'][1])
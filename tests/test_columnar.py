@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+from modules.recording import ColumnarSink, SENSOR_COLUMNS, read_schema, read_session, sensor_row, session_to_csv
+from modules.recording.columnar import (CHUNKS_FILE, LIDAR_OUT_OF_RANGE, LIDAR_VALID, ULTRASONIC_VALID,
+                                        chunk_offsets, read_chunks)
+
+
+def write_session(path, chunks, compression=None):
+    sink = ColumnarSink(str(path), SENSOR_COLUMNS, compression, metadata={'test': True},
+                        clock={'monotonic': 0.0, 'wall': 1_700_000_000.0})
+    for rows in chunks:
+        sink.write_rows(rows)
+        sink.flush()
+    sink.close()
+    return sink
+
+
+def make_rows(start, count):
+    return [sensor_row(float(t), t * 0.5, -t * 0.25, t * 0.01, 10.0 + t, "Out of range")
+            for t in range(start, start + count)]
+
+
+@pytest.mark.parametrize('compression', [None, 'zlib'])
+def test_round_trip(tmp_path, compression):
+    chunks = [make_rows(0, 5), make_rows(5, 3), make_rows(8, 4)]
+    path = tmp_path / 'session.rec'
+    write_session(path, chunks, compression)
+
+    schema = read_schema(str(path))
+    assert schema['compression'] == compression
+    assert schema['metadata'] == {'test': True}
+    assert [c['name'] for c in schema['columns']] == [name for name, _ in SENSOR_COLUMNS]
+
+    data = read_session(str(path))
+    assert list(data) == [name for name, _ in SENSOR_COLUMNS]
+    np.testing.assert_array_equal(data['t'], np.arange(12, dtype='<f8'))
+    np.testing.assert_allclose(data['x'], np.arange(12) * 0.5)
+    np.testing.assert_allclose(data['ultrasonic'], 10.0 + np.arange(12))
+    assert np.isnan(data['lidar']).all()
+    assert (data['valid'] == ULTRASONIC_VALID | LIDAR_OUT_OF_RANGE).all()
+    for name, dtype in SENSOR_COLUMNS:
+        assert data[name].dtype == np.dtype(dtype)
+
+
+def test_uncompressed_columns_are_memory_mapped(tmp_path):
+    path = tmp_path / 'session.rec'
+    write_session(path, [make_rows(0, 4)])
+    data = read_session(str(path))
+    assert isinstance(data['t'], np.memmap)
+    assert not data['t'].flags.writeable
+
+
+def test_uncompressed_read_trims_partial_row(tmp_path):
+    path = tmp_path / 'session.rec'
+    write_session(path, [make_rows(0, 4)])
+    with open(path / 't.bin', 'ab') as f:  # Row being written while the session is read
+        f.write(np.float64(4.0).tobytes())
+    data = read_session(str(path))
+    assert all(len(column) == 4 for column in data.values())
+
+
+def test_zlib_chunks(tmp_path):
+    path = tmp_path / 'session.rec'
+    sink = write_session(path, [make_rows(0, 5), make_rows(5, 3), make_rows(8, 4)], 'zlib')
+
+    offsets = chunk_offsets(str(path))
+    assert [rows for _, rows in offsets] == [5, 3, 4]
+    assert offsets[0][0] == 0
+    assert sink.bytes_written == (path / CHUNKS_FILE).stat().st_size
+
+    # Reading from the second chunk's offset skips the first one
+    tail = read_chunks(str(path), byte_offset=offsets[1][0])
+    np.testing.assert_array_equal(tail['t'], np.arange(5, 12))
+
+    # stop_after ends at the first chunk that passes it
+    head = read_chunks(str(path), stop_after=6.0)
+    np.testing.assert_array_equal(head['t'], np.arange(0, 8))
+
+
+def test_zlib_ignores_truncated_chunk(tmp_path):
+    path = tmp_path / 'session.rec'
+    write_session(path, [make_rows(0, 5), make_rows(5, 3)], 'zlib')
+    chunks_path = path / CHUNKS_FILE
+    size = chunks_path.stat().st_size
+    with open(chunks_path, 'r+b') as f:  # Interrupted write of the last chunk
+        f.truncate(size - 4)
+    data = read_session(str(path))
+    np.testing.assert_array_equal(data['t'], np.arange(5))
+    assert chunk_offsets(str(path))[-1][1] == 3  # Header intact, payload short
+
+
+def test_observer_gets_chunks_and_close(tmp_path):
+    events = []
+
+    class Observer:
+        def on_chunk(self, columns, first_row, byte_offset):
+            events.append(('chunk', first_row, byte_offset, len(columns['t'])))
+
+        def on_close(self):
+            events.append(('close',))
+
+    sink = ColumnarSink(str(tmp_path / 'session.rec'), compression='zlib', observer=Observer())
+    sink.write_rows(make_rows(0, 2))
+    first_size = sink.bytes_written
+    sink.write_rows(make_rows(2, 3))
+    sink.close()
+    assert events == [('chunk', 0, 0, 2), ('chunk', 2, first_size, 3), ('close',)]
+
+
+def test_rejects_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        ColumnarSink(str(tmp_path / 'session.rec'), compression='lz4')
+
+
+def test_sensor_row_validity_bits():
+    assert sensor_row(0.0, 0, 0, 0, 12.5, 30)[-1] == ULTRASONIC_VALID | LIDAR_VALID
+    _, _, _, _, u, l, valid = sensor_row(0.0, 0, 0, 0, -1, "bad")
+    assert np.isnan(u) and np.isnan(l) and valid == 0
+
+
+def test_session_to_csv(tmp_path):
+    path = tmp_path / 'session.rec'
+    write_session(path, [[sensor_row(0.0, 1.0, 2.0, 0.0, 12.345, "Out of range"),
+                          sensor_row(1.0, 1.5, 2.5, 0.0, -1, 40.0)]])
+    csv_path = tmp_path / 'session.csv'
+    assert session_to_csv(str(path), str(csv_path)) == 2
+    lines = csv_path.read_text().splitlines()
+    assert lines[0] == 'timestamp,x,y,ultrasonic,lidar'
+    assert lines[1].split(',')[1:] == ['1.0', '2.0', '12.35', 'Out of range']
+    assert lines[2].split(',')[1:] == ['1.5', '2.5', '-1', '40.0']
@@ -0,0 +1,87 @@
+import threading
+import time
+import numpy as np
+from modules.encoding import EncodePool, JpegEncoder
+
+
+class SlowEncoder(JpegEncoder):
+    """Fake encoder whose frames take frame[0, 0] milliseconds each."""
+
+    name = 'slow'
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def encode(self, frame, quality):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(frame[0, 0] / 1000.0)
+        with self._lock:
+            self.active -= 1
+        if frame[0, 1]:
+            raise RuntimeError('bad frame')
+        return bytes([frame[0, 0], quality])
+
+
+def frame(delay_ms, fail=False):
+    return np.array([[delay_ms, int(fail)]], dtype=np.uint8)
+
+
+def run(encoder, frames, workers=3):
+    delivered = []
+    pool = EncodePool(encoder, workers=workers,
+                      on_encoded=lambda jpeg, seconds, context: delivered.append((context, jpeg)))
+    for i, f in enumerate(frames):
+        pool.submit(f, 80, context=i)
+    pool.close()
+    return delivered
+
+
+def test_delivers_in_submission_order():
+    # Later frames finish first; delivery must still follow capture order
+    delays = [40, 30, 20, 10, 1] * 4
+    delivered = run(SlowEncoder(), [frame(d) for d in delays])
+    assert [context for context, _ in delivered] == list(range(len(delays)))
+    assert [jpeg for _, jpeg in delivered] == [bytes([d, 80]) for d in delays]
+
+
+def test_encodes_in_parallel_with_bounded_backlog():
+    encoder = SlowEncoder()
+    pool = EncodePool(encoder, workers=3)
+    for _ in range(9):
+        pool.submit(frame(30), 80)
+        assert pool.in_flight <= 4  # workers + 1
+    pool.close()
+    assert encoder.max_active == 3
+
+
+def test_failed_encode_is_delivered_as_none_in_order():
+    delivered = run(SlowEncoder(), [frame(5), frame(20, fail=True), frame(1)])
+    assert delivered == [(0, bytes([5, 80])), (1, None), (2, bytes([1, 80]))]
+
+
+def test_callback_errors_do_not_stop_delivery():
+    delivered = []
+
+    def on_encoded(jpeg, seconds, context):
+        if context == 0:
+            raise ValueError('callback failed')
+        delivered.append(context)
+
+    pool = EncodePool(SlowEncoder(), workers=2, on_encoded=on_encoded)
+    for i in range(3):
+        pool.submit(frame(1), 80, context=i)
+    pool.close()
+    assert delivered == [1, 2]
+
+
+def test_submit_after_close_is_ignored():
+    delivered = []
+    pool = EncodePool(SlowEncoder(), workers=1, on_encoded=lambda *args: delivered.append(args))
+    pool.close()
+    pool.submit(frame(1), 80)
+    assert delivered == [] and pool.in_flight == 0
@@ -0,0 +1,115 @@
+import time
+from modules.monitor.governor import ThermalGovernor
+
+
+class FakeVideoStream:
+    def __init__(self):
+        self.limits = None
+
+    def apply_limits(self, **limits):
+        self.limits = limits
+
+
+class FakeSensorInterface:
+    def __init__(self):
+        self.interval = 'unset'
+
+    def set_interval(self, interval):
+        self.interval = interval
+
+
+def make_governor(tmp_path, min_dwell=0.0, **kwargs):
+    governor = ThermalGovernor(FakeVideoStream(), FakeSensorInterface(), check_interval=3600,
+                               min_dwell=min_dwell, sysfs_root=str(tmp_path), **kwargs)
+    # Let the background thread finish its first check so it cannot race the test
+    deadline = time.monotonic() + 2.0
+    while not governor.readings and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return governor
+
+
+def reading(temp, throttled=()):
+    return {'temperature': temp, 'frequency': 1500, 'throttled': list(throttled)}
+
+
+def test_steps_up_one_level_per_check(tmp_path):
+    governor = make_governor(tmp_path)
+    assert governor.evaluate(reading(85.0)) == 1
+    assert governor.evaluate(reading(85.0)) == 2
+    assert governor.evaluate(reading(85.0)) == 3
+    assert governor.evaluate(reading(85.0)) == 3
+    assert governor.get_status()['name'] == 'ai_off'
+
+
+def test_hysteresis_between_enter_and_exit(tmp_path):
+    governor = make_governor(tmp_path)
+    assert governor.evaluate(reading(70.0)) == 1
+    # Between exit (65) and enter of the next level (75): stay put
+    for temp in (66.0, 69.9, 74.9, 65.1):
+        assert governor.evaluate(reading(temp)) == 1
+    assert governor.evaluate(reading(65.0)) == 0
+    # Back under enter_temp but above exit_temp does not re-enter
+    assert governor.evaluate(reading(69.0)) == 0
+
+
+def test_min_dwell_holds_level(tmp_path):
+    governor = make_governor(tmp_path, min_dwell=60.0)
+    assert governor.evaluate(reading(72.0)) == 1
+    assert governor.evaluate(reading(90.0)) == 1  # Too soon to move again
+    assert governor.evaluate(reading(40.0)) == 1
+    governor._changed_at -= 60.0
+    assert governor.evaluate(reading(40.0)) == 0
+    assert 'cooled to 40.0' in governor.reason
+
+
+def test_firmware_throttling_raises_up_to_throttle_level(tmp_path):
+    governor = make_governor(tmp_path, throttle_level=2)
+    flags = ['arm frequency capped', 'soft temperature limit']
+    assert governor.evaluate(reading(60.0, flags)) == 1
+    assert 'firmware reports' in governor.reason and '1500 MHz' in governor.reason
+    assert governor.evaluate(reading(60.0, flags)) == 2
+    assert governor.evaluate(reading(60.0, flags)) == 2
+    # Cooling does not step down while the firmware still throttles
+    assert governor.evaluate(reading(40.0, flags)) == 2
+    assert governor.evaluate(reading(40.0)) == 1
+
+
+def test_under_voltage_alone_does_not_throttle(tmp_path):
+    governor = make_governor(tmp_path)
+    assert governor.evaluate(reading(50.0, ['under-voltage'])) == 0
+
+
+def test_levels_apply_limits(tmp_path):
+    governor = make_governor(tmp_path)
+    for _ in range(3):
+        governor.evaluate(reading(85.0))
+    assert governor.video_stream.limits == {'max_fps': 10, 'max_quality': 50, 'inference_interval': 1,
+                                            'allow_ai': False}
+    assert governor.sensor_interface.interval == 1.0
+    for _ in range(3):
+        governor.evaluate(reading(None))
+    assert governor.level == 0
+    assert governor.video_stream.limits == {'max_fps': None, 'max_quality': None, 'inference_interval': 1,
+                                            'allow_ai': True}
+    assert governor.sensor_interface.interval is None
+
+
+def test_read_sensors_from_sysfs(tmp_path):
+    files = {
+        'class/thermal/thermal_zone0/temp': '71234\n',
+        'devices/system/cpu/cpu0/cpufreq/scaling_cur_freq': '1200000\n',
+        'devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq': '1800000\n',
+        'devices/platform/soc/soc:firmware/get_throttled': '0x50005\n',
+    }
+    for path, content in files.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(content)
+    governor = make_governor(tmp_path)
+    assert governor.read_sensors() == {'temperature': 71.2, 'frequency': 1200, 'max_frequency': 1800,
+                                       'throttled': ['under-voltage', 'throttled']}
+
+
+def test_missing_sysfs_files_read_as_none(tmp_path):
+    governor = make_governor(tmp_path)
+    assert governor.read_sensors() == {'temperature': None, 'frequency': None, 'max_frequency': None,
+                                       'throttled': []}
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from modules.utils.shm_ring import ShmRing
+
+
+@pytest.fixture
+def ring():
+    ring = ShmRing.create(slots=3, capacity=16)
+    yield ring
+    ring.close()
+
+
+def payload(ring, seq):
+    found = ring.read(seq)
+    if found is None:
+        return None
+    view, _, _ = found
+    data = bytes(view)
+    view.release()
+    return data
+
+
+def test_write_and_read(ring):
+    assert ring.latest == 0
+    seq = ring.write(b'frame-1', capture_time=12.5, meta=(640, 480))
+    assert seq == 1 and ring.latest == 1
+    view, capture_time, meta = ring.read(seq)
+    assert bytes(view) == b'frame-1'
+    assert capture_time == 12.5 and meta == (640.0, 480.0, 0.0)
+    view.release()
+
+
+def test_array_maps_payload_without_copy(ring):
+    seq = ring.write(np.arange(12, dtype=np.uint8))
+    array, _, _ = ring.array(seq, (3, 4))
+    assert array.shape == (3, 4) and array[2, 3] == 11
+    assert not array.flags.owndata
+    del array
+
+
+def test_overwritten_seq_is_invalid(ring):
+    seqs = [ring.write(bytes([i])) for i in range(1, 5)]
+    assert seqs == [1, 2, 3, 4]
+    assert not ring.valid(1) and ring.read(1) is None
+    assert [payload(ring, seq) for seq in seqs[1:]] == [b'\x02', b'\x03', b'\x04']
+
+
+def test_seqlock_hides_slot_while_it_is_written(ring):
+    for i in range(3):
+        ring.write(bytes([i]))
+    # Slot of seq 1 is reused for seq 4: neither is valid until commit
+    seq, view = ring.begin_write(2)
+    assert seq == 4
+    assert not ring.valid(1) and not ring.valid(4) and ring.latest == 3
+    view[:] = b'ok'
+    view.release()
+    ring.commit(seq, 2)
+    assert ring.valid(4) and ring.latest == 4 and payload(ring, 4) == b'ok'
+
+
+def test_reader_detects_overwrite_after_use(ring):
+    seq = ring.write(b'old')
+    assert ring.valid(seq)
+    for _ in range(3):
+        ring.write(b'new')
+    assert not ring.valid(seq)  # What a reader checks after using the payload
+
+
+def test_writer_skips_held_slot(ring):
+    seq = ring.write(b'held')
+    assert ring.hold(seq) and ring.held == seq
+    for i in range(10):
+        ring.write(bytes([i]))
+    assert payload(ring, seq) == b'held'
+    assert payload(ring, ring.latest) == bytes([9])
+    assert ring.valid(ring.latest - 1)  # The other two slots still rotate
+
+    ring.release()
+    assert ring.held == 0
+    for i in range(3):
+        ring.write(bytes([i]))
+    assert not ring.valid(seq)
+
+
+def test_hold_of_overwritten_seq_fails(ring):
+    for i in range(4):
+        ring.write(bytes([i]))
+    assert not ring.hold(1)
+
+
+def test_attach_shares_the_ring(ring):
+    reader = ShmRing.attach(ring.name)
+    try:
+        assert (reader.slots, reader.capacity) == (3, 16)
+        seq = ring.write(b'shared')
+        assert reader.latest == seq and payload(reader, seq) == b'shared'
+        reader.hold(seq)
+        assert ring.held == seq
+    finally:
+        reader.close()
+
+
+def test_rejects_oversized_payload_and_unknown_commit(ring):
+    with pytest.raises(ValueError):
+        ring.write(bytes(17))
+    with pytest.raises(KeyError):
+        ring.commit(5, 0)
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from modules.utils.trajectory_buffer import TrajectoryBuffer
+
+
+def fill(buffer, start, count):
+    """Append rows whose first column is their own global index."""
+    for i in range(start, start + count):
+        assert buffer.append((i, i * 2.0)) == i
+
+
+def test_unbounded_growth_keeps_every_row():
+    buffer = TrajectoryBuffer(columns=2, initial_capacity=2)
+    fill(buffer, 0, 50)
+    buffer.extend(np.array([[50, 100.0], [51, 102.0]]))
+    assert len(buffer) == 52 and buffer.total == 52
+    assert list(buffer.view()[:, 0]) == list(range(52))
+    assert buffer.archive().shape == (0, 2)
+
+
+def test_since_follows_a_cursor_across_compaction():
+    buffer = TrajectoryBuffer(columns=2, initial_capacity=4, max_rows=8, archive_stride=2)
+    seen, cursor = [], 0
+    for batch in range(10):
+        fill(buffer, batch * 3, 3)
+        rows, first, cursor_next = buffer.since(cursor)
+        assert first == cursor  # A reader keeping up never misses rows
+        seen.extend(rows[:, 0])
+        cursor = cursor_next
+    assert seen == list(range(30))
+    assert cursor == buffer.total == 30
+    assert len(buffer) <= 8
+
+
+def test_since_reports_rows_lost_to_compaction():
+    buffer = TrajectoryBuffer(columns=2, max_rows=8, archive_stride=2)
+    fill(buffer, 0, 20)
+    rows, first, next_index = buffer.since(0)
+    assert first == buffer.first_index > 0
+    assert list(rows[:, 0]) == list(range(first, 20))
+    assert next_index == 20
+
+    # Past the end: nothing new, cursor unchanged
+    rows, first, next_index = buffer.since(25)
+    assert len(rows) == 0 and first == next_index == 20
+
+
+def test_views_survive_compaction():
+    buffer = TrajectoryBuffer(columns=2, max_rows=4)
+    fill(buffer, 0, 4)
+    view = buffer.view()
+    fill(buffer, 4, 6)
+    assert list(view[:, 0]) == [0, 1, 2, 3]
+    with pytest.raises(ValueError):
+        view[0, 0] = 99
+
+
+def test_archive_keeps_even_spacing_and_stays_capped():
+    buffer = TrajectoryBuffer(columns=2, max_rows=16, archive_stride=2, max_archive_rows=8)
+    fill(buffer, 0, 2000)
+    archived = buffer.archive()[:, 0]
+    assert 0 < len(archived) <= 8
+    assert archived[0] == 0
+    assert (np.diff(archived) == buffer.archive_stride).all()
+    # The archive runs up to where the live window starts
+    assert buffer.first_index - archived[-1] <= buffer.archive_stride
+
+
+def test_clear_resets_indexes_and_archive():
+    buffer = TrajectoryBuffer(columns=2, max_rows=4, archive_stride=2, max_archive_rows=2)
+    fill(buffer, 0, 40)
+    buffer.clear()
+    assert buffer.total == 0 and buffer.first_index == 0
+    assert len(buffer.archive()) == 0 and buffer.archive_stride == 2
+    fill(buffer, 0, 3)
+    assert list(buffer.since(0)[0][:, 0]) == [0, 1, 2]
+
+
+def test_rejects_tiny_window():
+    with pytest.raises(ValueError):
+        TrajectoryBuffer(max_rows=1)
@@ -0,0 +1,101 @@
+import threading
+import time
+import pytest
+from modules.recording import BackgroundWriter, CsvSink
+
+
+class ListSink:
+    """Records what the writer thread does with it."""
+
+    def __init__(self):
+        self.batches = []
+        self.calls = []
+        self.flushed = threading.Event()
+
+    def write_rows(self, rows):
+        self.batches.append(list(rows))
+
+    def flush(self):
+        self.calls.append('flush')
+        self.flushed.set()
+
+    def fsync(self):
+        self.calls.append('fsync')
+
+    def close(self):
+        self.calls.append('close')
+
+
+def test_flushes_full_batches():
+    sink = ListSink()
+    writer = BackgroundWriter(sink, batch_rows=3, flush_interval=60.0)
+    for i in range(7):
+        assert writer.write((i,))
+    writer.close()
+
+    assert sink.batches == [[(0,), (1,), (2,)], [(3,), (4,), (5,)], [(6,)]]
+    assert writer.rows_written == 7
+    assert writer.batches_written == 3
+
+
+def test_flushes_partial_batch_after_interval():
+    sink = ListSink()
+    writer = BackgroundWriter(sink, batch_rows=100, flush_interval=0.05)
+    writer.write((1,))
+    writer.write((2,))
+    assert sink.flushed.wait(2.0)
+    assert sink.batches == [[(1,), (2,)]]
+    writer.close()
+
+
+def test_close_flushes_pending_rows_then_closes_sink():
+    sink = ListSink()
+    writer = BackgroundWriter(sink, batch_rows=100, flush_interval=60.0, fsync='close')
+    writer.write((1,))
+    writer.close()
+
+    assert sink.batches == [[(1,)]]
+    assert sink.calls == ['flush', 'fsync', 'close']
+    assert not writer.write((2,))
+    writer.close()  # Closing twice is a no-op
+    assert sink.calls.count('close') == 1
+
+
+def test_fsync_every_batch():
+    sink = ListSink()
+    writer = BackgroundWriter(sink, batch_rows=1, flush_interval=60.0, fsync='batch')
+    writer.write((1,))
+    writer.write((2,))
+    writer.close()
+    assert sink.calls == ['flush', 'fsync', 'flush', 'fsync', 'fsync', 'close']
+
+
+def test_rejects_unknown_fsync_policy():
+    with pytest.raises(ValueError):
+        BackgroundWriter(ListSink(), fsync='always')
+
+
+def test_drops_rows_when_queue_is_full():
+    sink = ListSink()
+    release = threading.Event()
+    sink.write_rows = lambda rows: release.wait(2.0)
+    writer = BackgroundWriter(sink, batch_rows=1, flush_interval=60.0, max_queue=2)
+    writer.write((0,))
+    time.sleep(0.05)  # Writer thread is now blocked on the first batch
+    results = [writer.write((i,)) for i in range(1, 5)]
+    release.set()
+    writer.close()
+
+    assert results == [True, True, False, False]
+    assert writer.rows_dropped == 2
+
+
+def test_csv_sink_round_trip(tmp_path):
+    path = tmp_path / 'data.csv'
+    writer = BackgroundWriter(CsvSink(str(path), ['t', 'value']), batch_rows=2)
+    for i in range(3):
+        writer.write((i, i * 10))
+    writer.close()
+
+    assert path.read_text().splitlines() == ['t,value', '0,0', '1,10', '2,20']
+    assert writer.bytes_written == path.stat().st_size